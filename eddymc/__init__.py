@@ -1,2 +1,4 @@
 
-# print("eddymc's __init__ method has run")
\ No newline at end of file
+# print("eddymc's __init__ method has run")
+
+__version__ = '0.3.6'
\ No newline at end of file
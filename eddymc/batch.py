@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""This module converts many output files at once, for the eddy command line wrapper.
+
+The files can be given as paths, glob patterns (e.g. 'runs/*/case.out'), directories
+(every output file under the directory is converted) or @listfiles (a text file with one
+path, pattern or directory per line). The files are shared out across a pool of worker
+processes, each of which calls eddy.main for one file at a time.
+"""
+
+# Imports from standard library
+import io
+import os
+import glob
+import contextlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+# Local imports
+from . import eddy
+from . import __version__
+from .line_reader import COMPRESSION_EXTENSIONS
+from .parse_cache import ParseCache
+
+# The file name endings of the files converted when a directory is given
+OUTPUT_EXTENSIONS = ('.out',) + tuple('.out' + extension for extension in COMPRESSION_EXTENSIONS)
+
+# The outcome of converting one file.
+#   filename (str): the output file
+#   success (bool): True if the html was written
+#   message (str): the error, if the conversion failed
+Result = namedtuple('Result', ['filename', 'success', 'message'])
+
+
+def expand_inputs(inputs):
+    """Turn the paths, glob patterns, directories and @listfiles from the command line into a list of files.
+
+    Args:
+        inputs (list): The file arguments from the command line
+
+    Returns:
+        tuple:
+            list: The files to convert, in the order given, without duplicates
+            list: Results for the arguments that did not match any files
+    """
+    files = []
+    unmatched = []
+    for argument in inputs:
+        if argument.startswith('@'):
+            matches, missing = expand_inputs(read_list_file(argument[1:]))
+            unmatched.extend(missing)
+        elif os.path.isdir(argument):
+            matches = find_outputs(argument)
+        elif glob.has_magic(argument):
+            matches = sorted(glob.glob(argument, recursive=True))
+        else:
+            matches = [argument]
+        if not matches and not argument.startswith('@'):
+            unmatched.append(Result(argument, False, "No output files match this argument"))
+        files.extend(matches)
+    # a file given more than once (e.g. by two overlapping patterns) is converted once
+    return list(dict.fromkeys(files)), unmatched
+
+
+def read_list_file(filename):
+    """Read the arguments in a listfile: one path, pattern or directory per line,
+    ignoring blank lines and lines starting with '#'.
+
+    Args:
+        filename (str): The file path (including the name) of the listfile
+
+    Returns:
+        list: The arguments in the listfile
+    """
+    with open(filename, 'r') as list_file:
+        lines = [line.strip() for line in list_file]
+    return [line for line in lines if line and not line.startswith('#')]
+
+
+def find_outputs(directory):
+    """Find every output file in a directory and its subdirectories.
+
+    Args:
+        directory (str): The directory to search
+
+    Returns:
+        list: The output files, sorted by path
+    """
+    outputs = []
+    for root, directories, files in os.walk(directory):
+        for file in files:
+            if file.lower().endswith(OUTPUT_EXTENSIONS):
+                outputs.append(os.path.join(root, file))
+    return sorted(outputs)
+
+
+def convert_file(filename, scaling_factors, cache_directory=None):
+    """Convert one output file, catching any error so that the rest of the batch carries on.
+    This runs in a worker process, so the messages eddy.main prints are not shown.
+
+    Args:
+        filename (str): The file path (including the name) of the output file
+        scaling_factors (list): The scaling factors to write reports for
+        cache_directory (str): The directory of the parse cache, or None to not use the cache
+
+    Returns:
+        Result: The outcome of the conversion
+    """
+    cache = None
+    try:
+        if cache_directory is not None:
+            cache = ParseCache(__version__, directory=cache_directory)
+        with contextlib.redirect_stdout(io.StringIO()):
+            eddy.main(filename, scaling_factors, cache=cache)
+    except Exception as error:
+        return Result(filename, False, f"{type(error).__name__}: {error}")
+    return Result(filename, True, '')
+
+
+def convert_all(files, scaling_factors, workers=None, cache_directory=None, mp_context=None):
+    """Convert many output files across a pool of worker processes.
+
+    Args:
+        files (list): The output files to convert
+        scaling_factors (list): The scaling factors to write reports for
+        workers (int): The number of worker processes (by default, one per cpu); 1 converts
+            the files one at a time in this process
+        cache_directory (str): The directory of the parse cache, or None to not use the cache
+        mp_context (multiprocessing.context.BaseContext): The way to start the worker processes
+            (by default, the platform's default start method)
+
+    Returns:
+        list: The Result of each conversion, in the same order as the files
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(files)) or 1
+    if workers == 1:
+        return [convert_file(file, scaling_factors, cache_directory) for file in files]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+        futures = [pool.submit(convert_file, file, scaling_factors, cache_directory) for file in files]
+        return [future.result() for future in futures]
+
+
+def print_summary(results):
+    """Print whether each file was converted, and the number of successes and failures.
+
+    Args:
+        results (list): The Result of each conversion
+
+    Returns:
+        int: The number of files that failed
+    """
+    for result in results:
+        if result.success:
+            print(f"OK      {result.filename}")
+        else:
+            print(f"FAILED  {result.filename}: {result.message}")
+    failures = sum(1 for result in results if not result.success)
+    print(f"\n{len(results) - failures} converted, {failures} failed.")
+    return failures
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""This module holds the command line interface run by the bin/eddy wrapper script.
+
+The work is done in main(), rather than when the module is imported, because the worker
+processes that convert many files at once may import the main script again (with the spawn
+or forkserver start method, e.g. on Windows) and must not run the conversion themselves.
+"""
+
+# Imports from standard library
+import os
+import sys
+import argparse
+# Local imports
+from . import eddy, batch, diff, libraries, __version__
+from .parse_cache import ParseCache, DEFAULT_CACHE_DIRECTORY
+
+
+def main(argv=None):
+    """Run the eddy command.
+
+    Args:
+        argv (list): The command line arguments, without the program name (by default, sys.argv[1:])
+
+    Returns:
+        int: The exit code; 1 if any file could not be converted, otherwise 0
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['diff']:
+        return diff_main(argv[1:])
+    if argv[:1] == ['libraries']:
+        return libraries_main(argv[1:])
+    return convert_main(argv)
+
+
+def diff_main(argv):
+    """Run 'eddy diff', to compare two outputs.
+
+    Args:
+        argv (list): The arguments after 'diff'
+
+    Returns:
+        int: The exit code
+    """
+    parser = argparse.ArgumentParser(prog='eddy diff', description='Compare two MCNP or SCALE outputs')
+    parser.add_argument("file_a", help="The first MCNP or SCALE output file")
+    parser.add_argument("file_b", help="The second output file, from the same code")
+    parser.add_argument("-o", "--output", help="The html file to write (default: a_vs_b.html next to a)")
+    parser.add_argument("--json", help="Also write the comparison to this JSON file")
+    parser.add_argument("-t", "--threshold", type=float, default=diff.DEFAULT_THRESHOLD,
+                        help="Deviation, in standard deviations, beyond which a change is significant")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIRECTORY,
+                        help="Directory for the cache of parsed outputs")
+    parser.add_argument("--no-cache", action="store_true", help="Parse the outputs without using the cache")
+    args = parser.parse_args(argv)
+    cache = None if args.no_cache else ParseCache(__version__, directory=args.cache_dir)
+    case_diff = diff.diff_files(args.file_a, args.file_b, args.threshold, cache=cache)
+    output_file = args.output or diff.get_output_filename(args.file_a, args.file_b)
+    eddy.write_output(output_file, diff.get_html(case_diff))
+    if args.json:
+        diff.write_json(case_diff, args.json)
+    print(f"{int(case_diff.significant.sum())} of {len(case_diff)} results changed significantly, "
+          f"{output_file} created.")
+    return 0
+
+
+def libraries_main(argv):
+    """Run 'eddy libraries', to list the nuclear data libraries used by many outputs.
+
+    Args:
+        argv (list): The arguments after 'libraries'
+
+    Returns:
+        int: The exit code; 1 if any output could not be looked up, otherwise 0
+    """
+    parser = argparse.ArgumentParser(prog='eddy libraries',
+                                     description='List the nuclear data libraries used by MCNP outputs')
+    parser.add_argument("file", nargs='*',
+                        help="MCNP output files, glob patterns, directories or @listfiles "
+                             "(default: every output in the cache)")
+    parser.add_argument("-l", "--library",
+                        help="Only list the outputs that used a library whose name contains this, e.g. endf71")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIRECTORY,
+                        help="Directory for the cache of parsed outputs")
+    args = parser.parse_args(argv)
+    cache = ParseCache(__version__, directory=args.cache_dir)
+    files, unmatched = batch.expand_inputs(args.file) if args.file else (None, [])
+    results, failures = libraries.find_libraries(cache, files, args.library)
+    for line in libraries.format_libraries(results, unmatched + failures):
+        print(line)
+    return 1 if unmatched or failures else 0
+
+
+def convert_main(argv):
+    """Convert one or more outputs to html, or follow an output while it is being written.
+
+    Args:
+        argv (list): The command line arguments
+
+    Returns:
+        int: The exit code; 1 if any file could not be converted, otherwise 0
+    """
+    parser = argparse.ArgumentParser(prog='eddy', description='MCNP or SCALE output to HTML Converter')
+    parser.add_argument("file", nargs='+',
+                        help="MCNP or SCALE output files, glob patterns, directories or @listfiles")
+    parser.add_argument("-sf", "--scaling_factor", type=float, nargs='+', default=[1.0],
+                        help="Scaling Factor; give several to write one report for each from a single parse")
+    parser.add_argument("-f", "--follow", action="store_true",
+                        help="Keep converting an MCNP output while it is being written")
+    parser.add_argument("-i", "--interval", type=float, default=eddy.FOLLOW_INTERVAL,
+                        help="Seconds between checks of the output with --follow")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIRECTORY,
+                        help="Directory for the cache of parsed outputs")
+    parser.add_argument("--no-cache", action="store_true", help="Parse the output without using the cache")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of files to convert at once (default: one per cpu)")
+    args = parser.parse_args(argv)
+
+    scaling_factors = args.scaling_factor
+    cache_directory = None if args.no_cache else args.cache_dir
+    single_file = len(args.file) == 1 and not args.file[0].startswith('@') and os.path.isfile(args.file[0])
+
+    if args.follow:
+        if not single_file:
+            parser.error("--follow needs a single output file")
+        if len(scaling_factors) > 1:
+            parser.error("only one scaling factor can be used with --follow")
+        eddy.follow(args.file[0], scaling_factors[0], interval=args.interval)
+        return 0
+    if single_file:
+        cache = None if cache_directory is None else ParseCache(__version__, directory=cache_directory)
+        eddy.main(args.file[0], scaling_factors, cache=cache)
+        return 0
+    files, unmatched = batch.expand_inputs(args.file)
+    results = batch.convert_all(files, scaling_factors, workers=args.jobs, cache_directory=cache_directory)
+    failures = batch.print_summary(unmatched + results)
+    return 1 if failures else 0
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""This module compares two MCNP or SCALE outputs, for the 'eddy diff' command, to show which
+results moved by more than their combined statistical uncertainty after a change to a model.
+
+Every result of each case (each tally region and bin, k-effective, and the cell volumes and
+masses) is given a key naming what it is, e.g. 'tally 4 / Cell 3 / energy 1.0000E+00', so the
+results of the two cases are aligned by what they are rather than where they are printed.
+The results are held as arrays, so that the ratios and deviations of tens of thousands of
+tally bins are worked out at once. The deviation of a result is its change divided by the
+combined standard deviation of the two results; cell volumes and masses have no uncertainty,
+so any change to them is an infinite deviation.
+"""
+
+# Imports from standard library
+import os
+import json
+import datetime
+import itertools
+from collections import namedtuple
+try:
+    import importlib.resources as pkg_resources
+except ImportError:
+    import importlib_resources as pkg_resources
+# Third party imports
+import numpy as np
+from jinja2 import Template
+from markupsafe import Markup
+# Local imports
+from . import eddy
+from . import static
+from .mcnp.tallies import RawTally
+
+# The deviation, in combined standard deviations, beyond which a change is significant
+DEFAULT_THRESHOLD = 3.0
+# The largest number of changed results listed in the html
+MAX_DIFF_ROWS = 1000
+
+# The results of one case, as parallel arrays with one entry per result.
+#   sections (numpy.ndarray): the part of the case each result is in, e.g. 'tally 4' or 'k-effective'
+#   keys (numpy.ndarray): the unique name of each result, e.g. 'tally 4 / Cell 3'
+#   values (numpy.ndarray): the value of each result
+#   errors (numpy.ndarray): the relative error of each result (0 if it is exact)
+ResultTable = namedtuple('ResultTable', ['sections', 'keys', 'values', 'errors'])
+
+# The comparison of the results in one section.
+#   section (str): the part of the cases compared, e.g. 'tally 4'
+#   compared (int): the number of results found in both cases
+#   significant (int): the number of results that changed significantly
+#   largest (float): the largest deviation, in combined standard deviations (0 if nothing was compared)
+SectionSummary = namedtuple('SectionSummary', ['section', 'compared', 'significant', 'largest'])
+
+
+class CaseDiff:
+    """The comparison of the results two cases have in common, as parallel arrays, with the keys of the
+    results found in only one of the cases.
+    """
+
+    def __init__(self, name_a, name_b, sections, keys, value_a, error_a, value_b, error_b,
+                 only_a, only_b, threshold=DEFAULT_THRESHOLD):
+        """
+        Args:
+            name_a (str): The name of the first case
+            name_b (str): The name of the second case
+            sections (numpy.ndarray): The section of each result found in both cases
+            keys (numpy.ndarray): The key of each result found in both cases
+            value_a (numpy.ndarray): The value of each result in the first case
+            error_a (numpy.ndarray): The relative error of each result in the first case
+            value_b (numpy.ndarray): The value of each result in the second case
+            error_b (numpy.ndarray): The relative error of each result in the second case
+            only_a (list): The keys of the results found only in the first case
+            only_b (list): The keys of the results found only in the second case
+            threshold (float): The deviation beyond which a change is significant
+        """
+        self.name_a = name_a
+        self.name_b = name_b
+        self.sections = sections
+        self.keys = keys
+        self.value_a = value_a
+        self.error_a = error_a
+        self.value_b = value_b
+        self.error_b = error_b
+        self.only_a = only_a
+        self.only_b = only_b
+        self.threshold = threshold
+        self.ratios, self.deviations = get_deviations(value_a, error_a, value_b, error_b)
+
+    def __repr__(self):
+        return f"CaseDiff of {self.name_a} and {self.name_b}, {len(self)} results compared"
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def significant(self):
+        """numpy.ndarray: True for each result that changed by more than the threshold"""
+        return np.abs(self.deviations) > self.threshold
+
+    def summary(self):
+        """Summarise the comparison of each section, in the order the sections appear in the first case.
+
+        Returns:
+            list: A SectionSummary for each section
+        """
+        names, first, groups = np.unique(self.sections, return_index=True, return_inverse=True)
+        groups = groups.reshape(-1)
+        compared = np.bincount(groups, minlength=len(names))
+        significant = np.bincount(groups, weights=self.significant, minlength=len(names))
+        largest = np.zeros(len(names))
+        np.maximum.at(largest, groups, np.abs(self.deviations))
+        return [SectionSummary(str(names[n]), int(compared[n]), int(significant[n]), float(largest[n]))
+                for n in np.argsort(first)]
+
+    def changes(self, limit=None):
+        """Get the results that changed significantly, largest deviation first.
+
+        Args:
+            limit (int): The largest number of results to return (by default, all of them)
+
+        Returns:
+            list: A dict for each result, of its key, section, both values and errors, ratio and deviation
+        """
+        positions = np.nonzero(self.significant)[0]
+        positions = positions[np.argsort(-np.abs(self.deviations[positions]), kind='stable')][:limit]
+        return [self.row(n) for n in positions]
+
+    def row(self, n):
+        """Get the comparison of one result as a dict.
+
+        Args:
+            n (int): The position of the result
+
+        Returns:
+            dict: The key, section, both values and errors, ratio and deviation of the result
+        """
+        return {
+            'key': str(self.keys[n]),
+            'section': str(self.sections[n]),
+            'value_a': float(self.value_a[n]),
+            'error_a': float(self.error_a[n]),
+            'value_b': float(self.value_b[n]),
+            'error_b': float(self.error_b[n]),
+            'ratio': float(self.ratios[n]),
+            'deviation': float(self.deviations[n]),
+        }
+
+    def as_dict(self, limit=None):
+        """Get the comparison as a dict that can be written as JSON. JSON has no infinity or nan, so
+        ratios and deviations that are not finite (e.g. a changed cell mass) are written as null.
+
+        Args:
+            limit (int): The largest number of changed results to include (by default, all of them)
+
+        Returns:
+            dict: The names of the cases, the threshold, the summary of each section, the changed
+                results, and the keys of the results found in only one case
+        """
+        changes = self.changes(limit)
+        for change in changes:
+            for name in ('ratio', 'deviation'):
+                if not np.isfinite(change[name]):
+                    change[name] = None
+        return {
+            'case_a': self.name_a,
+            'case_b': self.name_b,
+            'threshold': self.threshold,
+            'compared': len(self),
+            'significant': int(self.significant.sum()),
+            'sections': [summary._asdict() for summary in self.summary()],
+            'changes': changes,
+            'only_in_a': list(self.only_a),
+            'only_in_b': list(self.only_b),
+        }
+
+
+def get_deviations(value_a, error_a, value_b, error_b):
+    """Work out the ratio of each pair of results, and their difference in combined standard deviations.
+
+    Args:
+        value_a (numpy.ndarray): The values of the first case
+        error_a (numpy.ndarray): The relative errors of the first case
+        value_b (numpy.ndarray): The values of the second case
+        error_b (numpy.ndarray): The relative errors of the second case
+
+    Returns:
+        tuple:
+            numpy.ndarray: The ratio b / a of each pair (nan where a is zero, unless b is zero too)
+            numpy.ndarray: The deviation (b - a) / sigma of each pair (+/- infinity if an exact result changed)
+    """
+    difference = value_b - value_a
+    sigma = np.hypot(value_a * error_a, value_b * error_b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(value_a != 0, value_b / value_a, np.where(value_b == 0, 1.0, np.nan))
+        deviations = np.where(sigma > 0, difference / sigma, np.sign(difference) * np.inf)
+    deviations[difference == 0] = 0.0
+    return ratios, deviations
+
+
+def compare(table_a, table_b, name_a='a', name_b='b', threshold=DEFAULT_THRESHOLD):
+    """Align the results of two cases by their keys, and compare the results found in both.
+
+    Args:
+        table_a (ResultTable): The results of the first case
+        table_b (ResultTable): The results of the second case
+        name_a (str): The name of the first case
+        name_b (str): The name of the second case
+        threshold (float): The deviation beyond which a change is significant
+
+    Returns:
+        CaseDiff: The comparison
+    """
+    _, in_a, in_b = np.intersect1d(table_a.keys, table_b.keys, return_indices=True)
+    # the results are listed in the order of the first case
+    order = np.argsort(in_a)
+    in_a, in_b = in_a[order], in_b[order]
+    only_a = np.delete(table_a.keys, in_a)
+    only_b = np.delete(table_b.keys, in_b)
+    return CaseDiff(name_a, name_b, table_a.sections[in_a], table_a.keys[in_a],
+                    table_a.values[in_a], table_a.errors[in_a], table_b.values[in_b], table_b.errors[in_b],
+                    [str(key) for key in only_a], [str(key) for key in only_b], threshold)
+
+
+def get_result_table(case):
+    """Collect every result of a case that can be compared, each with a unique key.
+
+    Args:
+        case (EddyMCNPCase or EddySCALECase): The case
+
+    Returns:
+        ResultTable: The results of the case
+    """
+    sections, keys, values, errors = [], [], [], []
+
+    def add(section, key, value, error):
+        sections.append(section)
+        keys.append(f"{section} / {key}")
+        values.append(value)
+        errors.append(error)
+
+    for tally in case.tally_list:
+        if isinstance(tally, RawTally):
+            continue
+        section = f"tally {tally.tally_number}"
+        if not hasattr(tally, 'results'):
+            # a SCALE tally has a single response
+            add(section, tally.type, tally.response, tally.rel_uncertainty)
+            continue
+        results = tally.results
+        for n in range(len(results)):
+            label = ' '.join(str(results.labels[n]).split()) if results.labels is not None else f"detector {n + 1}"
+            add(section, label, results.values[n], results.errors[n])
+            bins = results.bins[n] if results.bins is not None else None
+            if bins is not None:
+                edges = [bins.edges[axis] for axis in bins.axes]
+                for edge, value, error in zip(itertools.product(*edges), bins.values.ravel(), bins.errors.ravel()):
+                    name = ', '.join(f"{axis} {' '.join(str(e).split())}" for axis, e in zip(bins.axes, edge))
+                    add(section, f"{label} / {name}", value, error)
+    for half in ('first half', 'second half', 'final'):
+        k_eff = getattr(case, 'k_effective', None) or {}
+        if f'{half} k_eff' in k_eff:
+            value = k_eff[f'{half} k_eff']
+            add('k-effective', half, value, k_eff[f'{half} stdev'] / value if value else 0.0)
+    for cell in getattr(case, 'cell_list', []):
+        add('cells', f"cell {cell.cell_number} volume", cell.volume, 0.0)
+        add('cells', f"cell {cell.cell_number} mass", cell.mass, 0.0)
+    return ResultTable(np.array(sections, dtype=str), unique_keys(keys),
+                       np.array(values, dtype=float), np.array(errors, dtype=float))
+
+
+def unique_keys(keys):
+    """Make the keys unique, numbering the second and later results with the same key, e.g. 'tally 4 / Cell 3 #2',
+    so that two results with the same label are each compared with their counterpart.
+
+    Args:
+        keys (list): The key of each result
+
+    Returns:
+        numpy.ndarray: The unique keys
+    """
+    seen = {}
+    unique = []
+    for key in keys:
+        count = seen.get(key, 0) + 1
+        seen[key] = count
+        unique.append(key if count == 1 else f"{key} #{count}")
+    return np.array(unique, dtype=str)
+
+
+def diff_files(file_a, file_b, threshold=DEFAULT_THRESHOLD, cache=None):
+    """Compare two output files.
+
+    Args:
+        file_a (str): The first output file
+        file_b (str): The second output file
+        threshold (float): The deviation beyond which a change is significant
+        cache (ParseCache): An optional cache of parsed cases
+
+    Returns:
+        CaseDiff: The comparison
+    """
+    case_a = eddy.load_case(file_a, cache)
+    case_b = eddy.load_case(file_b, cache)
+    if type(case_a) is not type(case_b):
+        raise Exception(f"{case_a.name} and {case_b.name} are outputs of different codes, so cannot be compared")
+    return compare(get_result_table(case_a), get_result_table(case_b), case_a.name, case_b.name, threshold)
+
+
+def get_html(case_diff, max_rows=MAX_DIFF_ROWS):
+    """Get the html of a comparison from the jinja template.
+
+    Args:
+        case_diff (CaseDiff): The comparison
+        max_rows (int): The largest number of changed results to list
+
+    Returns:
+        str: The completed html
+    """
+    inline_css = pkg_resources.read_text(static, 'style.css')
+    html_template = pkg_resources.read_text(static, 'diff_template.html')
+    # autoescape replaces any html control characters in the keys as they are rendered
+    template = Template(html_template, autoescape=True)
+    return template.render(
+        diff=case_diff,
+        inline_css=Markup(inline_css),  # the css is trusted, so is not escaped
+        date=datetime.datetime.now().strftime("%Y/%m/%d"),
+        time=datetime.datetime.now().strftime("%H:%M:%S"),
+        summary=case_diff.summary(),
+        changes=case_diff.changes(max_rows),
+        significant=int(case_diff.significant.sum()),
+        max_rows=max_rows,
+    )
+
+
+def write_json(case_diff, filename):
+    """Write a comparison to a JSON file.
+
+    Args:
+        case_diff (CaseDiff): The comparison
+        filename (str): The file path (including the name) of the JSON file
+    """
+    with open(filename, 'w') as file:
+        json.dump(case_diff.as_dict(), file, indent=1)
+
+
+def get_output_filename(file_a, file_b):
+    """Get the name of the html file to write for a comparison, e.g. 'case_vs_case2.html' next to the first file.
+
+    Args:
+        file_a (str): The first output file
+        file_b (str): The second output file
+
+    Returns:
+        str: The file path (including the name) of the html file
+    """
+    second = os.path.basename(eddy.get_output_filename(file_b))
+    return eddy.get_output_filename(file_a)[:-len('.html')] + '_vs_' + second
@@ -32,63 +32,309 @@ Alternatively, main() can be called directly by another module and provided with
 # Imports from standard library
 import re
 import os.path
+import time
 import argparse
+from collections import namedtuple
 from tkinter import Tk, simpledialog
 from tkinter.filedialog import askopenfilename
-from jinja2 import escape
 # Local imports
 if __name__ == "__main__":
+    from line_reader import MappedLines, read_head, strip_compression_extension
     from scale import scale_html_writer
     from scale.eddy_scale_case import EddySCALECase
     from mcnp import mcnp_html_writer
     from mcnp.eddy_mcnp_case import EddyMCNPCase
 else:
+    from .line_reader import MappedLines, read_head, strip_compression_extension
     from .scale import scale_html_writer
     from .scale.eddy_scale_case import EddySCALECase
     from .mcnp import mcnp_html_writer
     from .mcnp.eddy_mcnp_case import EddyMCNPCase
 
 
+# The number of seconds follow waits between checks of a file that is still being written
+FOLLOW_INTERVAL = 30
+
+
 class NotAcceptedFileTypeError(Exception):
     """Raised when the file selected is not recognised as a SCALE or MCNP output"""
 
 
-def main(filename=None, scaling_factor=None):
+# A kind of output file that Eddy can convert.
+#   name (str): the name of the code that wrote the output, e.g. 'MCNP'
+#   detect (callable): takes the first few lines of a file, returns True if the file is this kind of output
+#   create_case (callable): takes (filename, output_data, scaling_factor, crit_case), returns the case object
+#   html_writer (module): the module whose get_html function turns the case into html
+OutputType = namedtuple('OutputType', ['name', 'detect', 'create_case', 'html_writer'])
+
+# Every kind of output Eddy can convert, in the order they are checked.
+# New codes are added with register_output_type.
+OUTPUT_TYPES = []
+
+
+def register_output_type(name, detect, create_case, html_writer):
+    """Add a kind of output to the ones Eddy can convert.
+
+    Args:
+        name (str): The name of the code that wrote the output, e.g. 'MCNP'
+        detect (callable): Takes the first few lines of a file, returns True if the file is this kind of output
+        create_case (callable): Takes (filename, output_data, scaling_factor, crit_case), returns the case object
+        html_writer (module): The module whose get_html function turns the case into html
+    """
+    OUTPUT_TYPES.append(OutputType(name, detect, create_case, html_writer))
+
+
+def main(filename=None, scaling_factor=None, cache=None):
     """Entry point to Eddy. Can take filename and scaling factor as arguments.
-    Call get_args to find the filename & scaling factor if not provided, and also get the
+    Work out whether the file is an MCNP or SCALE output from its first few lines, before
+    reading the rest of it.
+    Call get_args to find the scaling factor if not provided, and also get the
     output data and determine whether it is a crit case.
-    Determine whether it is an MCNP or SCALE case;
-    call the relevant converter.
+    Call the relevant converter once for each scaling factor; the output is only parsed once.
+
+    Args:
+        filename (str): the file path (including the name) of the output file
+        scaling_factor (float or list): A number by which the results will be multiplied,
+            or a list of numbers, to write one html file for each (named e.g. case_sf2.5.html)
+        cache (ParseCache): An optional cache of parsed cases, to skip parsing an output seen before
+    """
+    filename = get_filename(filename)
+    output_type = detect_output_type(filename)
+    if output_type is None:
+        raise NotAcceptedFileTypeError("This file doesn't seem to be an MCNP or SCALE output?")
+
+    if isinstance(scaling_factor, (list, tuple)):
+        scaling_factors = list(scaling_factor)
+    else:
+        scaling_factors = [scaling_factor]
+
+    if cache is None:
+        filename, output_data, scaling_factor, crit_case = get_args(filename, scaling_factors[0])
+        case = output_type.create_case(filename, output_data, scaling_factor, crit_case)
+    else:
+        case, scaling_factor, crit_case, cached = get_cached_case(filename, scaling_factors[0], output_type, cache)
+
+    if crit_case:
+        # crit cases are not scaled, so there is only one html file to write
+        scaling_factors = [scaling_factor]
+    else:
+        scaling_factors = [scaling_factor] + [get_scaling_factor(factor) for factor in scaling_factors[1:]]
+    for factor in scaling_factors:
+        try:
+            html = output_type.html_writer.get_html(case.scaled(factor))
+        except Exception:
+            if cache is None or not cached:
+                raise
+            # a cached case that this version of Eddy cannot write out is treated as a miss
+            print(f"The cached case for {filename} could not be written out, so the output is read again")
+            cache.discard(cache.get_key(filename))
+            case, scaling_factor, crit_case, cached = get_cached_case(filename, scaling_factor, output_type, cache)
+            html = output_type.html_writer.get_html(case.scaled(factor))
+        if len(scaling_factors) > 1:
+            output_file = get_output_filename(filename, factor)
+        else:
+            output_file = get_output_filename(filename)
+        write_output(output_file, html)
+        print(f"Eddy run complete, {output_file} created.\n")
+
+
+def get_cached_case(filename, scaling_factor, output_type, cache):
+    """Load a case from the parse cache, or parse the output and add it to the cache
+    if it is not there.
 
     Args:
         filename (str): the file path (including the name) of the output file
         scaling_factor (float): A number by which the results will be multiplied
+        output_type (OutputType): The kind of output, from detect_output_type
+        cache (ParseCache): The cache of parsed cases
+
+    Returns:
+        tuple:
+            EddyMCNPCase or EddySCALECase: The (unscaled) case
+            float: The scaling factor, checked or asked for as get_args would
+            bool: True if kcode case, otherwise False
+            bool: True if the case was read from the cache, False if the output was parsed
     """
+    key = cache.get_key(filename)
+    case = cache.load(key)
+    cached = case is not None
+    if case is None:
+        filename, output_data, scaling_factor, crit_case = get_args(filename, scaling_factor)
+        case = output_type.create_case(filename, output_data, scaling_factor, crit_case)
+        cache.store(key, case)
+    else:
+        # the same output may have been converted from another location
+        case.filepath = filename
+        case.name = filename.replace('\\', '/').split('/')[-1]
+        crit_case = getattr(case, 'crit_case', False)
+        if crit_case:
+            scaling_factor = 1
+        else:
+            scaling_factor = get_scaling_factor(scaling_factor)
+        case.scaling_factor = scaling_factor
+        print(f"Output file selected: {filename} (read from the cache)")
+    return case, scaling_factor, crit_case, cached
+
+
+def load_case(filename, cache=None):
+    """Read an output file unscaled, without asking for a scaling factor, e.g. to compare it with another
+    output (the scaling factor does not change ratios or deviations) or to find the libraries it used.
 
+    Args:
+        filename (str): The file path (including the name) of the output file
+        cache (ParseCache): An optional cache of parsed cases
 
-    filename, output_data, scaling_factor, crit_case = get_args(filename, scaling_factor)
+    Returns:
+        EddyMCNPCase or EddySCALECase: The case
+    """
+    output_type = detect_output_type(filename)
+    if output_type is None:
+        raise NotAcceptedFileTypeError(f"{filename} doesn't seem to be an MCNP or SCALE output?")
+    if cache is not None:
+        case, scaling_factor, crit_case, cached = get_cached_case(filename, 1.0, output_type, cache)
+        return case
+    filename, output_data, scaling_factor, crit_case = get_args(filename, 1.0)
+    return output_type.create_case(filename, output_data, scaling_factor, crit_case)
+
+
+def follow(filename=None, scaling_factor=None, interval=FOLLOW_INTERVAL, polls=None):
+    """Convert an MCNP output that is still being written, then keep watching the file and
+    re-write the html whenever MCNP adds to it (e.g. a PRDMP dump of the tallies).
+    Only the part of the file added since the last check is read each time.
+    Stops when MCNP finishes the run, or after the given number of checks.
 
-    if 'SCALE' in output_data[2]:
-        case = EddySCALECase(
-            filepath=filename,
-            file=output_data,
-            scaling_factor=scaling_factor,
-        )
-        html = scale_html_writer.get_html(case)
-    elif 'Code Name &amp; Version = MCNP' in output_data[0]:
-        case = EddyMCNPCase(
-            filepath=filename,
-            scaling_factor=scaling_factor,
-            file=output_data,
-            crit_case=crit_case,
-        )
-        html = mcnp_html_writer.get_html(case)
+    Args:
+        filename (str): the file path (including the name) of the output file
+        scaling_factor (float): A number by which the results will be multiplied
+        interval (float): The number of seconds to wait between checks of the file
+        polls (int): The number of times to check the file, or None to check until the run finishes
+    """
+    filename = get_filename(filename)
+    output_type = detect_output_type(filename)
+    if output_type is None or output_type.name != 'MCNP':
+        raise NotAcceptedFileTypeError("Only MCNP outputs can be followed while they are being written")
+
+    output_data = MappedLines(filename, follow=True)
+    checks = 0
+    # wait until MCNP has echoed all of the input deck, so that a kcode card is not missed
+    while not check_input_written(output_data):
+        if polls is not None and checks >= polls:
+            return
+        time.sleep(interval)
+        checks += 1
+        output_data.refresh()
+    crit_case = check_if_crit(output_data)
+    if crit_case:
+        scaling_factor = 1
     else:
-        raise NotAcceptedFileTypeError("This file doesn't seem to be an MCNP or SCALE output?")
-    output_file, extension = os.path.splitext(filename)
-    output_file += '.html'
-    write_output(output_file, html)
-    print(f"Eddy run complete, {output_file} created.\n")
+        scaling_factor = get_scaling_factor(scaling_factor)
+    print(f"Output file selected: {filename}")
+
+    case = EddyMCNPCase(
+        filepath=filename,
+        scaling_factor=scaling_factor,
+        file=output_data,
+        crit_case=crit_case,
+        following=True,
+    )
+    output_file = get_output_filename(filename)
+    write_output(output_file, mcnp_html_writer.get_html(case))
+    print(f"{output_file} created, following {filename} for updates.")
+
+    while not case.check_finished() and (polls is None or checks < polls):
+        time.sleep(interval)
+        checks += 1
+        if output_data.refresh() and case.update():
+            write_output(output_file, mcnp_html_writer.get_html(case))
+            print(f"{output_file} updated ({len(case.tally_list)} tallies read).")
+    if case.check_finished():
+        print(f"Eddy run complete, {output_file} created.\n")
+
+
+def check_input_written(output_data):
+    """Check whether MCNP has finished echoing the input deck at the start of the output:
+    the echo comes after the first page heading, and is followed by the second.
+
+    Args:
+        output_data (list): The text of the output file
+
+    Returns:
+        bool: True if the whole input deck has been written, otherwise False
+    """
+    headings = 0
+    for line in output_data:
+        if line.startswith('1'):
+            headings += 1
+            if headings == 2:
+                return True
+    return False
+
+
+def get_output_filename(filename, scaling_factor=None):
+    """Get the name of the html file to write for an output file,
+    e.g. 'case.out' or 'case.out.gz' becomes 'case.html'
+
+    Args:
+        filename (str): The file path (including the name) of the output file
+        scaling_factor (float): If given, the scaling factor is added to the name, e.g. 'case_sf2.5.html'
+
+    Returns:
+        str: The file path (including the name) of the html file
+    """
+    output_file, extension = os.path.splitext(strip_compression_extension(filename))
+    if scaling_factor is not None:
+        output_file += f"_sf{scaling_factor:g}"
+    return output_file + '.html'
+
+
+def detect_output_type(filename):
+    """Work out which code wrote an output file, from only the first few lines of the file,
+    so that a file Eddy cannot convert is rejected without reading all of it.
+
+    Args:
+        filename (str): The file path (including the name) of the output file
+
+    Returns:
+        OutputType: The kind of output, or None if the file is not recognised
+    """
+    head = read_head(filename)
+    for output_type in OUTPUT_TYPES:
+        if output_type.detect(head):
+            return output_type
+    return None
+
+
+def is_scale_output(head):
+    """SCALE outputs give the programme name on the third line of the banner."""
+    return len(head) > 2 and 'SCALE' in head[2]
+
+
+def is_mcnp_output(head):
+    """MCNP outputs start with the code name and version."""
+    return len(head) > 0 and 'Code Name & Version = MCNP' in head[0]
+
+
+def create_scale_case(filename, output_data, scaling_factor, crit_case):
+    """Create an EddySCALECase (SCALE cases do not use crit_case)."""
+    return EddySCALECase(
+        filepath=filename,
+        file=output_data,
+        scaling_factor=scaling_factor,
+    )
+
+
+def create_mcnp_case(filename, output_data, scaling_factor, crit_case):
+    """Create an EddyMCNPCase."""
+    return EddyMCNPCase(
+        filepath=filename,
+        scaling_factor=scaling_factor,
+        file=output_data,
+        crit_case=crit_case,
+    )
+
+
+register_output_type('SCALE', is_scale_output, create_scale_case, scale_html_writer)
+register_output_type('MCNP', is_mcnp_output, create_mcnp_case, mcnp_html_writer)
 
 
 def get_args(filename=None, scaling_factor=None):
@@ -141,7 +387,11 @@ def get_filename(filename=None):
         Tk().withdraw()
         filename = askopenfilename(
             title="Select Output File",
-            filetypes=(("output files", "*.out"), ("all files", "*.*"))
+            filetypes=(
+                ("output files", "*.out"),
+                ("compressed output files", "*.out.gz *.out.bz2 *.out.xz *.out.zst"),
+                ("all files", "*.*"),
+            )
             )
 
     # check file exists
@@ -150,38 +400,22 @@ def get_filename(filename=None):
 
 
 def read_file(filename):
-    """Read in the output file.
+    """Read in the output file. The file is memory-mapped rather than read into a list,
+    so that very large outputs can be converted without holding every line in memory.
+    Compressed outputs (.gz, .bz2, .xz or .zst) are decompressed as they are read.
+    The lines are not sanitized; html control characters are escaped by the jinja
+    templates when the results are rendered.
 
     Args:
         filename (str): The name (and location) of the .out file
 
     Returns:
-        data (list): The lines from the output file
+        data (MappedLines): The lines from the output file
     """
-    with open(filename, 'r') as file:
-        data = file.readlines()
-    data = sanitize_list(data)
+    data = MappedLines(filename)
     return data
 
 
-def sanitize_list(text):
-    """Replace any html control characters in any string in the
-    list with the appropriate html codes to stop
-    them from being interpreted as html tags.
-
-    Args:
-        text [list]: a list of strings
-
-    Returns:
-        list: The sanitized version of the list
-    """
-    sanitized_text = []
-    for line in text:
-        line = str(escape(line))
-        sanitized_text.append(line)
-    return sanitized_text
-
-
 def check_if_crit(output_data):
     """Read through output data to check if case is crit or shielding
 
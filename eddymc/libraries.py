@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""This module finds the nuclear data libraries used by many MCNP outputs, for the 'eddy libraries'
+command, e.g. to find which runs used ENDF/B-VII.1 rather than ENDF/B-VIII.0 data.
+
+The libraries are read from the summaries the parse cache keeps beside each cached case, so the
+whole cache can be searched without naming any files. The cache key of a named output is kept in
+the cache's index of file sizes and modification times, so an output that has been looked up
+before, and has not changed since, is not read again. An output that is not in the cache is
+parsed once, and added to it.
+"""
+
+# Local imports
+from .batch import Result
+from .eddy import load_case
+
+
+def get_libraries(filename, cache, key=None):
+    """Get the number of cross-section tables an output read from each library.
+
+    Args:
+        filename (str): The file path (including the name) of the output file
+        cache (ParseCache): The cache of parsed cases
+        key (str): The cache key of the output, if it is already known (by default, the output is hashed)
+
+    Returns:
+        dict: The number of tables read from each library, keyed by library (empty for a SCALE output)
+    """
+    summary = cache.load_summary(key or cache.get_key(filename))
+    if summary is None:
+        case = load_case(filename, cache)
+        summary = case.get_cache_summary() if hasattr(case, 'get_cache_summary') else {'libraries': {}}
+    return summary['libraries']
+
+
+def find_libraries(cache, files=None, library=None):
+    """Find the libraries used by a set of outputs, or by every output in the cache.
+    An output that cannot be read does not stop the rest being looked up.
+
+    Args:
+        cache (ParseCache): The cache of parsed cases
+        files (list): The output files to look up (by default, every output in the cache)
+        library (str): Only keep the outputs that used a library whose name contains this, ignoring case
+
+    Returns:
+        tuple:
+            dict: The number of tables read from each library, keyed by output file path
+            list: A Result for each output that could not be looked up
+    """
+    results = {}
+    failures = []
+    if files:
+        keys = cache.find_keys(files)
+        for filename in files:
+            try:
+                results[filename] = get_libraries(filename, cache, keys.get(filename))
+            except Exception as error:
+                failures.append(Result(filename, False, f"{type(error).__name__}: {error}"))
+    else:
+        results = {summary['filepath']: summary['libraries'] for summary in cache.summaries().values()}
+    if library is not None:
+        results = {filename: libraries for filename, libraries in results.items()
+                   if any(library.lower() in name.lower() for name in libraries)}
+    return results, failures
+
+
+def format_libraries(results, failures=()):
+    """Describe the libraries used by each output, one line per output, followed by the outputs
+    that could not be looked up (in the same way as batch.print_summary lists failed conversions).
+
+    Args:
+        results (dict): The libraries of each output, from find_libraries
+        failures (list): The Result of each output or argument that could not be looked up
+
+    Returns:
+        list: The lines, in order of file path
+    """
+    lines = []
+    for filename in sorted(results):
+        libraries = ', '.join(f"{name} ({tables} tables)" for name, tables in results[filename].items())
+        lines.append(f"{filename}: {libraries or 'no cross-section tables'}")
+    for result in failures:
+        lines.append(f"FAILED  {result.filename}: {result.message}")
+    if failures:
+        lines.append(f"\n{len(results)} listed, {len(failures)} failed.")
+    return lines
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""This module contains the MappedLines class, which gives the MCNP and SCALE parsers a
+read-only list of the lines in an output file without reading the whole file into memory.
+
+The file is memory-mapped, and only the offset of the start of each line is stored,
+so a multi-gigabyte output costs 8 bytes per line rather than a Python string per line.
+A line is decoded only when it is read, and slicing a MappedLines returns another
+MappedLines over the same buffer rather than copying the lines.
+
+Compressed outputs (gzip, bzip2, xz, and zstandard if the zstandard package is installed)
+are recognised by their first few bytes and decompressed in a stream into an anonymous
+temporary file, which is memory-mapped in the same way, so a big compressed output does not
+have to fit in memory either. The temporary file is deleted when the lines are no longer used.
+
+An output that is still being written can be followed: refresh maps the file again and
+looks for line breaks only in the bytes appended since the last read.
+"""
+
+# Imports from standard library
+import os
+import bz2
+import gzip
+import lzma
+import mmap
+import shutil
+import tempfile
+from array import array
+from collections.abc import Sequence
+# Third party imports
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# The first bytes of each compressed file format
+COMPRESSION_MAGIC = {
+    'gzip': b'\x1f\x8b',
+    'bzip2': b'BZh',
+    'xz': b'\xfd7zXZ\x00',
+    'zstandard': b'\x28\xb5\x2f\xfd',
+}
+# The file extensions used for each compressed file format
+COMPRESSION_EXTENSIONS = ('.gz', '.bz2', '.xz', '.zst')
+# The number of bytes decompressed at a time
+CHUNK_SIZE = 1024 * 1024
+# The number of bytes read from the start of a file to work out what kind of output it is
+HEAD_SIZE = 4096
+
+
+def detect_compression(filename):
+    """Determine whether a file is compressed, from its first few bytes.
+
+    Args:
+        filename (str): The file path (including the name) of the file
+
+    Returns:
+        str: The name of the compression format, or None if the file is not compressed
+    """
+    with open(filename, 'rb') as file:
+        start = file.read(6)
+    for compression, magic in COMPRESSION_MAGIC.items():
+        if start.startswith(magic):
+            return compression
+    return None
+
+
+def open_decompressed(file, compression):
+    """Open a stream that decompresses a file as it is read.
+
+    Args:
+        file (file): The compressed file, opened in binary mode
+        compression (str): The name of the compression format, as returned by detect_compression
+
+    Returns:
+        file: A binary stream of the decompressed contents
+    """
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=file)
+    elif compression == 'bzip2':
+        return bz2.BZ2File(file)
+    elif compression == 'xz':
+        return lzma.LZMAFile(file)
+    elif compression == 'zstandard':
+        if zstandard is None:
+            raise ImportError("The zstandard package is needed to read zstandard-compressed files")
+        return zstandard.ZstdDecompressor().stream_reader(file)
+    else:
+        raise ValueError(f"{compression} is not a recognised compression format")
+
+
+def read_compressed(filename, compression):
+    """Decompress a file in a stream of chunks into an anonymous temporary file, and memory-map it.
+
+    Args:
+        filename (str): The file path (including the name) of the file
+        compression (str): The name of the compression format, as returned by detect_compression
+
+    Returns:
+        mmap or bytes: The map of the decompressed contents (or an empty bytes object if there are none)
+    """
+    # the temporary file has no name, and is deleted once the file and the map of it are closed
+    with tempfile.TemporaryFile() as decompressed:
+        with open(filename, 'rb') as file:
+            with open_decompressed(file, compression) as stream:
+                shutil.copyfileobj(stream, decompressed, CHUNK_SIZE)
+        decompressed.flush()
+        if decompressed.tell():
+            # the map keeps its own handle, so the file can be closed straight away
+            return mmap.mmap(decompressed.fileno(), 0, access=mmap.ACCESS_READ)
+        return b''    # zero-length files cannot be mapped
+
+
+def read_head(filename, size=HEAD_SIZE):
+    """Read the lines at the start of a file, decompressing it if necessary, without reading the rest.
+
+    Args:
+        filename (str): The file path (including the name) of the file
+        size (int): The number of bytes to read
+
+    Returns:
+        list: The lines from the start of the file (the last one may be incomplete)
+    """
+    compression = detect_compression(filename)
+    with open(filename, 'rb') as file:
+        if compression:
+            with open_decompressed(file, compression) as stream:
+                head = stream.read(size)
+        else:
+            head = file.read(size)
+    return head.decode('utf-8', 'replace').replace('\r\n', '\n').splitlines(keepends=True)
+
+
+def strip_compression_extension(filename):
+    """Remove a compression extension (such as .gz) from a file name, if it has one.
+
+    Args:
+        filename (str): The file path (including the name) of the file
+
+    Returns:
+        str: The file path without the compression extension
+    """
+    root, extension = os.path.splitext(filename)
+    if extension.lower() in COMPRESSION_EXTENSIONS:
+        return root
+    return filename
+
+
+class MappedLines(Sequence):
+    """A read-only sequence of the lines in a file, backed by a memory-mapped buffer
+    (or, for a compressed file, by a memory-mapped temporary file of the decompressed contents).
+    The lines keep their newline characters, as file.readlines() would return them.
+    """
+
+    def __init__(self, filename, transform=None, follow=False):
+        """
+        Args:
+            filename (str): The file path (including the name) of the file to read
+            transform (callable): An optional function applied to each line as it is read
+            follow (bool): If True, the file is still being written: a last line without a newline
+                is left out until the rest of it is written, and refresh can be called to add
+                the lines appended to the file since it was read
+        """
+        compression = detect_compression(filename)
+        if compression and follow:
+            raise Exception("A compressed file cannot be followed while it is being written")
+        if compression:
+            buffer = read_compressed(filename, compression)
+        else:
+            buffer = self.map_file(filename)
+        self._filename = filename
+        self._follow = follow
+        self._buffer = buffer
+        self._offsets = self.find_line_offsets(buffer, partial=not follow)
+        self._start = 0
+        self._stop = len(self._offsets) - 1
+        self._transform = transform
+
+    def __repr__(self):
+        return f"MappedLines of {len(self)} lines"
+
+    def __reduce__(self):
+        # a memory map cannot be pickled, so the lines are pickled as a plain list
+        return list, (list(self),)
+
+    @staticmethod
+    def map_file(filename):
+        """Memory-map a file for reading.
+
+        Args:
+            filename (str): The file path (including the name) of the file to read
+
+        Returns:
+            mmap or bytes: The map of the file (or an empty bytes object if the file is empty)
+        """
+        with open(filename, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size:
+                # the map keeps its own handle, so the file can be closed straight away
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            return b''    # zero-length files cannot be mapped
+
+    @staticmethod
+    def find_line_offsets(buffer, offsets=None, partial=True):
+        """Find the offset of the start of every line in the buffer.
+
+        Args:
+            buffer (mmap or bytes): The contents of the file
+            offsets (array): Offsets already found, to be continued from the last one
+            partial (bool): If False, a last line without a newline is left out
+
+        Returns:
+            array: The start offset of each line, followed by the end of the last line
+        """
+        if offsets is None:
+            offsets = array('q', [0])
+        find = buffer.find
+        position = find(b'\n', offsets[-1])
+        while position != -1:
+            offsets.append(position + 1)
+            position = find(b'\n', position + 1)
+        if partial and offsets[-1] != len(buffer):
+            offsets.append(len(buffer))     # the last line has no newline
+        return offsets
+
+    def refresh(self):
+        """Add the complete lines written to the end of a followed file since it was last read.
+        Only the new part of the file is searched for line breaks.
+
+        Returns:
+            int: The number of lines added
+        """
+        if not self._follow:
+            raise Exception("Only a MappedLines created with follow=True can be refreshed")
+        if os.path.getsize(self._filename) <= len(self._buffer):
+            return 0
+        self._buffer = self.map_file(self._filename)
+        old_length = len(self._offsets)
+        self.find_line_offsets(self._buffer, self._offsets, partial=False)
+        self._stop = len(self._offsets) - 1
+        return len(self._offsets) - old_length
+
+    def view(self, start, stop):
+        """Create a MappedLines over a range of these lines, sharing the same buffer.
+
+        Args:
+            start (int): The index of the first line of the view
+            stop (int): The index after the last line of the view
+
+        Returns:
+            MappedLines: The new view
+        """
+        lines = object.__new__(MappedLines)
+        lines._buffer = self._buffer
+        lines._offsets = self._offsets
+        lines._start = self._start + start
+        lines._stop = self._start + stop
+        lines._transform = self._transform
+        lines._filename = self._filename
+        lines._follow = False   # a view covers a fixed range of lines
+        return lines
+
+    def read_line(self, n):
+        """Decode a single line from the buffer.
+
+        Args:
+            n (int): The index of the line in the whole file
+
+        Returns:
+            str: The line, including its newline character
+        """
+        line = self._buffer[self._offsets[n]:self._offsets[n + 1]].decode('utf-8', 'replace')
+        if line.endswith('\r\n'):
+            line = line[:-2] + '\n'
+        if self._transform:
+            line = self._transform(line)
+        return line
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return [self[n] for n in range(start, stop, step)]
+            return self.view(start, max(start, stop))
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("MappedLines index out of range")
+        return self.read_line(self._start + item)
+
+    def __iter__(self):
+        read_line = self.read_line
+        for n in range(self._start, self._stop):
+            yield read_line(n)
@@ -4,97 +4,382 @@
 # November 2019
 
 """
-    This module holds all the code related to cells, including the Cells class,
-    and the functions which find the cell data in the mcnp output, extract the cell
-    section of that data, and send it to the Cell class to create the Cell objects.
+    This module holds all the code related to cells: the CellTable class, which holds the
+    cell data of the mcnp output as one typed array per column, and the CellRow class, a
+    view of one cell that reads like the old per-cell objects (e.g. cell.mass).
 
-    It also contains the code to find the neutron, photon and electron population data,
-    which is assigned to each cell object as they are created.
+    It also contains the code to read the tables MCNP prints with a row for each cell, such as
+    the activity in each cell (print table 126, the populations) and the weight balance in each
+    cell (print table 130), which are joined on to the cell table once it is created. These
+    tables can run over many pages, repeating their headings on each page.
 """
 # imports from standard library
 import re
+from bisect import bisect_right
+from collections import namedtuple
+# Third party imports
+import numpy as np
 # local imports
 
+# The columns of the activity in each cell table (print table 126), in the order MCNP prints them;
+# the first three are counts, and the rest are weights, energies and lengths
+ACTIVITY_COLUMNS = ('tracks_entering', 'population', 'collisions', 'collision_weight', 'number_weighted_energy',
+                    'flux_weighted_energy', 'average_track_weight', 'average_track_mfp')
+COUNT_COLUMNS = ACTIVITY_COLUMNS[:3]
+# The number of cells listed in the hot cells table of each particle
+HOT_CELL_ROWS = 20
 
-class Cell:
-    """ This class holds the attributes and methods for Cell objects."""
-    # pylint: disable=too-many-instance-attributes
-    # MCNP cells have a lot of attributes
+# A table with a row for each cell, as MCNP prints it.
+#   names (list): the name of each column, from the headings above it, e.g. 'flux weighted energy'
+#   cell_numbers (numpy.ndarray): the cell number of each row
+#   values (numpy.ndarray): the values, one row per cell and one column per name
+CellColumns = namedtuple('CellColumns', ['names', 'cell_numbers', 'values'])
 
-    def __init__(self, **info):
-        self.cell_number = info['cell_number']
-        self.material_number = info['material_number']
-        self.atom_density = info['atom_density']
-        self.gram_density = info['gram_density']
-        self.volume = float(info['volume'])
-        self.mass = float(info['mass'])
-        self.neutron_importance = info['neutron_importance']
-        self.photon_importance = info['photon_importance']
-        self.electron_importance = info['electron_importance']
+# A row of a cell table: the index and the cell number, then the values
+PATTERN_cell_row = re.compile(r'^\s+\d+\s+\d+\s')
 
-    def assign_populations(self, neutron_pop=None, photon_pop=None, electron_pop=None):
-        """Assign neutron, photon and electron population data to each cell.
+
+class CellTable:
+    """The cells of an MCNP case, held as parallel typed arrays rather than an object per cell:
+    a cell number, material, densities, volume and mass for each cell, the importance of each
+    particle, and every column of the activity and weight balance tables of each particle that
+    has them. Iterating over the table gives a CellRow for each cell; the table can be sorted,
+    filtered and ranked without building the rows.
+    """
+    COLUMNS = ('material_number', 'atom_density', 'gram_density', 'volume', 'mass')
+    PARTICLES = ('neutron', 'photon', 'electron')
+    __slots__ = ('cell_numbers', 'columns', 'importances', 'populations', 'weight_balances')
+
+    def __init__(self, cell_numbers, columns, importances, populations=None, weight_balances=None):
+        """
+        Args:
+            cell_numbers (numpy.ndarray): The number of each cell
+            columns (dict): The material_number, atom_density, gram_density, volume and mass of each cell
+            importances (dict): The importance of each cell for each particle, keyed by particle
+            populations (dict): The ACTIVITY_COLUMNS of each cell (nan for a cell missing from the table),
+                as an array with a row per cell, for each particle that has an activity table
+            weight_balances (dict): The CellColumns of the weight balance of each cell (nan for a cell
+                missing from the table), for each particle that has a weight balance table
+        """
+        self.cell_numbers = np.asarray(cell_numbers, dtype=np.int64)
+        self.columns = columns
+        self.importances = importances
+        self.populations = populations if populations is not None else {}
+        self.weight_balances = weight_balances if weight_balances is not None else {}
+
+    @classmethod
+    def from_rows(cls, rows, importance_columns):
+        """Build the table from the words of each line of the cell table (print table 60).
 
         Args:
-            neutron_pop (list): The neutron population section of the MCNP output
-            photon_pop (list): The photon population section of the MCNP output
-            electron_pop (list): The electron population section of the MCNP output
+            rows (list): The words of each line of the table that describes a cell
+            importance_columns (dict): The position in the words of the importance of each particle
+                (None for a particle that has no importance column)
 
         Returns:
-            None. The data is assigned to the cell objects as various new attributes.
-        """
-        # Assign neutron population data to cell
-        if neutron_pop:
-            for line in neutron_pop[6:-2]:
-                line = line.split()
-                num = line[1]
-                if num == self.cell_number:
-                    self.neutron_tracks_entering = line[2]
-                    self.neutron_population = line[3]
-                    self.neutron_collisions = line[4]
-        # Assign photon population data to cell
-        if photon_pop:
-            for line in photon_pop[6:-2]:
-                line = line.split()
-                num = line[1]
-                if num == self.cell_number:
-                    self.photon_tracks_entering = line[2]
-                    self.photon_population = line[3]
-                    self.photon_collisions = line[4]
-        # Assign electron population data to cell
-        if electron_pop:
-            for line in electron_pop[6:-2]:
-                line = line.split()
-                num = line[1]
-                if num == self.cell_number:
-                    self.electron_tracks_entering = line[2]
-                    self.electron_population = line[3]
-                    self.electron_collisions = line[4]
+            CellTable: The cells
+        """
+        if rows:
+            # every line describes the same columns, so they are all cut to the shortest
+            width = min(len(row) for row in rows)
+            words = np.array([row[:width] for row in rows], dtype=str)
+        else:
+            words = np.zeros((0, 7), dtype=str)
+        columns = {
+            'material_number': words[:, 2].astype(np.int32),
+            'atom_density': words[:, 3].astype(float),
+            'gram_density': words[:, 4].astype(float),
+            'volume': words[:, 5].astype(float),
+            'mass': words[:, 6].astype(float),
+        }
+        importances = {particle: (words[:, column].astype(float) if column is not None else np.zeros(len(words)))
+                       for particle, column in importance_columns.items()}
+        return cls(words[:, 1].astype(np.int64), columns, importances)
 
     def __repr__(self):
-        """Print a description of the cell object to the terminal (for debugging purposes)
+        return f"CellTable of {len(self)} cells"
+
+    def __len__(self):
+        return len(self.cell_numbers)
+
+    def __iter__(self):
+        return (CellRow(self, n) for n in range(len(self)))
+
+    def __getitem__(self, n):
+        """Get the row of a cell by its position in the table."""
+        if not -len(self) <= n < len(self):
+            raise IndexError(n)
+        return CellRow(self, n % len(self))
+
+    def take(self, positions):
+        """Get a table of some of the cells, in the order given.
 
         Args:
-            self, the cell object
+            positions (numpy.ndarray): The positions of the cells to keep, or a boolean mask
 
         Returns:
-            None
+            CellTable: The cells
         """
-        description = (f"Cell number: {self.cell_number}"
-                       f"Cell material: {self.material_number}"
-                       f"Cell density: {self.gram_density} g/cm3"
-                       f"Cell volume: {self.volume} cm3")
-        try:
-            description += f"\nNeutron Importance: {self.neutron_importance}"
-        except AttributeError:
-            pass
-        try:
-            description += f"\nPhoton Importance: {self.photon_importance}"
-        except AttributeError:
-            pass
+        return CellTable(self.cell_numbers[positions],
+                         {name: column[positions] for name, column in self.columns.items()},
+                         {particle: column[positions] for particle, column in self.importances.items()},
+                         {particle: block[positions] for particle, block in self.populations.items()},
+                         {particle: CellColumns(balance.names, balance.cell_numbers[positions], balance.values[positions])
+                          for particle, balance in self.weight_balances.items()})
+
+    def sorted_by(self, name, descending=False):
+        """Sort the cells by one column, e.g. sorted_by('mass', descending=True) for the heaviest cells first.
+
+        Args:
+            name (str): 'cell_number' or the name of one of the columns
+            descending (bool): True to put the largest values first
+
+        Returns:
+            CellTable: The sorted cells
+        """
+        values = self.cell_numbers if name == 'cell_number' else self.columns[name]
+        order = np.argsort(-values if descending else values, kind='stable')
+        return self.take(order)
+
+    def with_population(self, particle):
+        """Get the cells that are in the population table of a particle.
+
+        Args:
+            particle (str): Either 'neutron', 'photon' or 'electron'
+
+        Returns:
+            CellTable: The cells
+        """
+        if particle not in self.populations:
+            return self.take(np.zeros(len(self), dtype=bool))
+        return self.take(~np.isnan(self.populations[particle][:, 0]))
+
+    def population_total(self, particle, column='population'):
+        """Add up one column of a particle's activity table over the cells.
+
+        Args:
+            particle (str): Either 'neutron', 'photon' or 'electron'
+            column (str): One of the ACTIVITY_COLUMNS
+
+        Returns:
+            float: The total over the cells in the table (0 if the particle has no activity table)
+        """
+        if particle not in self.populations:
+            return 0.0
+        return float(np.nansum(self.populations[particle][:, ACTIVITY_COLUMNS.index(column)]))
+
+    def hot_cells(self, particle, column='population', limit=HOT_CELL_ROWS):
+        """Rank the cells by one column of a particle's activity table, e.g. the cells with the most
+        tracks, to show where a run spends its time when tuning the variance reduction.
+
+        Args:
+            particle (str): Either 'neutron', 'photon' or 'electron'
+            column (str): One of the ACTIVITY_COLUMNS
+            limit (int): The largest number of cells to return
+
+        Returns:
+            CellTable: The cells with the highest values, highest first
+        """
+        cells = self.with_population(particle)
+        values = cells.populations[particle][:, ACTIVITY_COLUMNS.index(column)] if len(cells) else np.zeros(0)
+        return cells.take(np.argsort(-values, kind='stable')[:limit])
+
+    def find(self, cell_number):
+        """Get the row of a cell by its number.
+
+        Args:
+            cell_number (str or int): The number of the cell
+
+        Returns:
+            CellRow: The cell, or None if there is no cell with that number
+        """
+        positions = np.nonzero(self.cell_numbers == int(cell_number))[0]
+        return CellRow(self, int(positions[0])) if len(positions) else None
+
+    def align(self, cell_columns):
+        """Line up the rows of a table that has a row for each cell with the cells of this table,
+        matching them by cell number.
+
+        Args:
+            cell_columns (CellColumns): The table
+
+        Returns:
+            numpy.ndarray: The values of the table, with a row for each cell of this table (nan for a
+                cell missing from the table)
+        """
+        aligned = np.full((len(self), len(cell_columns.names)), np.nan)
+        if not len(self):
+            return aligned
+        order = np.argsort(self.cell_numbers, kind='stable')
+        found = np.minimum(np.searchsorted(self.cell_numbers, cell_columns.cell_numbers, sorter=order), len(order) - 1)
+        matched = self.cell_numbers[order[found]] == cell_columns.cell_numbers
+        aligned[order[found[matched]]] = cell_columns.values[matched]
+        return aligned
+
+    def assign_populations(self, particle, activity):
+        """Join a particle's activity in each cell table (print table 126) on to the cells.
+
+        Args:
+            particle (str): Either 'neutron', 'photon' or 'electron'
+            activity (CellColumns): The table, from read_cell_table (or None if the particle has none)
+        """
+        if activity is None:
+            return
+        if len(activity.names) != len(ACTIVITY_COLUMNS):
+            raise Exception(f"The {particle} activity table has {len(activity.names)} columns, "
+                            f"rather than {len(ACTIVITY_COLUMNS)}")
+        self.populations[particle] = self.align(activity)
+
+    def assign_weight_balance(self, particle, balance):
+        """Join a particle's weight balance in each cell table (print table 130) on to the cells.
+
+        Args:
+            particle (str): Either 'neutron', 'photon' or 'electron'
+            balance (CellColumns): The table, from read_cell_table (or None if the particle has none)
+        """
+        if balance is None:
+            return
+        self.weight_balances[particle] = CellColumns(balance.names, self.cell_numbers, self.align(balance))
+
+
+class CellRow:
+    """A view of one cell of a CellTable, read like an object, e.g. cell.mass or cell.neutron_population."""
+    __slots__ = ('table', 'n')
+
+    def __init__(self, table, n):
+        """
+        Args:
+            table (CellTable): The table of cells
+            n (int): The position of the cell in the table
+        """
+        self.table = table
+        self.n = n
+
+    def __repr__(self):
+        return (f"Cell number: {self.cell_number}, material: {self.material_number}, "
+                f"density: {self.gram_density} g/cm3, volume: {self.volume} cm3")
+
+    @property
+    def cell_number(self):
+        """str: The number of the cell, as MCNP prints it"""
+        return str(self.table.cell_numbers[self.n])
+
+    def __getattr__(self, name):
+        # only called for the names that are not slots or properties
+        if name in self.__slots__:
+            raise AttributeError(name)
+        table = self.table
+        if name in table.columns:
+            return table.columns[name][self.n].item()
+        particle, _, field = name.partition('_')
+        if field == 'importance' and particle in table.importances:
+            return table.importances[particle][self.n].item()
+        if field in ACTIVITY_COLUMNS and particle in table.populations:
+            value = table.populations[particle][self.n, ACTIVITY_COLUMNS.index(field)]
+            if not np.isnan(value):
+                return int(value) if field in COUNT_COLUMNS else float(value)
+        raise AttributeError(name)
+
+    def __getitem__(self, name):
         try:
-            description += f"\nElectron Importance: {self.electron_importance}"
+            return getattr(self, name)
         except AttributeError:
-            pass
-        return description
+            raise KeyError(name)
+
+    def has_population(self, particle):
+        """Check whether the cell is in the population table of a particle.
+
+        Args:
+            particle (str): Either 'neutron', 'photon' or 'electron'
+
+        Returns:
+            bool: True if the cell has populations for that particle
+        """
+        return particle in self.table.populations and not np.isnan(self.table.populations[particle][self.n, 0])
+
+    def weight_balance(self, particle):
+        """Get the weight balance of the cell for a particle.
+
+        Args:
+            particle (str): Either 'neutron', 'photon' or 'electron'
+
+        Returns:
+            dict: The value of each column of the weight balance table, keyed by name (empty if there is none)
+        """
+        balance = self.table.weight_balances.get(particle)
+        if balance is None or np.isnan(balance.values[self.n]).all():
+            return {}
+        return dict(zip(balance.names, balance.values[self.n].tolist()))
+
+
+def read_cell_table(data):
+    """Read a table that MCNP prints with a row for each cell, such as print table 126 or 130.
+    Each row starts with an index and the cell number, followed by the columns, and each block
+    of rows ends with a total row. A table may be printed as several blocks of columns, and may
+    run over several pages; the rows under the same headings are joined together. The columns
+    are named from the words of the headings above them, as MCNP lines each heading up with its
+    column, e.g. 'flux weighted energy'.
+
+    Args:
+        data (list): The lines of the table (or None)
+
+    Returns:
+        CellColumns: The table, with the columns of every block side by side (None if there is no table)
+    """
+    blocks = {}
+    heading = []
+    rows = None
+    for line in data or []:
+        if line.startswith('1'):
+            heading, rows = [], None  # a new page, which repeats the headings
+        elif PATTERN_cell_row.match(line):
+            if rows is None:
+                names = get_column_names(heading, line)
+                rows = blocks.setdefault((tuple(' '.join(text.split()) for text in heading), tuple(names)), [])
+            rows.append(line)
+        elif line.split()[:1] == ['total']:
+            heading, rows = [], None
+        elif line.strip():
+            if rows is not None:
+                heading, rows = [], None
+            heading.append(line)
+    names = []
+    cell_numbers = None
+    columns = []
+    for (heading, block_names), rows in blocks.items():
+        block = np.array(' '.join(rows).split(), dtype=float).reshape(len(rows), len(block_names) + 2)
+        numbers = block[:, 1].astype(np.int64)
+        if cell_numbers is None:
+            cell_numbers = numbers
+        elif not np.array_equal(numbers, cell_numbers):
+            raise Exception("The blocks of a cell table do not list the same cells")
+        # a name repeated in another block of columns (e.g. 'total') is numbered
+        names.extend(name if name not in names else f"{name} ({names.count(name) + 1})" for name in block_names)
+        columns.append(block[:, 2:])
+    if cell_numbers is None:
+        return None
+    return CellColumns(names, cell_numbers, np.hstack(columns))
+
+
+def get_column_names(heading, row):
+    """Name the columns of a cell table from the headings above them. Each group of words in the
+    headings belongs to the column whose values it sits over.
+
+    Args:
+        heading (list): The heading lines above the rows
+        row (str): The first row under the headings
 
+    Returns:
+        list: The name of each column after the index and cell number
+    """
+    spans = [match.span() for match in re.finditer(r'\S+', row)]
+    # each column reaches from the end of the value before it to the end of its own value
+    bounds = [span[1] for span in spans[1:-1]] + [len(row) + max((len(line) for line in heading), default=0)]
+    words = [[] for _ in spans[2:]]
+    for line in heading:
+        for match in re.finditer(r'\S+(?: \S+)*', line):
+            centre = (match.start() + match.end() - 1) / 2
+            column = bisect_right(bounds, centre) - 1
+            if 0 <= column < len(words):
+                words[column].append(match.group())
+    return [' '.join(column) for column in words]
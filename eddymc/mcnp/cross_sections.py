@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""
+    This module reads the cross-section tables page (print table 100), which lists every
+    cross-section table MCNP loaded, grouped under the data file each was read from:
+
+                            tables from file xdata/endf71x/N/7014.710nc
+
+       7014.80c  102640  N14 ENDF71x (jlconlin)  Ref. see jlconlin (ref 09/10/2012  10:00:53)         mat 725      12/16/12
+                         Energy range:   1.00000E-11  to  1.50000E+02 MeV.
+       ...
+      total     3876469
+
+    The tables are indexed by ZAID and by library, so that the libraries a run used can be
+    summarised, and kept in the parse cache summary so they can be looked up across many runs.
+"""
+
+# Imports from standard library
+import re
+from collections import namedtuple
+
+# One cross-section table loaded by MCNP.
+#   zaid (str): the table identifier, e.g. '7014.80c'
+#   nuclide (str): the ZA number of the nuclide (or element), e.g. '7014'
+#   suffix (str): the library identifier at the end of the ZAID, e.g. '80c'
+#   length (int): the length of the table, in words
+#   file (str): the data file the table was read from, e.g. 'xdata/endf71x/N/7014.710nc'
+#   library (str): the library the data file belongs to, e.g. 'endf71x'
+#   description (str): the rest of the line, e.g. 'N14 ENDF71x (jlconlin) ...'
+CrossSectionTable = namedtuple('CrossSectionTable', ['zaid', 'nuclide', 'suffix', 'length', 'file', 'library',
+                                                     'description'])
+
+# The tables read from one library.
+#   library (str): the library, e.g. 'endf71x'
+#   suffixes (list): the library identifiers of its tables, e.g. ['80c']
+#   tables (int): the number of tables
+#   length (int): the total length of the tables, in words
+LibrarySummary = namedtuple('LibrarySummary', ['library', 'suffixes', 'tables', 'length'])
+
+PATTERN_file = re.compile(r'^\s+tables from file\s+(\S+)')
+PATTERN_table = re.compile(r'^\s+((\d+)\.(\d+[a-z]+))\s+(\d+)\s*(.*?)\s*$')
+# the directory of one element in a library of one file per nuclide, e.g. 'N' or 'Fe'
+PATTERN_element = re.compile(r'[A-Z][a-z]?')
+
+
+class CrossSectionTables:
+    """The cross-section tables loaded by MCNP, in the order they are printed, with an index
+    by ZAID and by library.
+    """
+
+    def __init__(self, tables):
+        """
+        Args:
+            tables (list): The CrossSectionTable of each table; a ZAID printed again (e.g. by a
+                continued run) is only kept the first time
+        """
+        self.tables = []
+        self.by_zaid = {}       # zaid: table
+        self.by_library = {}    # library: list of tables from that library
+        for table in tables:
+            if table.zaid in self.by_zaid:
+                continue
+            self.tables.append(table)
+            self.by_zaid[table.zaid] = table
+            self.by_library.setdefault(table.library, []).append(table)
+
+    def __repr__(self):
+        return f"{len(self.tables)} cross-section tables from {len(self.by_library)} libraries"
+
+    def __len__(self):
+        return len(self.tables)
+
+    def __iter__(self):
+        return iter(self.tables)
+
+    def find(self, zaid):
+        """Find the table with a particular ZAID.
+
+        Args:
+            zaid (str): The table identifier, e.g. '7014.80c'
+
+        Returns:
+            CrossSectionTable: The table, or None if MCNP did not load it
+        """
+        return self.by_zaid.get(zaid)
+
+    def libraries(self):
+        """Summarise the tables read from each library.
+
+        Returns:
+            list: A LibrarySummary for each library, in the order they are first printed
+        """
+        return [LibrarySummary(library, sorted({table.suffix for table in tables}), len(tables),
+                               sum(table.length for table in tables))
+                for library, tables in self.by_library.items()]
+
+
+def read_cross_sections(data):
+    """Read the cross-section tables page in one pass.
+
+    Args:
+        data (list): The lines of the page (or None)
+
+    Returns:
+        CrossSectionTables: The tables
+    """
+    tables = []
+    file, library = '', ''
+    for line in data or []:
+        match = PATTERN_file.match(line)
+        if match:
+            file = match.group(1)
+            library = get_library_name(file)
+            continue
+        match = PATTERN_table.match(line)
+        if match:
+            zaid, nuclide, suffix, length, description = match.groups()
+            tables.append(CrossSectionTable(zaid, nuclide, suffix, int(length), file, library, description))
+    return CrossSectionTables(tables)
+
+
+def get_library_name(file):
+    """Name the library a data file belongs to. A library of one file per nuclide keeps its files in
+    a directory for each element, e.g. 'xdata/endf71x/N/7014.710nc', so is named after the directory
+    above that; a library in a single file, e.g. 'xdata/mcplib84' or '/opt/MCNP_DATA/endf70a', is
+    named after the file.
+
+    Args:
+        file (str): The data file, as MCNP prints it
+
+    Returns:
+        str: The library name
+    """
+    parts = [part for part in re.split(r'[\\/]', file) if part]
+    if len(parts) >= 3 and PATTERN_element.fullmatch(parts[-2]):
+        return parts[-3]
+    return parts[-1] if parts else ''
@@ -6,10 +6,22 @@
 
 """
 
+import os
 import re
-from .cells import Cell
-from .particles import Particle
-from .tallies import F2Tally, F4Tally, F5Tally, F6Tally
+from .cells import CellTable, read_cell_table
+from .cross_sections import read_cross_sections
+from .fluctuation_charts import read_fluctuation_charts
+from .meshtal import MEMMAP_FILE_SIZE, find_meshtal, read_meshtal
+from .page_index import PageIndex
+from .particles import find_particle_tables, read_particle_table
+from .statistical_checks import read_check_status, read_tally_density
+from .tallies import RawTally, create_tally, group_tallies
+
+# The kind of the page with the status of the statistical checks of every tally
+STATUS_PAGE = 'status of the statistical checks used to form confidence intervals for the mean for each tally bin'
+# The kinds of the page that starts each run, with the code version, date and time, e.g. '1mcnp     version 6'
+# or '1mcnpx    version 2.7.0'
+HEADER_PAGES = ('mcnp version', 'mcnpx version')
 
 
 class EddyMCNPCase:
@@ -17,16 +29,18 @@ class EddyMCNPCase:
     and its __init__ method is responsible for calling the other classes that
     Eddy uses.
     """
-    def __init__(self, filepath, scaling_factor, file, crit_case=False):
-        """ Most of the work done by eddy is handled within the __init__ function;
-        it calls all the instance methods that get information from the mcnp output file,
-        and puts them into attributes of the EddyCase object.
+    def __init__(self, filepath, scaling_factor, file, crit_case=False, following=False):
+        """ Most of the work done by eddy is started by the __init__ function;
+        it calls read_output, which calls all the instance methods that get information
+        from the mcnp output file, and puts them into attributes of the EddyCase object.
 
         Args:
             filepath (str): The path to the mcnp output file
-            scaling_factor (float): A number to multiply the tally results by
+            scaling_factor (float): A number to multiply the tally results by (the results are kept
+                unscaled; the scaling factor is applied by the view returned by scaled)
             file (list): The contents of the mcnp output file
             crit_case (bool): True if crit case, otherwise false
+            following (bool): True if the output is still being written, and will be read again by update
         """
 
         self.filepath = filepath
@@ -34,9 +48,46 @@ class EddyMCNPCase:
         self.scaling_factor = scaling_factor
         self.file = file
         self.crit_case = crit_case
+        self.following = following
 
         # start parsing output:
-        self.rundate, self.runtime = self.get_date_time()
+        self.page_index = self.get_page_index()
+        self.lines_read = len(self.file)
+        # the tallies are kept between updates, so only new tally sections are read
+        self.tally_list = []   # list of all tallies
+        self.f_types = []
+        self.tallies_read_to = None
+        # the other sections are kept between updates, and only read again when their pages change
+        self.rundate, self.runtime = None, None
+        self.cross_sections = read_cross_sections(None)
+        self.k_effective = None
+        self.particle_data = {}
+        self.particle_list = []
+        self.cell_data = []
+        self.cell_list = self.create_cells()
+        self.fluctuation_charts = {}
+        self.check_status = {}
+        self.tally_densities = {}
+        self.mesh_tallies = []
+        self.meshtal_read = None   # the path and modification time of the meshtal file last read
+        self.read_output()
+
+    def __repr__(self):
+        return (f"This Eddy MCNP case considers file {self.name}\n"
+                f"from {self.filepath}\n"
+                f"The scaling factor is {self.scaling_factor}\n"
+                f"Criticality case: {self.crit_case}\n")
+
+    def read_output(self, start=0):
+        """Call all the instance methods that get information from the mcnp output file,
+        and put them into attributes of the EddyCase object.
+        When an output that is still being written is read again, each section is only read again
+        if its pages have lines from start onwards; the rest are kept from the last read.
+
+        Args:
+            start (int): The first line not read before (0 to read the whole output)
+        """
+        page_index = self.get_page_index()
         self.ctme, self.nps = self.get_runtime()
         self.mcnp_input = self.get_input()
         self.parameters = self.get_parameters()
@@ -45,75 +96,239 @@ class EddyMCNPCase:
         self.warnings = self.get_warnings()
         self.comments = self.get_comments()
         self.duplicate_surfaces = self.get_duplicate_surfaces()
+        if self.has_new_lines(self.get_header_pages(), start):
+            self.rundate, self.runtime = self.get_date_time()
+        if self.has_new_lines(page_index.table(100), start):
+            self.cross_sections = self.get_cross_sections()
         if self.crit_case is True:
-            self.k_effective = self.get_k_eff()
+            if self.has_new_lines(page_index.pages_of('keff results for'), start):
+                self.k_effective = self.get_k_eff()
             self.cycles = self.get_active_cycles()
         else:
             self.k_effective = None
             self.cycles = None
 
-        # Cells
-        self.cell_data = self.get_cell_data()
-        self.neutron_populations = self.get_particle_populations('neutron')
-        self.photon_populations = self.get_particle_populations('photon')
-        self.electron_populations = self.get_particle_populations('electron')
-        self.cell_list = self.create_cells()
-        for cell in self.cell_list:
-            cell.assign_populations(
-                self.neutron_populations,
-                self.photon_populations,
-                self.electron_populations,
-            )
-
         # Particles
-        self.particle_list = []
-        for particle_type in ['neutron', 'photon', 'electron']:
-            particle_data = self.find_mcnp_particle_data(particle_type)
-            if particle_data:
-                particle = self.create_particle(particle_type, particle_data)
-                self.particle_list.append(particle)
+        particle_data = self.get_particle_data(after=start)
+        if particle_data:
+            self.particle_data.update(particle_data)
+            particles = {particle.particle_type: particle for particle in self.particle_list}
+            particles.update((particle_type, self.create_particle(particle_type, data))
+                             for particle_type, data in particle_data.items())
+            self.particle_list = list(particles.values())
+
+        # Cells
+        new_cells = self.has_new_lines(page_index.pages_of('cells'), start)
+        if new_cells:
+            self.cell_data = self.get_cell_data()
+            self.cell_list = self.create_cells()
+        # each population table is read once, then joined on to the cells by cell number;
+        # MCNP6 can track other particles too, which have their own tables
+        particle_types = list(CellTable.PARTICLES) + [particle.particle_type for particle in self.particle_list
+                                                      if particle.particle_type not in CellTable.PARTICLES]
+        for particle in particle_types:
+            # a particle whose table has just been found may have had its cell tables printed before start
+            reread = new_cells or particle in particle_data
+            if reread or self.has_new_lines(page_index.pages_of(f'{particle} activity in each cell'), start):
+                data = self.get_particle_populations(particle)
+                if particle in CellTable.PARTICLES:
+                    setattr(self, f'{particle}_populations', data)
+                self.cell_list.assign_populations(particle, read_cell_table(data))
+            if reread or self.has_new_lines(page_index.pages_of(f'{particle} weight balance in each cell'), start):
+                self.cell_list.assign_weight_balance(particle, read_cell_table(self.get_weight_balance(particle)))
 
         # Tallies
-        # initialise empty variables
-        self.tally_list = []   # list of all tallies
-        self.f_types = []
-        self.F2_tallies = {'neutrons': [], 'photons': [], 'electrons': []}
-        self.F4_tallies = {'neutrons': [], 'photons': [], 'electrons': []}
-        self.F5_tallies = {'neutrons': [], 'photons': [], 'electrons': []}
-        self.F6_tallies = {'neutrons': [], 'photons': [], 'electrons': [], 'Collision Heating': []}
-        # get tallies
         if self.crit_case is False:
-            # TODO: sort this monstrosity of a function call out
-            self.tally_list, self.f_types, self.F2_tallies, self.F4_tallies, self.F5_tallies, self.F6_tallies = self.get_tallies()
-        # apply scaling factor
-            if self.scaling_factor != 1:
-                for tally in self.tally_list:
-                    tally.scale_result(self.scaling_factor)
+            self.tally_list, self.f_types = self.get_tallies(
+                after=self.tallies_read_to,
+                tallies=(self.tally_list, self.f_types),
+                following=self.following,
+            )
+        # the tallies of each group (e.g. 'F4'), keyed by particle, from the group registered for each tally type
+        self.tally_groups = group_tallies(self.tally_list)
+        self.raw_tallies = [tally for tally in self.tally_list if isinstance(tally, RawTally)]
+        self.fluctuation_charts.update(self.get_fluctuation_charts(after=start))
+        if self.has_new_lines(page_index.pages_of(STATUS_PAGE), start):
+            self.check_status = self.get_check_status()
+        self.tally_densities.update(self.get_tally_densities(after=start))
+        for tally in self.tally_list:
+            tally.fluctuation_chart = self.fluctuation_charts.get(tally.tally_number)
+            tally.check_status = self.check_status.get(tally.tally_number)
+            tally.density = self.tally_densities.get(tally.tally_number)
+        self.mesh_tallies = self.get_mesh_tallies()
 
-    def __repr__(self):
-        return (f"This Eddy MCNP case considers file {self.name}\n"
-                f"from {self.filepath}\n"
-                f"The scaling factor is {self.scaling_factor}\n"
-                f"Criticality case: {self.crit_case}\n")
+    @staticmethod
+    def has_new_lines(pages, start):
+        """Check whether any of a list of pages has lines from a given line onwards.
+
+        Args:
+            pages (list): The pages, in the order they appear in the file
+            start (int): The first line not read before
+
+        Returns:
+            bool: True if the last page runs past start (so a page has been added or has grown)
+        """
+        return bool(pages) and pages[-1].end > start
+
+    def scaled(self, scaling_factor=None):
+        """Get a view of this case with the tally results multiplied by a scaling factor.
+        The case is not changed, so one parse can be written out at any number of scaling factors.
+
+        Args:
+            scaling_factor (float): A number to multiply the tally results by (by default, self.scaling_factor)
+
+        Returns:
+            ScaledMCNPCase: The scaled view of this case
+        """
+        if scaling_factor is None:
+            scaling_factor = self.scaling_factor
+        return ScaledMCNPCase(self, scaling_factor)
+
+    def update(self):
+        """For an output that is still being written, read the lines added to the file since
+        the case was created or last updated, and update the results.
+        Only the new lines are indexed and classified, only the new tally sections are read,
+        and the other sections are only read again if their pages have new lines.
+
+        Returns:
+            bool: True if any new lines were read, otherwise False
+        """
+        start = self.lines_read
+        if len(self.file) <= start:
+            return False
+        self.get_page_index().extend(self.file)
+        self.messages = self.classify_lines(start, self.get_messages())
+        self.lines_read = len(self.file)
+        self.read_output(start)
+        return True
+
+    def check_finished(self):
+        """Check whether MCNP has finished writing the output (it prints the total computer time last)
+
+        Returns:
+            bool: True if the run has finished, otherwise False
+        """
+        return self.get_messages()['finished']
+
+    def get_page_index(self):
+        """Get the index of the page headings in the mcnp output, building it on the first call only.
+
+        Returns:
+            PageIndex: The page heading index for this output
+        """
+        if getattr(self, 'page_index', None) is None:
+            self.page_index = PageIndex(self.file)
+        return self.page_index
+
+    def get_header_pages(self):
+        """Get the header page of every run in the output, from MCNP or MCNPX.
+
+        Returns:
+            list: The pages, in the order they appear in the file
+        """
+        page_index = self.get_page_index()
+        pages = [page for kind in HEADER_PAGES for page in page_index.pages_of(kind)]
+        return sorted(pages, key=lambda page: page.start)
 
     def get_date_time(self):
         """Get the date and time that the mcnp case was run
 
         Returns:
-            tuple: The rundate and runtime, as a tuple of 2 strings
+            tuple: The rundate and runtime, as a tuple of 2 strings (or of 2 Nones if not found)
+        """
+        pages = self.get_header_pages()
+        if pages:
+            # the date and time end the header line; MCNPX prints a load date with spaces in it before them
+            line = self.file[pages[0].start]
+            time = line.split()[-1]
+            date = line.split()[-2]
+            date = date.split('/')
+            d = date[1]
+            m = date[0]
+            y = '20' + date[2]
+            # date_time = {'date': f"{y}/{m}/{d}", 'time': time}
+            rundate = f"{y}/{m}/{d}"
+            runtime = time
+            return rundate, runtime
+        return None, None
+
+    def classify_lines(self, start=0, messages=None):
+        """Walk through the mcnp output once, sorting each line into the collector for
+        every message type it belongs to. This replaces a separate pass over the
+        whole file for each of the runtime, input, lost particle, fatal error, warning,
+        comment, duplicate surface and active cycle extractors.
+
+        Args:
+            start (int): The line to start from
+            messages (dict): The data already collected from the lines before start, to be added to
+
+        Returns:
+            dict: The collected data, keyed by message type
+        """
+        pattern_input = re.compile(r'^\s{6,}\d+-\s{7}(.*)')
+        pattern_nps = re.compile(r'(nps|NPS)\s+.+')
+        pattern_ctme = re.compile(r'(ctme|CTME)\s+.+')
+        PATTERN_comments = re.compile(r'comment\.\s+[A-Za-z0-9].+')    # Ignores blank comment lines
+        PATTERN_duplicates = re.compile(r'\ssurface\s+\d+.+and surface.+are the same.+')
+        if messages is None:
+            messages = {
+                'ctme': None,
+                'nps': None,
+                'input': [],
+                'lost_particles': False,
+                'fatal_errors': [],
+                'warnings': [],
+                'comments': [],
+                'duplicate_surfaces': [],
+                'cycles': {},
+                'finished': False,
+            }
+        seen_warnings = set(messages['warnings'])
+        seen_duplicates = set(messages['duplicate_surfaces'])
+        for line in self.file[start:]:
+            # a line can belong to more than one collector, so every check is made;
+            # the cheap substring tests keep the regular expressions off most lines
+            match = pattern_input.match(line)
+            if match:
+                card = match.group(1)
+                messages['input'].append(card.strip('\n'))
+                if pattern_ctme.match(card):
+                    messages['ctme'] = line.split()[2]
+                if pattern_nps.match(card):
+                    messages['nps'] = line.split()[2]
+            if "particles got lost" in line and "run terminated because" in line:
+                messages['lost_particles'] = True
+            if "fatal error." in line:
+                messages['fatal_errors'].append(line[14:].strip().capitalize())
+            if 'warning' in line:
+                if "warning message so far" not in line and "warning messages so far" not in line:
+                    warning = line[10:].strip().capitalize()
+                    if warning not in seen_warnings:
+                        seen_warnings.add(warning)
+                        messages['warnings'].append(warning)
+            if 'comment.' in line and PATTERN_comments.search(line):
+                messages['comments'].append(line[10:].strip().capitalize())
+            if 'are the same' in line and PATTERN_duplicates.match(line):
+                duplicate = line.strip().capitalize()
+                if duplicate not in seen_duplicates:
+                    seen_duplicates.add(duplicate)
+                    messages['duplicate_surfaces'].append(duplicate)
+            if "the minimum estimated standard deviation for the col/abs/tl keff estimator occurs with" in line:
+                messages['cycles']["inactive"] = int(line.split()[12])
+                messages['cycles']["active"] = int(line.split()[16])
+            if line.startswith(' computer time ='):
+                messages['finished'] = True
+        return messages
+
+    def get_messages(self):
+        """Get the output of classify_lines, running it on the first call only.
+
+        Returns:
+            dict: The collected data, keyed by message type
         """
-        for line in self.file:
-            if line.startswith('1mcnp'):
-                time = line.split()[5]
-                date = line.split()[4]
-                date = date.split('/')
-                d = date[1]
-                m = date[0]
-                y = '20' + date[2]
-                # date_time = {'date': f"{y}/{m}/{d}", 'time': time}
-                rundate = f"{y}/{m}/{d}"
-                runtime = time
-                return rundate, runtime
+        if getattr(self, 'messages', None) is None:
+            self.messages = self.classify_lines()
+        return self.messages
 
     def get_runtime(self):
         """Get the time or number of particles the MCNP case was run for
@@ -126,16 +341,8 @@ class EddyMCNPCase:
                     nps The number of particles run, or None if not found.
 
         """
-        ctme = None
-        nps = None
-        pattern_nps = re.compile(r'^\s{6,}\d+-\s{7}(nps|NPS)\s+.+')
-        pattern_ctme = re.compile(r'^\s{6,}\d+-\s{7}(ctme|CTME)\s+.+')
-        for line in self.file:
-            if pattern_ctme.match(line):
-                ctme = line.split()[2]
-            if pattern_nps.match(line):
-                nps = line.split()[2]
-        return ctme, nps
+        messages = self.get_messages()
+        return messages['ctme'], messages['nps']
 
     def get_input(self):
         """Extract the MCNP input deck from the MCNP output file
@@ -143,13 +350,7 @@ class EddyMCNPCase:
         Returns:
             list: The MCNP input deck, as a list of strings
         """
-        pattern_input = re.compile(r'^\s{6,}\d+-\s{7}(.*)')
-        mcnp_input = []
-        for line in self.file:
-            match = pattern_input.match(line)
-            if match:
-                mcnp_input.append(match.group(1).strip('\n'))
-        return mcnp_input
+        return self.get_messages()['input']
 
     def get_parameters(self):
         """Get any parameters used in the input file.
@@ -179,23 +380,15 @@ class EddyMCNPCase:
             bool: True if run terminated due to lost particles, otherwise False
 
         """
-        for line in self.file:
-            if "run terminated because" in line and "particles got lost" in line:
-                return True
-        return False
+        return self.get_messages()['lost_particles']
 
     def get_fatal_errors(self):
-        """Find the warnings in the MCNP output data
+        """Find the fatal errors in the MCNP output data
 
         Returns:
             list: A list of the fatal error messages
         """
-        fatal_errors = []
-        for line in self.file:
-            if "fatal error." in line:
-                message = line[14:].strip().capitalize()
-                fatal_errors.append(message)
-        return fatal_errors
+        return self.get_messages()['fatal_errors']
 
     def get_warnings(self):
         """Find the warnings in the MCNP output data
@@ -203,15 +396,7 @@ class EddyMCNPCase:
         Returns:
             list: A list of the warning messages
         """
-        warnings = []
-        PATTERN_warnings = re.compile(r'warning')
-        for line in self.file:
-            if PATTERN_warnings.search(line):
-                if "warning message so far" not in line and "warning messages so far" not in line:
-                    warning = line[10:].strip().capitalize()
-                    if warning not in warnings:
-                        warnings.append(warning)
-        return warnings
+        return self.get_messages()['warnings']
 
     def get_comments(self):
         """Find the comments in the MCNP output file.
@@ -219,13 +404,7 @@ class EddyMCNPCase:
         Returns:
             list: A list of the comments
         """
-        PATTERN_comments = re.compile(r'comment\.\s+[A-Za-z0-9].+')    # Ignores blank comment lines
-        comments = []
-        for line in self.file:
-            if PATTERN_comments.search(line):
-                comment = line[10:].strip().capitalize()
-                comments.append(comment)
-        return comments
+        return self.get_messages()['comments']
 
     def get_duplicate_surfaces(self):
         """Find all the duplicate surface messages in the mcnp output
@@ -233,13 +412,7 @@ class EddyMCNPCase:
         Returns:
             list: A list of the duplicate surfaces
         """
-        duplicate_surfaces = []
-        PATTERN_duplicates = re.compile(r'\ssurface\s+\d+.+and surface.+are the same.+')
-        for line in self.file:
-            if PATTERN_duplicates.match(line):
-                if line.strip().capitalize() not in duplicate_surfaces:
-                    duplicate_surfaces.append(line.strip().capitalize())
-        return duplicate_surfaces
+        return self.get_messages()['duplicate_surfaces']
 
     def get_k_eff(self):
         """Search the output data for the section concerning k-effective, and create a single dictionary holding the data
@@ -249,8 +422,13 @@ class EddyMCNPCase:
         """
         PATTERN_k_eff = re.compile(r'^\s*problem\s+keff.+')
         k_eff = {}
-        for num, line in enumerate(self.file):
-            if PATTERN_k_eff.match(line):
+        # the half-problem keff table is printed in the final keff pages, after the 'keff results for' heading
+        page = self.get_page_index().first('keff results for')
+        if page:
+            for num in range(page.start, len(self.file) - 4):
+                line = self.file[num]
+                if not PATTERN_k_eff.match(line):
+                    continue
                 first_half = re.split(r'\s{2,}', self.file[num+2].strip())
                 k_eff['first half k_eff'] = float(first_half[1])
                 k_eff['first half stdev'] = float(first_half[2])
@@ -270,12 +448,28 @@ class EddyMCNPCase:
         Returns:
             dict: A dictionary with entries for active and inactive cycles
         """
-        cycles = {}
-        for line in self.file:
-            if "the minimum estimated standard deviation for the col/abs/tl keff estimator occurs with" in line:
-                cycles["inactive"] = int(line.split()[12])
-                cycles["active"] = int(line.split()[16])
-        return cycles
+        return self.get_messages()['cycles']
+
+    def get_cross_sections(self):
+        """Read the cross-section tables page (print table 100).
+
+        Returns:
+            CrossSectionTables: The cross-section tables MCNP loaded (empty if the page is not printed)
+        """
+        data = [line for page in self.get_page_index().table(100) for line in self.file[page.start:page.end]]
+        return read_cross_sections(data)
+
+    def get_cache_summary(self):
+        """Summarise the case for the parse cache, which keeps the summary beside the cached case so that
+        many runs can be searched without loading them, e.g. for the nuclear data libraries they used.
+
+        Returns:
+            dict: The file path of the output, and the number of tables read from each library
+        """
+        return {
+            'filepath': self.filepath,
+            'libraries': {summary.library: summary.tables for summary in self.cross_sections.libraries()},
+        }
 
     def get_cell_data(self):
         """Loop through the mcnp output to find the section containing the cell data
@@ -283,17 +477,14 @@ class EddyMCNPCase:
         Returns:
             list: The section of the output containing the cell data
         """
-        PATTERN_cells_start = re.compile(r'1cells')
         PATTERN_cells_ends = re.compile(r' total')
         cell_section = []
-        for line in self.file:
-            if PATTERN_cells_start.match(line):
-                cell_start_line = self.file.index(line)
-                for row in self.file[cell_start_line:]:
-                    cell_section.append(row.strip('\n'))
-                    if PATTERN_cells_ends.match(row):
-                        break
-                break
+        page = self.get_page_index().first('cells')
+        if page:
+            for row in self.file[page.start:]:
+                cell_section.append(row.strip('\n'))
+                if PATTERN_cells_ends.match(row):
+                    break
         return cell_section
 
     def get_particle_populations(self, particle):
@@ -308,226 +499,291 @@ class EddyMCNPCase:
             list: the lines from the output file concerning populations of that particle,
                     or None if no particle information is found
         """
-        PATTERN_run_terminated = re.compile(r'^\+\s+\d\d/\d\d/\d\d(.+)')
-        PATTERN_particle_populations = re.compile(fr'^1{particle}\s+activity\sin\seach\scell.+')
         PATTERN_end_populations = re.compile(r'\s+total.+')
-        for n, line in enumerate(self.file):
-            if PATTERN_run_terminated.match(line):
-                terminated = n
-                for m, new_line in enumerate(self.file[terminated:], start=terminated):
-                    if PATTERN_particle_populations.match(new_line):
-                        for p in range(m, len(self.file)):
-                            if PATTERN_end_populations.match(self.file[p]):
-                                particle_populations = self.file[m:p + 1]
-                                return particle_populations
+        page_index = self.get_page_index()
+        if not page_index.anchors:
+            return None
+        page = page_index.first(f'{particle} activity in each cell', after=page_index.anchors[0])
+        if page:
+            for p in range(page.start, len(self.file)):
+                if PATTERN_end_populations.match(self.file[p]):
+                    particle_populations = self.file[page.start:p + 1]
+                    return particle_populations
         return None
 
-    def create_cells(self):
-        """Take the cell data and create objects of the Cell class
+    def get_weight_balance(self, particle):
+        """Find the weight balance in each cell table (print table 130) of a particle. The table
+        can run over several pages, so the lines of all its pages in the first run section are joined.
+
+        Args:
+            particle (str): either 'photon', 'neutron' or 'electron'
 
         Returns:
-            list: a list of all the Cell objects
+            list: the lines of the table, or None if there is no table for that particle
+        """
+        page_index = self.get_page_index()
+        if not page_index.anchors:
+            return None
+        start, end = page_index.run_sections()[0]
+        pages = [page for page in page_index.pages_after(f'{particle} weight balance in each cell', start)
+                 if page.start < end]
+        if not pages:
+            return None
+        return [line for page in pages for line in self.file[page.start:page.end]]
+
+    def create_cells(self):
+        """Take the cell data and create the table of cells
 
+        Returns:
+            CellTable: the cells, with a typed array for each column
         """
-        cell_list = []
-        header = (self.cell_data[2].split())
+        header = self.cell_data[2].split() if len(self.cell_data) >= 3 else []
         PATTERN_cell = re.compile(r'\s+\d+\s.+')
-        for line in self.cell_data[1:]:
-            if PATTERN_cell.match(line):
-                info = line.split()
-                neutron_importance = self.get_particle_importance(header, info, 'neutron')
-                photon_importance = self.get_particle_importance(header, info, 'photon')
-                electron_importance = self.get_particle_importance(header, info, 'electron')
-                cell_list.append(Cell(
-                    cell_number=info[1],
-                    material_number=info[2],
-                    atom_density=info[3],
-                    gram_density=info[4],
-                    volume=info[5],
-                    mass=info[6],
-                    neutron_importance=neutron_importance,
-                    photon_importance=photon_importance,
-                    electron_importance=electron_importance,
-                    )
-                )
-        return cell_list
-
-    def find_mcnp_particle_data(self, particle):
-        """Find the particle data in the mcnp output.
+        rows = [line.split() for line in self.cell_data[1:] if PATTERN_cell.match(line)]
+        importance_columns = {particle: self.get_importance_column(header, particle) for particle in CellTable.PARTICLES}
+        return CellTable.from_rows(rows, importance_columns)
+
+    def get_particle_data(self, after=0):
+        """Find the creation and loss table of every particle in the mcnp output.
 
         Args:
-            particle (str): either neutron, photon or electron
+            after (int): Only look in the run sections with lines from this line onwards
 
         Returns:
-            list: The part of the MCNP output with the particle data
+            dict: The part of the MCNP output with the table of each particle, keyed by particle
         """
-        particle_data = None  # ensure we return None if data is not found
-        PATTERN_run_terminated = re.compile(r'^\+\s+\d\d/\d\d/\d\d(.+)')
-        PATTERN_particle = {
-            'neutron': re.compile(r'\sneutron\screation\s+tracks.+'),
-            'photon': re.compile(r'\sphoton\screation\s+tracks.+'),
-            'electron': re.compile(r'\selectron\screation\s+tracks.+')
-        }
-        # The particle data tables are different lengths for the different particle types
-        particle_data_lines = {'neutron': 28, 'photon': 33, 'electron': 24}
-        # Find the particle data and save to a list
-        for n, line in enumerate(self.file):
-            if PATTERN_run_terminated.match(line):
-                terminated = n
-                for m, new_line in enumerate(self.file[terminated:], start=terminated):
-                    if PATTERN_particle[particle].match(new_line):
-                        particle_data = self.file[m:m + particle_data_lines[particle]]
-                        break
+        particle_data = {}
+        # Use the tables from the last run (or dump) that printed one for each particle
+        for start, end in self.get_page_index().run_sections():
+            if end > after:
+                particle_data.update(find_particle_tables(self.file, start, end))
         return particle_data
 
     def create_particle(self, particle, particle_data):
-        """Get the relevant information from the particle data (by calling another method), then create a Particle object
+        """Read the creation and loss table of a particle into a Particle object
 
         Args:
-            particle (str): Either 'neutron', 'photon' or 'electron'
+            particle (str): The particle, e.g. 'neutron' or 'proton'
             particle_data (list): The part of the MCNP output with the particle data for this particle
 
         Returns:
             Particle: The new particle object
         """
-        creation_data, loss_data, total_data = self.sort_mcnp_particle_data(particle, particle_data)
-        return Particle(
-            particle_type=particle,
-            creation_data=creation_data,
-            loss_data=loss_data,
-            total_data=total_data,
-        )
+        return read_particle_table(particle, particle_data)
 
-    def get_tallies(self):
+    def get_tallies(self, after=None, tallies=None, following=False):
         """Find the tally sections in the MCNP output.
+        The line after the last complete tally section read is kept in tallies_read_to,
+        so that a later call can carry on from there.
+
+        Args:
+            after (int): Only read the tally sections starting on or after this line
+                (by default, all the tally sections after the first run termination line)
+            tallies (tuple): The tally_list and f_types to add the new tallies to (by default, new empty ones)
+            following (bool): True if the output is still being written, so the last tally
+                section may not have been finished yet
 
         Returns:
-            tuple: the tally_list, f_types, F2_tallies, F4_tallies, F5_tallies, F6_tallies variables
+            tuple: the tally_list and f_types variables; the tallies are sorted into groups by group_tallies
         """
-        tally_list = []   # list of all tallies
-        f_types = []
-        F2_tallies = {'neutrons': [], 'photons': [], 'electrons': []}
-        F4_tallies = {'neutrons': [], 'photons': [], 'electrons': []}
-        F5_tallies = {'neutrons': [], 'photons': [], 'electrons': []}
-        F6_tallies = {'neutrons': [], 'photons': [], 'electrons': [], 'Collision Heating': []}
+        if tallies is None:
+            tallies = (
+                [],  # list of all tallies
+                [],
+            )
+        tally_list, f_types = tallies
 
-        PATTERN_run_terminated = re.compile(r'^\+\s+\d\d/\d\d/\d\d(.+)')
         PATTERN_tally_start = re.compile(r'^\s*1tally\s+\d+\s+nps.+')
-        PATTERN_tally_end = re.compile(r'(^\s*(1tally|1status).+)')
-        for n, line in enumerate(self.file):
-            if PATTERN_run_terminated.match(line):
-                terminated = n
-                for m, new_line in enumerate(self.file[terminated:], start=terminated):
-                    if PATTERN_tally_start.match(new_line):
-                        tally_start = m
-                        for o, other_line in enumerate(self.file[tally_start + 1:], start=tally_start + 1):
-                            if PATTERN_tally_end.match(other_line):
-                                tally_end = o
-                                break
-                        try:
-                            tally_data = self.file[tally_start:tally_end]
-                        except NameError:
-                            print("Eddy did not find the end of one of the tally data sections.")
-                            raise
-                        tally_type = tally_data[1].split()[2]
-                        # Create tally object
-                        if tally_type == "2":
-                            new_tally = F2Tally(tally_data)
-                            F2_tallies[new_tally.particles].append(new_tally)
-                        elif tally_type == "4":
-                            new_tally = F4Tally(tally_data)
-                            F4_tallies[new_tally.particles].append(new_tally)
-                        elif tally_type == "5":
-                            new_tally = F5Tally(tally_data)
-                            F5_tallies[new_tally.particles].append(new_tally)
-                        elif tally_type == "6" or tally_type == "6+":
-                            new_tally = F6Tally(tally_data)
-                            F6_tallies[new_tally.particles].append(new_tally)
-                        else:
-                            raise Exception("This tally type is not recognised")
-                        assert new_tally, "EddyCase.get_tallies failed to create a recognised tally"
-                        tally_list.append(new_tally)
-                        if new_tally.f_type not in f_types:
-                            f_types.append(new_tally.f_type)
-                break
-        return tally_list, f_types, F2_tallies, F4_tallies, F5_tallies, F6_tallies
+        page_index = self.get_page_index()
+        if not page_index.anchors:
+            return tally_list, f_types
+        if after is None:
+            after = page_index.anchors[0]
+        self.tallies_read_to = after
+        for page in page_index.pages_after('tally', after):
+            if not PATTERN_tally_start.match(self.file[page.start]):
+                continue
+            # the tally section runs on through its tfc analysis pages, up to the next tally or status page
+            end_page = page_index.next_page(page, ('tally', 'status'))
+            if end_page is None:
+                if following:
+                    break   # the rest of this section has not been written yet
+                print("Eddy did not find the end of one of the tally data sections.")
+                raise Exception(f"The section for tally {page.number} has no end.")
+            tally_data = self.file[page.start:end_page.start]
+            # Create tally object, using the Tally subclass registered for its type
+            new_tally = create_tally(tally_data)
+            tally_list.append(new_tally)
+            if isinstance(new_tally, RawTally):
+                print(f"Tally {new_tally.tally_number} has been kept as it is: {new_tally.reason}")
+            elif new_tally.f_type not in f_types:
+                f_types.append(new_tally.f_type)
+            self.tallies_read_to = end_page.start
+        return tally_list, f_types
+
+    def get_fluctuation_charts(self, after=0):
+        """Find the tally fluctuation charts in the MCNP output. If the output has more than one
+        chart for a tally (e.g. from a continued run), the last one is kept.
 
-    @staticmethod
-    def sort_mcnp_particle_data(particle, data):
-        """Separate out the photon data into creation, loss, and total data,
-        then split each by indices and put into a dictionary
+        Args:
+            after (int): Only read the pages with lines from this line onwards
+
+        Returns:
+            dict: The FluctuationChart of each tally, keyed by tally number
+        """
+        charts = {}
+        for page in self.get_page_index().pages_of('tally fluctuation charts'):
+            if page.end <= after:
+                continue
+            for chart in read_fluctuation_charts(self.file[page.start:page.end]):
+                charts[chart.tally_number] = chart
+        return charts
+
+    def get_check_status(self):
+        """Read the status of the statistical checks of every tally, from the table MCNP prints
+        for all the tallies at once. If the output has more than one table (e.g. from a continued run),
+        the last one is kept.
+
+        Returns:
+            dict: The CheckStatus of each tally, keyed by tally number
+        """
+        page = self.get_page_index().pages_of(STATUS_PAGE)
+        if not page:
+            return {}
+        return read_check_status(self.file[page[-1].start:page[-1].end])
+
+    def get_tally_densities(self, after=0):
+        """Read the unnormed tally density of each tally (print table 161). If the output has more
+        than one table for a tally, the last one is kept.
 
         Args:
-            data (list): The part of the MCNP output with the particle data for this particle
-            particle (str): either neutron, photon or electron
+            after (int): Only read the pages with lines from this line onwards
 
         Returns:
-            a tuple containing
-                creation_dict: The particle creation data,
-                loss_dict: The particle loss data,
-                total_dict: The particle neutron data,
+            dict: The TallyDensity of each tally, keyed by tally number
         """
-        # TODO: Make this whole method clearer
+        densities = {}
+        for page in self.get_page_index().table(161):
+            if page.end <= after:
+                continue
+            density = read_tally_density(self.file[page.start:page.end])
+            densities[density.tally_number] = density
+        return densities
+
+    def get_mesh_tallies(self):
+        """Read the FMESH mesh tallies from the meshtal file next to the MCNP output, if the input has
+        any fmesh cards. The file is only read again if it has changed since it was last read.
+        A meshtal file that cannot be read (a ValueError or OSError) does not stop the rest of the
+        output being converted; any other error is a bug in Eddy, so is not caught.
 
-        indices = [0, 18, 27, 41, 55]
-        particle_data_table_range = {
-            'photon': range(3, 27),
-            'neutron': range(3, 22),
-            'electron': range(3, 18),
-        }
-        particle_summary_range = {
-            'photon': range(28, 32),
-            'neutron': range(23, 27),
-            'electron': range(19, 23),
-        }
-        creation_dict = {}
-        loss_dict = {}
-
-        # get particle numbers from table in mcnp output
-        for line_num in particle_data_table_range[particle]:
-            # Separate creation data
-            creation = data[line_num][:55]
-            # split the line into 4 columns
-            creation = [creation[indices[i]:indices[i + 1]].strip() for i in range(len(indices) - 1)]
-            creation_dict[creation[0]] = {'tracks': int(creation[1]),
-                                          'weight': float(creation[2]),
-                                          'energy': float(creation[3]),
-                                          }
-            # Separate loss data
-            loss_line = data[line_num][64:]
-            # for photons there are fewer loss values than creation values, so we check if the line has contents
-            if loss_line.isspace() is False:
-                # split the line into 4 columns
-                loss = [loss_line[indices[i]:indices[i + 1]].strip() for i in range(len(indices) - 1)]
-                loss_dict[loss[0]] = {'tracks': int(loss[1]),
-                                      'weight': float(loss[2]),
-                                      'energy': float(loss[3]),
-                                      }
-
-        # get summary data for particle
-        total_dict = {}
-        for line_num in particle_summary_range[particle]:
-            total = data[line_num][:42].strip(), data[line_num][42:53].strip()
-            total_dict[total[0]] = total[1]
-
-        return creation_dict, loss_dict, total_dict
+        Returns:
+            list: A MeshTally for each mesh tally in the meshtal file
+        """
+        PATTERN_fmesh = re.compile(r'^\s{0,4}fmesh\d+\s*:', re.IGNORECASE)
+        if not any(PATTERN_fmesh.match(line) for line in self.mcnp_input):
+            return []
+        meshtal = find_meshtal(self.filepath)
+        if meshtal is None:
+            print(f"The input has fmesh cards, but no meshtal file was found for {self.name}")
+            return []
+        if self.meshtal_read == (meshtal, os.path.getmtime(meshtal)):
+            return self.mesh_tallies
+        try:
+            # big meshes are kept on disk, next to the meshtal file, rather than in memory
+            mesh_tallies = read_meshtal(meshtal, memmap=os.path.getsize(meshtal) > MEMMAP_FILE_SIZE)
+        except (ValueError, OSError) as error:
+            print(f"The mesh tallies in {meshtal} could not be read: {error}")
+            return []
+        self.meshtal_read = (meshtal, os.path.getmtime(meshtal))
+        return mesh_tallies
 
     @staticmethod
-    def get_particle_importance(header, data, particle):
-        """For a particular particle type, determine the importance of that particle.
-        This function is called for each cell as part of its creation.
+    def get_importance_column(header, particle):
+        """For a particular particle type, find which column of the cell table holds its importance.
 
         Args:
-            header (list): The particle population table header.
-            data (list): The section of the mcnp output with the cell data.
+            header (list): The words of the cell table heading that names the particles.
             particle (str): Either 'neutron', 'photon' or 'electron'.
 
         Returns:
-            str: The particle importance, or 0.
+            int: The position of the importance in the words of each cell's line, or None if the particle has none.
 
         """
         if particle in header:
-            particle_importance = data[header.index(particle) + 6]
-        else:
-            particle_importance = '0'
-        return particle_importance
+            return header.index(particle) + 6
+        return None
+
+
+class ScaledMCNPCase:
+    """A view of an EddyMCNPCase with its tally results multiplied by a scaling factor.
+    Everything except the scaling factor and the tallies is read from the original case,
+    and the scaled tallies are only created when they are first needed.
+    """
+
+    def __init__(self, case, scaling_factor):
+        """
+        Args:
+            case (EddyMCNPCase): The case to scale
+            scaling_factor (float): A number to multiply the tally results by
+        """
+        self.case = case
+        self.scaling_factor = scaling_factor
+        self.scaled_tallies = None
+
+    def __getattr__(self, name):
+        # only called for attributes the view does not set itself
+        if name == 'case':
+            raise AttributeError(name)
+        return getattr(self.case, name)
+
+    def __repr__(self):
+        return f"{self.case.name} scaled by {self.scaling_factor}"
+
+    def scaled(self, scaling_factor=None):
+        """Get a view of the original case with a different scaling factor.
+
+        Args:
+            scaling_factor (float): A number to multiply the tally results by (by default, this view's)
+
+        Returns:
+            ScaledMCNPCase: The scaled view
+        """
+        if scaling_factor is None or scaling_factor == self.scaling_factor:
+            return self
+        return self.case.scaled(scaling_factor)
+
+    def get_scaled_tally(self, tally):
+        """Get the scaled view of one of the case's tallies, creating the views of all of them on the first call.
+
+        Args:
+            tally (Tally): A tally from the original case
+
+        Returns:
+            ScaledTally: The scaled view of the tally
+        """
+        if self.scaled_tallies is None:
+            self.scaled_tallies = {id(other): other.scaled(self.scaling_factor) for other in self.case.tally_list}
+        return self.scaled_tallies[id(tally)]
+
+    def scale_tally_dict(self, tallies):
+        """Scale a dictionary of lists of tallies, such as tally_groups['F4']
+
+        Args:
+            tallies (dict): The tallies of one type, keyed by particle
+
+        Returns:
+            dict: The scaled tallies, keyed by particle
+        """
+        return {particle: [self.get_scaled_tally(tally) for tally in tallies[particle]] for particle in tallies}
+
+    @property
+    def tally_list(self):
+        return [self.get_scaled_tally(tally) for tally in self.case.tally_list]
+
+    @property
+    def tally_groups(self):
+        return {group: self.scale_tally_dict(tallies) for group, tallies in self.case.tally_groups.items()}
+
+    @property
+    def mesh_tallies(self):
+        return [mesh_tally.scaled(self.scaling_factor) for mesh_tally in self.case.mesh_tallies]
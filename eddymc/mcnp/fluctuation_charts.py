@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""
+    This module holds the FluctuationChart class, which holds the tally fluctuation chart
+    of one tally: the mean, relative error, variance of the variance, pdf slope and figure
+    of merit of the tally fluctuation chart (tfc) bin, printed every few thousand histories.
+
+    MCNP prints the charts of up to three tallies side by side on the '1tally fluctuation charts' pages:
+
+                            tally        4                          tally       14
+          nps      mean     error   vov  slope    fom      mean     error   vov  slope    fom
+       256000   1.1006E-03 0.0004 0.0011  1.8 9.9E+07   9.8742E-04 0.0004 0.0002  1.7 1.0E+08
+
+    When the relative error rounds to zero, MCNP prints the figure of merit as 1.0E+30;
+    these figures of merit are read as nan, as they are not really known.
+"""
+
+# Imports from standard library
+import re
+# Third party imports
+import numpy as np
+
+# The figure of merit MCNP prints when the relative error is zero
+FOM_UNDEFINED = 1.0E+30
+
+
+class FluctuationChart:
+    """The tally fluctuation chart of one tally, as arrays with one entry per line of the chart."""
+    COLUMNS = ('mean', 'error', 'vov', 'slope', 'fom')
+
+    def __init__(self, tally_number, nps, mean, error, vov, slope, fom):
+        """
+        Args:
+            tally_number (str): The number of the tally
+            nps (numpy.ndarray): The number of histories run at each line of the chart
+            mean (numpy.ndarray): The mean of the tfc bin
+            error (numpy.ndarray): The relative error of the mean
+            vov (numpy.ndarray): The variance of the variance
+            slope (numpy.ndarray): The slope of the tail of the pdf of history scores
+            fom (numpy.ndarray): The figure of merit
+        """
+        self.tally_number = tally_number
+        self.nps = nps
+        self.mean = mean
+        self.error = error
+        self.vov = vov
+        self.slope = slope
+        self.fom = fom
+
+    def __repr__(self):
+        return f"Fluctuation chart of tally {self.tally_number}, {len(self.nps)} lines"
+
+    def scaled(self, scaling_factor):
+        """Get a copy of the chart with the mean multiplied by a scaling factor; the other columns are unchanged.
+
+        Args:
+            scaling_factor (float): a number by which the tally results are multiplied
+
+        Returns:
+            FluctuationChart: The scaled chart
+        """
+        return FluctuationChart(self.tally_number, self.nps, self.mean * scaling_factor,
+                                self.error, self.vov, self.slope, self.fom)
+
+
+def read_fluctuation_charts(data):
+    """Read every tally fluctuation chart on a '1tally fluctuation charts' page.
+
+    Args:
+        data (list): The lines of the page
+
+    Returns:
+        list: A FluctuationChart for each tally on the page
+    """
+    PATTERN_tally_heading = re.compile(r'^(\s+tally\s+\d+)+\s*$')
+    charts = []
+    n = 0
+    while n < len(data):
+        if not PATTERN_tally_heading.match(data[n]):
+            n += 1
+            continue
+        tally_numbers = data[n].split()[1::2]
+        # the chart lines start after the column headings, and end at the first line that is not numbers
+        start = end = n + 2
+        while end < len(data) and data[end].split() and data[end].split()[0].isdigit():
+            end += 1
+        if end > start:
+            # the whole block is converted to numbers at once, rather than a line at a time
+            block = np.array(' '.join(data[start:end]).split(), dtype=float)
+            block = block.reshape(end - start, 1 + len(FluctuationChart.COLUMNS) * len(tally_numbers))
+            for position, tally_number in enumerate(tally_numbers):
+                first = 1 + position * len(FluctuationChart.COLUMNS)
+                mean, error, vov, slope, fom = block[:, first:first + len(FluctuationChart.COLUMNS)].T
+                fom = np.where(fom >= FOM_UNDEFINED, np.nan, fom)
+                charts.append(FluctuationChart(tally_number, block[:, 0], mean, error, vov, slope, fom))
+        n = end
+    return charts
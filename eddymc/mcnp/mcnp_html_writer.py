@@ -14,13 +14,18 @@ try:
 except ImportError:
     import importlib_resources as pkg_resources
 # Third party imports:
-from jinja2 import Template, escape
+from jinja2 import Template
+from markupsafe import Markup
 # local imports
 try:
     from .. import static
+    from ..svg_charts import heat_map, line_chart
 except ValueError:
     import static
+    from svg_charts import heat_map, line_chart
 
+# The largest number of regions of a repeated-structure tally, or of bins of one region, listed in a table
+MAX_REGION_ROWS = 1000
 
 
 def get_css():
@@ -42,15 +47,18 @@ def get_html(case):
     Returns:
         html (str): The completed html output
     """
+    # the results are shown at the case's scaling factor (a scaled view is shown as it is)
+    case = case.scaled()
     inline_css = get_css()
 
     html_template = pkg_resources.read_text(static, 'MCNP_template.html')
-    template = Template(html_template)
+    # autoescape replaces any html control characters in the output data as it is rendered
+    template = Template(html_template, autoescape=True)
     html = template.render(
         filename=case.filepath,
         case_name=case.name,
         # logo=f"{os.getcwd()}/static/logo.png",
-        inline_css=inline_css,
+        inline_css=Markup(inline_css),  # the css is trusted, so is not escaped
         rundate=case.rundate,
         runtime=case.runtime,
         date=datetime.datetime.now().strftime("%Y/%m/%d"),
@@ -64,16 +72,19 @@ def get_html(case):
         k_eff=case.k_effective,
         tally_list=case.tally_list,
         tally_types=case.f_types,
-        f2_tallies=case.F2_tallies,
-        f4_tallies=case.F4_tallies,
-        f5_tallies=case.F5_tallies,
-        f6_tallies=case.F6_tallies,
+        tally_groups=case.tally_groups,
+        raw_tallies=case.raw_tallies,
+        mesh_tallies=case.mesh_tallies,
         warnings=case.warnings,
         comments=case.comments,
         duplicate_surfaces=case.duplicate_surfaces,
         cell_list=case.cell_list,
+        cross_sections=case.cross_sections,
         particle_list=case.particle_list,
         input_deck=case.mcnp_input,
         cycles=case.cycles,
+        line_chart=line_chart,
+        heat_map=heat_map,
+        max_rows=MAX_REGION_ROWS,
         )
     return html
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""
+    This module reads FMESH mesh tallies from the meshtal file MCNP writes alongside the output.
+    A meshtal file can hold millions of voxels, so it is read in a stream, a block of lines at
+    a time, straight into NumPy arrays (optionally memory-mapped .npy files written next to the
+    meshtal file, e.g. 'case.msht.14.results.npy'), and the
+    html only shows a summary and downsampled slices of each mesh.
+
+    Only the column format (the default, 'out=col' or 'out=cf') is read:
+
+     Mesh Tally Number        14
+     neutron   mesh tally.
+
+     Tally bin boundaries:
+        X direction:    -10.00     0.00     10.00
+        Y direction:    -10.00     0.00     10.00
+        Z direction:    -10.00    10.00
+        Energy bin boundaries:  0.00E+00  1.00E+36
+
+       X         Y         Z     Result     Rel Error
+     -5.000E+00 -5.000E+00  0.000E+00 1.23456E-03 1.23456E-02
+"""
+
+# Imports from standard library
+import os
+import re
+from itertools import islice
+# Third party imports
+import numpy as np
+# Local imports
+from ..line_reader import strip_compression_extension
+
+# The number of voxel lines converted to numbers at a time
+BLOCK_LINES = 100000
+# Meshtal files bigger than this (in bytes) are read into memory-mapped .npy files rather than into memory
+MEMMAP_FILE_SIZE = 256 * 1024 * 1024
+# The largest number of pixels along each side of a downsampled slice
+SLICE_SIZE = 100
+# The names of the coordinate columns, and the axes they give the position on
+COORDINATE_COLUMNS = {'X': 'X', 'Y': 'Y', 'Z': 'Z', 'R': 'R', 'Th': 'Theta', 'Theta': 'Theta'}
+
+
+class MeshTally:
+    """A single FMESH tally, with its results and relative errors in arrays of (energy, axis 1, axis 2, axis 3).
+    If the tally has more than one energy bin, the last energy slot holds MCNP's total over energy.
+    """
+
+    def __init__(self, tally_number, particle, axes, edges, energies, results, errors):
+        """
+        Args:
+            tally_number (str): The number of the mesh tally
+            particle (str): The particle tallied
+            axes (tuple): The names of the three spatial axes, e.g. ('X', 'Y', 'Z') or ('R', 'Z', 'Theta')
+            edges (dict): The bin boundaries along each spatial axis
+            energies (numpy.ndarray): The energy bin boundaries
+            results (numpy.ndarray): The result in each voxel
+            errors (numpy.ndarray): The relative error in each voxel
+        """
+        self.tally_number = tally_number
+        self.particle = particle
+        self.axes = axes
+        self.edges = edges
+        self.energies = energies
+        self.results = results
+        self.errors = errors
+        self.summarise()
+
+    def __repr__(self):
+        shape = ' x '.join(str(len(self.edges[axis]) - 1) for axis in self.axes)
+        return f"Mesh tally {self.tally_number} ({self.particle}), {shape} voxels"
+
+    def __getstate__(self):
+        # memory-mapped arrays are pickled as the path and modification time of their .npy file,
+        # rather than as their contents
+        state = self.__dict__.copy()
+        for name in ('results', 'errors'):
+            array = state[name]
+            if isinstance(array, np.memmap) and array.filename:
+                state[name] = (array.filename, os.path.getmtime(array.filename))
+        return state
+
+    def __setstate__(self, state):
+        # if the .npy file has since been deleted, or written again by a later read of the meshtal file,
+        # the summary and slices are still there to write the html
+        for name in ('results', 'errors'):
+            if isinstance(state[name], tuple):
+                path, modified = state[name]
+                if os.path.isfile(path) and os.path.getmtime(path) == modified:
+                    state[name] = np.load(path, mmap_mode='r')
+                else:
+                    state[name] = None
+        self.__dict__.update(state)
+
+    @property
+    def total(self):
+        """numpy.ndarray: The results over all energies, for each voxel"""
+        return self.results[-1]
+
+    def summarise(self):
+        """Find the peak and mean of the results over all energies, and the downsampled slices through the peak."""
+        total = self.results[-1]
+        peak_index = np.unravel_index(np.argmax(total), total.shape)
+        self.peak = float(total[peak_index])
+        self.peak_error = float(self.errors[-1][peak_index])
+        self.peak_location = tuple(
+            float((self.edges[axis][i] + self.edges[axis][i + 1]) / 2) for axis, i in zip(self.axes, peak_index))
+        self.mean = float(total.mean())
+        self.slices = []
+        for dimension, axis in enumerate(self.axes):
+            plane = tuple(other for other in self.axes if other != axis)
+            section = np.take(total, peak_index[dimension], axis=dimension)
+            if min(section.shape) > 1:
+                self.slices.append((axis, self.peak_location[dimension], plane, downsample(section)))
+
+    def scaled(self, scaling_factor):
+        """Get a view of this mesh tally with its results multiplied by a scaling factor.
+
+        Args:
+            scaling_factor (float): a number by which the results are multiplied
+
+        Returns:
+            ScaledMeshTally: The scaled view
+        """
+        return ScaledMeshTally(self, scaling_factor)
+
+
+class ScaledMeshTally:
+    """A view of a MeshTally with its results multiplied by a scaling factor. Only the summary and slices
+    are scaled straight away; the full arrays are only scaled if they are asked for.
+    """
+
+    def __init__(self, mesh_tally, scaling_factor):
+        """
+        Args:
+            mesh_tally (MeshTally): The mesh tally to scale
+            scaling_factor (float): a number by which the results are multiplied
+        """
+        self.mesh_tally = mesh_tally
+        self.scaling_factor = scaling_factor
+        self.peak = mesh_tally.peak * scaling_factor
+        self.mean = mesh_tally.mean * scaling_factor
+        self.slices = [(axis, position, plane, section * scaling_factor)
+                       for axis, position, plane, section in mesh_tally.slices]
+
+    def __getattr__(self, name):
+        # only called for attributes the view does not set itself
+        if name == 'mesh_tally':
+            raise AttributeError(name)
+        return getattr(self.mesh_tally, name)
+
+    def __repr__(self):
+        return f"Mesh tally {self.mesh_tally.tally_number} scaled by {self.scaling_factor}"
+
+    @property
+    def results(self):
+        return self.mesh_tally.results * self.scaling_factor
+
+    @property
+    def total(self):
+        return self.mesh_tally.total * self.scaling_factor
+
+
+def downsample(section, size=SLICE_SIZE):
+    """Shrink a 2D slice to at most size x size pixels, each the mean of a block of voxels.
+
+    Args:
+        section (numpy.ndarray): The 2D slice of results
+        size (int): The largest number of pixels along each side
+
+    Returns:
+        numpy.ndarray: The downsampled slice
+    """
+    section = np.asarray(section, dtype=float)
+    for dimension in range(2):
+        length = section.shape[dimension]
+        if length > size:
+            # the blocks are as even as possible; np.add.reduceat sums each block
+            starts = np.linspace(0, length, size, endpoint=False).astype(int)
+            counts = np.diff(np.append(starts, length))
+            shape = [1, 1]
+            shape[dimension] = size
+            section = np.add.reduceat(section, starts, axis=dimension) / counts.reshape(shape)
+    return section
+
+
+def find_meshtal(output_filename):
+    """Find the meshtal file that goes with an MCNP output, in the same directory.
+
+    Args:
+        output_filename (str): The file path (including the name) of the MCNP output
+
+    Returns:
+        str: The path of the meshtal file, or None if there is not one
+    """
+    output_filename = strip_compression_extension(output_filename)
+    directory = os.path.dirname(output_filename)
+    stem = os.path.splitext(os.path.basename(output_filename))[0]
+    for name in (f"{stem}.msht", f"{stem}.meshtal", f"{stem}.m", 'meshtal'):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def read_meshtal(filename, memmap=False):
+    """Read every mesh tally in a meshtal file. A file Eddy cannot read (e.g. one with time bins,
+    or one that ends part way through a tally) raises a ValueError.
+
+    Args:
+        filename (str): The file path (including the name) of the meshtal file
+        memmap (bool): If True, the arrays are kept in .npy files next to the meshtal file
+            and memory-mapped, instead of being held in memory
+
+    Returns:
+        list: A MeshTally for each mesh tally in the file
+    """
+    mesh_tallies = []
+    with open(filename, 'r') as file:
+        for line in file:
+            if line.split()[:3] == ['Mesh', 'Tally', 'Number']:
+                mesh_tallies.append(read_mesh_tally(file, line.split()[3], filename, memmap))
+    return mesh_tallies
+
+
+def read_mesh_tally(file, tally_number, filename, memmap=False):
+    """Read one mesh tally, from the line after its 'Mesh Tally Number' line to its last voxel.
+
+    Args:
+        file (file): The meshtal file, open at the line after the 'Mesh Tally Number' line
+        tally_number (str): The number of the mesh tally
+        filename (str): The file path of the meshtal file, to name the .npy files after
+        memmap (bool): If True, the arrays are kept in .npy files next to the meshtal file
+
+    Returns:
+        MeshTally: The mesh tally
+    """
+    words = next(file, '').split()
+    if not words:
+        raise ValueError(f"Mesh tally {tally_number} does not say which particle it tallies")
+    particle = words[0]
+    axes = []
+    edges = {}
+    energies = np.array([0.0, np.inf])
+    boundaries = None
+    for line in file:
+        words = line.split()
+        if len(words) > 1 and words[1].startswith('direction') and ':' in line:
+            axis = words[0]
+            axis = 'Theta' if axis.startswith('Theta') else axis
+            boundaries = edges[axis] = list(np.array(line.split(':', 1)[1].split(), dtype=float))
+            axes.append(axis)
+        elif 'Energy bin boundaries:' in line:
+            boundaries = list(np.array(line.split(':', 1)[1].split(), dtype=float))
+            energies = boundaries
+        elif 'Result' in line and 'Rel Error' in line:
+            columns = re.findall(r'Energy|Time|Rel Error|Rslt \* Vol|Volume|Result|Theta|Th|[XYZR]', line)
+            break
+        elif 'Time bin boundaries:' in line:
+            raise ValueError(f"Mesh tally {tally_number} has time bins, which Eddy cannot read")
+        elif boundaries is not None and line.strip() and is_numbers(line):
+            boundaries.extend(np.array(line.split(), dtype=float))   # the boundaries run on to another line
+        else:
+            boundaries = None
+    else:
+        raise ValueError(f"Mesh tally {tally_number} has no results in the column format")
+    edges = {axis: np.array(edges[axis]) for axis in axes}
+    energies = np.array(energies)
+
+    # the arrays are (energy, axis 1, axis 2, axis 3); more than one energy bin adds a slot for the total
+    n_energies = len(energies) - 1
+    shape = (n_energies + (1 if n_energies > 1 else 0),) + tuple(len(edges[axis]) - 1 for axis in axes)
+    results = create_array(shape, memmap, filename, tally_number, 'results')
+    errors = create_array(shape, memmap, filename, tally_number, 'errors')
+
+    # the voxels are read a block of lines at a time, and each block is converted to numbers in one go
+    remaining = int(np.prod(shape))
+    result_column = columns.index('Result')
+    error_column = columns.index('Rel Error')
+    while remaining:
+        block = list(islice(file, min(BLOCK_LINES, remaining)))
+        if not block:
+            raise ValueError(f"The meshtal file ends part way through mesh tally {tally_number}")
+        remaining -= len(block)
+        text = ''.join(block).replace('Total', 'inf')
+        # a malformed number, or a line with a missing column, raises a ValueError rather than being skipped
+        data = np.array(text.split(), dtype=float).reshape(len(block), len(columns))
+        index = [np.zeros(len(block), dtype=int)]
+        if 'Energy' in columns:
+            # the energy of each line is its bin (or 'Total', read as inf, for the total slot)
+            energy = data[:, columns.index('Energy')]
+            index[0] = np.where(np.isinf(energy), shape[0] - 1,
+                                np.clip(np.searchsorted(energies[1:], energy), 0, n_energies - 1))
+        for axis in axes:
+            column = next(n for n, name in enumerate(columns) if COORDINATE_COLUMNS.get(name) == axis)
+            index.append(np.clip(np.searchsorted(edges[axis], data[:, column]) - 1, 0, len(edges[axis]) - 2))
+        results[tuple(index)] = data[:, result_column]
+        errors[tuple(index)] = data[:, error_column]
+    if isinstance(results, np.memmap):
+        results.flush()
+        errors.flush()
+    return MeshTally(tally_number, particle, tuple(axes), edges, energies, results, errors)
+
+
+def create_array(shape, memmap, filename, tally_number, name):
+    """Create an array of zeros for a mesh tally, in memory or as a memory-mapped .npy file next to
+    the meshtal file, so that the arrays of different runs are never mixed up.
+
+    Args:
+        shape (tuple): The shape of the array
+        memmap (bool): True to keep the array in a .npy file, or False to keep it in memory
+        filename (str): The file path of the meshtal file, to name the .npy file after
+        tally_number (str): The number of the mesh tally
+        name (str): What the array holds, e.g. 'results'
+
+    Returns:
+        numpy.ndarray: The new array
+    """
+    path = f"{filename}.{tally_number}.{name}.npy"
+    if not memmap or not os.access(os.path.dirname(os.path.abspath(path)), os.W_OK):
+        return np.zeros(shape)
+    return np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=shape)
+
+
+def is_numbers(line):
+    """Check whether a line holds only numbers."""
+    try:
+        np.array(line.split(), dtype=float)
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""This module contains the PageIndex class, which records where each printed page of an
+MCNP output starts and ends, so that the EddyMCNPCase section getters can jump straight
+to the part of the output they need instead of searching the whole file for it.
+
+MCNP starts each printed page with a '1' in the first column, e.g.
+    1cells                                        print table 60
+    1tally        4        nps =     4352000
+    1neutron  activity in each cell               print table 126
+"""
+
+# Imports from standard library
+import re
+from bisect import bisect_left
+from collections import namedtuple
+
+
+# A single printed page of the mcnp output.
+#   kind (str): the page heading with the numbers removed, e.g. 'tally' or 'neutron activity in each cell'
+#   title (str): the whole page heading, with runs of whitespace collapsed
+#   table (int): the print table number, or None if the heading does not give one
+#   number (int): the first number in the heading (the tally number for tally pages), or None
+#   start (int): the index of the heading line in the file
+#   end (int): the index of the first line after the page (the next heading, or the end of the file)
+Page = namedtuple('Page', ['kind', 'title', 'table', 'number', 'start', 'end'])
+
+
+class PageIndex:
+    """A PageIndex is built once from the lines of an mcnp output, and maps each page
+    heading kind and print table number to the pages (line ranges) with that heading.
+    """
+    PATTERN_page_header = re.compile(r'^1([a-z].*)')
+    PATTERN_print_table = re.compile(r'\s+print table\s+(\d+)')
+    PATTERN_run_terminated = re.compile(r'^\+\s+\d\d/\d\d/\d\d(.+)')
+
+    def __init__(self, file):
+        """
+        Args:
+            file (list): The contents of the mcnp output file
+        """
+        self.length = len(file)
+        self.pages = []     # every page, in the order they appear in the file
+        self.kinds = {}     # page kind: list of pages of that kind
+        self.tables = {}    # print table number: list of pages with that table number
+        self.anchors = []   # line numbers of the '+ date time' lines printed when a run (or dump) terminates
+        self._starts = {}   # page kind: list of the start lines of pages of that kind, for bisecting
+        self._page_starts = []
+        self.build(file)
+
+    def __repr__(self):
+        return f"PageIndex of {len(self.pages)} pages in {self.length} lines"
+
+    def build(self, file, start=0):
+        """Walk through the output once, recording each page heading and run termination line.
+
+        Args:
+            file (list): The contents of the mcnp output file
+            start (int): The line to start from; lines before this have already been indexed
+        """
+        headers = []
+        for n, line in enumerate(file[start:], start=start):
+            first = line[:1]
+            if first == '1':
+                match = self.PATTERN_page_header.match(line)
+                if match:
+                    headers.append((n, match.group(1)))
+            elif first == '+':
+                if self.PATTERN_run_terminated.match(line):
+                    self.anchors.append(n)
+        self.length = len(file)
+
+        # the last page already indexed now runs on to the first new heading
+        if self.pages:
+            self.set_last_page_end(headers[0][0] if headers else self.length)
+
+        for position, (start, heading) in enumerate(headers):
+            if position + 1 < len(headers):
+                end = headers[position + 1][0]
+            else:
+                end = self.length
+            page = self.create_page(heading, start, end)
+            self.pages.append(page)
+            self._page_starts.append(page.start)
+            self.kinds.setdefault(page.kind, []).append(page)
+            self._starts.setdefault(page.kind, []).append(page.start)
+            if page.table is not None:
+                self.tables.setdefault(page.table, []).append(page)
+
+    def extend(self, file):
+        """Index the lines added to the end of the output since the index was built,
+        for an output that is still being written.
+
+        Args:
+            file (list): The contents of the mcnp output file, including the new lines
+        """
+        self.build(file, start=self.length)
+
+    def set_last_page_end(self, end):
+        """Move the end of the last page indexed (which is also the last page of its kind and table).
+
+        Args:
+            end (int): The index of the first line after the page
+        """
+        page = self.pages[-1]._replace(end=end)
+        self.pages[-1] = page
+        self.kinds[page.kind][-1] = page
+        if page.table is not None:
+            self.tables[page.table][-1] = page
+
+    def create_page(self, heading, start, end):
+        """Create a Page from the text of a page heading.
+
+        Args:
+            heading (str): The heading line, without the leading '1'
+            start (int): The index of the heading line in the file
+            end (int): The index of the first line after the page
+
+        Returns:
+            Page: The new page
+        """
+        table = None
+        match = self.PATTERN_print_table.search(heading)
+        if match:
+            table = int(match.group(1))
+            heading = heading[:match.start()]
+        title = ' '.join(heading.split())
+        kind = []
+        number = None
+        for word in title.split():
+            if word[0].isdigit():
+                number = int(re.match(r'\d+', word).group())
+                break
+            if '=' in word:
+                break
+            if word.endswith(':'):
+                kind.append(word[:-1])
+                break
+            kind.append(word)
+        return Page(' '.join(kind), title, table, number, start, end)
+
+    def pages_of(self, kind):
+        """Get every page of one kind.
+
+        Args:
+            kind (str): The page kind, e.g. 'tally' or 'cells'
+
+        Returns:
+            list: The pages of that kind, in the order they appear in the file
+        """
+        return self.kinds.get(kind, [])
+
+    def first(self, kind, after=0):
+        """Get the first page of one kind that starts on or after a given line.
+
+        Args:
+            kind (str): The page kind, e.g. 'tally' or 'cells'
+            after (int): The line number to start looking from
+
+        Returns:
+            Page: The first matching page, or None if there is no such page
+        """
+        starts = self._starts.get(kind)
+        if not starts:
+            return None
+        position = bisect_left(starts, after)
+        if position == len(starts):
+            return None
+        return self.kinds[kind][position]
+
+    def pages_after(self, kind, after):
+        """Get every page of one kind that starts on or after a given line.
+
+        Args:
+            kind (str): The page kind, e.g. 'tally' or 'cells'
+            after (int): The line number to start looking from
+
+        Returns:
+            list: The matching pages, in the order they appear in the file
+        """
+        starts = self._starts.get(kind)
+        if not starts:
+            return []
+        return self.kinds[kind][bisect_left(starts, after):]
+
+    def run_sections(self):
+        """Split the output from the first run termination line onwards into one section
+        per termination line. Continued runs and PRDMP dumps print a termination line for
+        every dump, and the sections do not overlap, so scanning them all is linear in the
+        length of the file.
+
+        Returns:
+            list: A list of (start, end) line ranges, one for each termination line
+        """
+        ends = self.anchors[1:] + [self.length]
+        return list(zip(self.anchors, ends))
+
+    def table(self, number):
+        """Get every page printed as a particular print table.
+
+        Args:
+            number (int): The print table number, e.g. 126
+
+        Returns:
+            list: The pages with that print table number
+        """
+        return self.tables.get(number, [])
+
+    def next_page(self, page, kinds):
+        """Find the first page after the given page whose kind begins with one of the given strings.
+
+        Args:
+            page (Page): The page to start from
+            kinds (tuple): The beginnings of the kinds of page to stop at, e.g. ('tally', 'status')
+
+        Returns:
+            Page: The next matching page, or None if there is no such page
+        """
+        position = bisect_left(self._page_starts, page.start)
+        for other_page in self.pages[position + 1:]:
+            if other_page.kind.startswith(kinds):
+                return other_page
+        return None
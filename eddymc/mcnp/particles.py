@@ -2,9 +2,39 @@
 # Peter Evans
 # Cerberus Nuclear Ltd
 
-""" This module holds the code related to particle data. """
+""" This module holds the code related to particle data.
+
+    MCNP prints a creation and loss table for every particle type it tracked, in the problem
+    summary at the end of each run (or dump), followed by a few summary lines:
+
+     neutron creation    tracks      weight        energy            neutron loss        tracks      weight        energy
+                                     (per source particle)                                           (per source particle)
+
+     source             5294245    1.0000E+00    2.1078E+00          escape             5294322    9.9911E-01    2.0165E+00
+     ...
+         total          5294401    1.0000E+00    2.1078E+00              total          5294401    1.0000E+00    2.1078E+00
+
+       number of neutrons banked                      78        average time of (shakes)              cutoffs
+
+    The tables are found from their headings, so any particle MCNP6 prints one for (e.g. protons,
+    deuterons or heavy ions) is read, and the number of rows of each table is not fixed.
+"""
 
 # Standard library imports
+import re
+from collections import namedtuple
+
+# One row of the creation or loss table of a particle.
+#   name (str): the event that created or lost the tracks, e.g. 'weight window', or 'total'
+#   tracks (int): the number of tracks created or lost
+#   weight (float): the weight created or lost, per source particle
+#   energy (float): the energy created or lost, per source particle
+ParticleEvent = namedtuple('ParticleEvent', ['name', 'tracks', 'weight', 'energy'])
+
+PATTERN_particle_table = re.compile(r'^ (\S+(?: \S+)*?) creation\s+tracks\s+weight\s+energy\s+\1 loss\s')
+PATTERN_event = re.compile(r'^\s*(\S.*?)\s+(\d+)\s+(\S+)\s+(\S+)\s*$')
+# a summary line starts near the left margin, with the name followed by its value
+PATTERN_summary = re.compile(r'^ {1,8}([a-z][a-z ]*?)\s+(-?\d+(?:\.\d*)?(?:E[+-]\d+)?)(?=\s|$)')
 
 
 class Particle:
@@ -12,29 +42,99 @@ class Particle:
     This class exists to hold the data on particle populations, creation and loss.
     """
 
-    def __init__(self, creation_data, loss_data, total_data, particle_type):
-        self.attributes = []
+    def __init__(self, particle_type, creation, loss, totals):
+        """
+        Args:
+            particle_type (str): The particle, e.g. 'neutron' or 'proton'
+            creation (list): The ParticleEvent of each row of the creation table, ending with the total
+            loss (list): The ParticleEvent of each row of the loss table, ending with the total
+            totals (dict): The summary values printed under the table, e.g. 'number of neutrons banked'
+        """
         self.particle_type = particle_type
-        for item in creation_data:
-            name = ' '.join(item.split()) + ' creation'
-            name = name.title()
-            self.__dict__[name] = creation_data[item]
-            self.attributes.append(name)
-        for item in loss_data:
-            name = ' '.join(item.split()) + ' loss'
-            name = name.title()
-            self.__dict__[name] = loss_data[item]
-            self.attributes.append(name)
-        for item in total_data:
-            name = ' '.join(item.split()).title()
-            self.__dict__[name] = total_data[item]
-            self.attributes.append(name)
+        self.creation = creation
+        self.loss = loss
+        self.totals = totals
 
     def __repr__(self):
-        """ Print the attributes of the particle to the terminal."""
-        print()
-        print(f"Printing {self.particle_type} Data...".upper())
-        for item in self.attributes:
-            print(f"{item}: {self.__dict__[item]}")
-        print()
+        return f"{self.particle_type.capitalize()} creation and loss, {len(self.creation)} creation and {len(self.loss)} loss rows"
+
+
+def find_particle_tables(file, start=0, end=None):
+    """Find the creation and loss table of every particle in part of the mcnp output, in one pass.
 
+    Args:
+        file (list): The contents of the mcnp output file
+        start (int): The first line to look at
+        end (int): The line after the last line to look at (by default, the end of the file)
+
+    Returns:
+        dict: The lines of each particle's table, from the heading to the last summary line,
+            keyed by particle, in the order they are printed. A table at the end of an output
+            that is still being written is left out until it is finished.
+    """
+    end = len(file) if end is None else end
+    tables = {}
+    n = start
+    while n < end:
+        line = file[n]
+        match = PATTERN_particle_table.match(line) if ' creation ' in line else None
+        if match is None:
+            n += 1
+            continue
+        last = find_table_end(file, n, end)
+        if last is None:
+            break
+        tables[match.group(1)] = file[n:last]
+        n = last
+    return tables
+
+
+def find_table_end(file, start, end):
+    """Find the end of a particle table: the blank line after the summary lines below its total row.
+
+    Args:
+        file (list): The contents of the mcnp output file
+        start (int): The line of the table heading
+        end (int): The line after the last line that may be part of the table
+
+    Returns:
+        int: The line after the table, or None if the table is not finished
+    """
+    n = start + 1
+    while n < end and file[n].split()[:1] != ['total']:
+        n += 1
+    # skip the total row and the blank line after it, then find the blank line after the summary
+    n += 2
+    while n < end and file[n].strip():
+        n += 1
+    return n if n < end else None
+
+
+def read_particle_table(particle_type, data):
+    """Read a particle's creation and loss table and the summary lines below it.
+
+    Args:
+        particle_type (str): The particle, e.g. 'neutron' or 'proton'
+        data (list): The lines of the table, from find_particle_tables
+
+    Returns:
+        Particle: The particle data
+    """
+    # the loss columns start under the loss heading, and the rows are lined up with the headings
+    loss_start = data[0].index(f'{particle_type} loss') - 1
+    creation, loss, totals = [], [], {}
+    in_summary = False
+    for line in data[3:]:
+        if in_summary:
+            match = PATTERN_summary.match(line)
+            if match:
+                totals[match.group(1)] = float(match.group(2))
+            continue
+        for half, events in ((line[:loss_start], creation), (line[loss_start:], loss)):
+            match = PATTERN_event.match(half)
+            if match:
+                name, tracks, weight, energy = match.groups()
+                events.append(ParticleEvent(' '.join(name.split()), int(tracks), float(weight), float(energy)))
+        if line.split()[:1] == ['total']:
+            in_summary = True
+    return Particle(particle_type, creation, loss, totals)
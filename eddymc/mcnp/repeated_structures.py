@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""
+    This module reads the region labels of repeated-structure (universe and lattice) tallies.
+    MCNP prints each region of such a tally with the path from the tallied cell out through
+    the universes that contain it, innermost first, e.g.
+
+     cell (12<5[1 2 0]<3)
+
+    is cell 12, in element [1 2 0] of lattice cell 5, in cell 3. A fuel assembly tally can have
+    tens of thousands of these, so the labels are held in a RegionIndex: the text of each level
+    is stored once, and each region is a row of integer codes, which can be grouped with numpy.
+"""
+
+# Imports from standard library
+import re
+from collections import namedtuple
+# Third party imports
+import numpy as np
+
+# The structured form of one region label.
+#   cell (str): the tallied cell (or cells, e.g. '12 13'), without the enclosing levels
+#   path (tuple): the enclosing levels, innermost first, e.g. ('5[1 2 0]', '3')
+#   lattice (tuple): the index of the innermost lattice element, e.g. (1, 2, 0), or None
+RegionLabel = namedtuple('RegionLabel', ['cell', 'path', 'lattice'])
+
+# The combined results of the regions in one group, e.g. one lattice element.
+#   label (str): the levels the regions share, e.g. '5[1 2 0]<3'
+#   regions (int): the number of regions in the group
+#   mean (float): the mean result of the regions
+#   mean_error (float): the relative error of the mean, treating the regions as independent
+#   peak (float): the highest result in the group
+#   peak_error (float): the relative error of the highest result
+RegionGroup = namedtuple('RegionGroup', ['label', 'regions', 'mean', 'mean_error', 'peak', 'peak_error'])
+
+PATTERN_lattice_index = re.compile(r'\[([^\]]*)\]')
+
+
+class RegionIndex:
+    """The structured labels of the regions of a repeated-structure tally. Each distinct level
+    of text (a cell, or a lattice cell with its element index) is kept once in names; levels
+    is an array of (region, depth) codes into names, innermost first, padded with -1.
+    """
+    __slots__ = ('names', 'levels')
+
+    def __init__(self, names, levels):
+        """
+        Args:
+            names (list): The text of each distinct level
+            levels (numpy.ndarray): The codes of the levels of each region, innermost first, padded with -1
+        """
+        self.names = names
+        self.levels = levels
+
+    def __repr__(self):
+        return f"RegionIndex of {len(self)} regions, up to {self.depth} levels deep"
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __getitem__(self, n):
+        """Get the structured label of one region.
+
+        Args:
+            n (int): The position of the region
+
+        Returns:
+            RegionLabel: The label
+        """
+        levels = [self.names[code] for code in self.levels[n] if code >= 0]
+        path = tuple(levels[1:])
+        lattice = next((get_lattice_index(level) for level in path if '[' in level), None)
+        return RegionLabel(levels[0], path, lattice)
+
+    @classmethod
+    def from_labels(cls, labels):
+        """Build the index from the text of the labels; if none of them is a repeated-structure label,
+        there is nothing to index.
+
+        Args:
+            labels (list): The label of each region, as MCNP prints it (without the leading 'cell' or 'surface')
+
+        Returns:
+            RegionIndex: The index, or None if no label has more than one level
+        """
+        codes = {}
+        rows = []
+        for label in labels:
+            rows.append([codes.setdefault(level, len(codes)) for level in split_levels(label)])
+        depth = max((len(row) for row in rows), default=0)
+        if depth < 2:
+            return None
+        if all(len(row) == depth for row in rows):
+            levels = np.array(rows, dtype=np.int32)
+        else:
+            levels = np.full((len(rows), depth), -1, dtype=np.int32)
+            for n, row in enumerate(rows):
+                levels[n, :len(row)] = row
+        return cls(list(codes), levels)
+
+    @property
+    def depth(self):
+        """int: The largest number of levels in a label"""
+        return self.levels.shape[1]
+
+    def group_keys(self, level):
+        """Find which regions share the same levels from a given level outwards.
+
+        Args:
+            level (int): The first level of the key; 0 is the region itself, 1 the universe containing it, and so on
+
+        Returns:
+            tuple:
+                numpy.ndarray: The levels of each group, one row per group
+                numpy.ndarray: The group of each region
+        """
+        return unique_rows(self.levels[:, level:])
+
+    def lattice_keys(self):
+        """Find which regions are in the same lattice element: the regions that share the levels
+        from their innermost lattice element outwards. A region that is not in a lattice is a group of its own.
+
+        Returns:
+            tuple:
+                numpy.ndarray: The levels of each group, one row per group (padded with -1 for the levels left out)
+                numpy.ndarray: The group of each region
+        """
+        is_lattice = np.array(['[' in name for name in self.names] + [False])   # the code -1 is padding
+        in_lattice = is_lattice[self.levels]
+        first = np.where(in_lattice.any(axis=1), in_lattice.argmax(axis=1), 0)
+        # the levels inside the lattice element are left out of the key
+        shared = np.where(np.arange(self.depth) >= first[:, np.newaxis], self.levels, -1)
+        return unique_rows(shared)
+
+    def label_of(self, key):
+        """Join the levels of a group key into a label, e.g. '5[1 2 0]<3'."""
+        return '<'.join(self.names[code] for code in key if code >= 0) or '(not in a universe)'
+
+    def group_by_level(self, values, errors, level, limit=None):
+        """Combine the results of the regions that share the same levels from a given level outwards.
+
+        Args:
+            values (numpy.ndarray): The result of each region
+            errors (numpy.ndarray): The relative error of each region
+            level (int): The first level shared; 1 groups the regions by the universe containing them
+            limit (int): The largest number of groups to return (by default, all of them)
+
+        Returns:
+            list: A RegionGroup for each group, highest peak first
+        """
+        keys, groups = self.group_keys(level)
+        return combine_groups(keys, self.label_of, groups, values, errors, limit)
+
+    def group_by_lattice_element(self, values, errors, limit=None):
+        """Combine the results of the regions in each lattice element.
+
+        Args:
+            values (numpy.ndarray): The result of each region
+            errors (numpy.ndarray): The relative error of each region
+            limit (int): The largest number of lattice elements to return (by default, all of them)
+
+        Returns:
+            list: A RegionGroup for each lattice element, highest peak first
+        """
+        keys, groups = self.lattice_keys()
+        return combine_groups(keys, self.label_of, groups, values, errors, limit)
+
+    def level_summary(self, values, errors):
+        """Summarise the tally at each universe level: the number of groups at that level, and the group with the peak.
+
+        Args:
+            values (numpy.ndarray): The result of each region
+            errors (numpy.ndarray): The relative error of each region
+
+        Returns:
+            list: A (level, number of groups, RegionGroup with the highest peak) tuple for each level below the region
+        """
+        summary = []
+        for level in range(1, self.depth):
+            keys, groups = self.group_keys(level)
+            peak = combine_groups(keys, self.label_of, groups, values, errors, limit=1)[0]
+            summary.append((level, len(keys), peak))
+        return summary
+
+
+def combine_groups(keys, label_of, groups, values, errors, limit=None):
+    """Combine the results of the regions in each group, in one pass over the arrays.
+    Only the groups that are returned are given labels, so asking for the top few groups of a big tally is cheap.
+
+    Args:
+        keys (numpy.ndarray): The levels of each group, one row per group
+        label_of (function): Turns the levels of a group into its label
+        groups (numpy.ndarray): The group of each region
+        values (numpy.ndarray): The result of each region
+        errors (numpy.ndarray): The relative error of each region
+        limit (int): The largest number of groups to return (by default, all of them)
+
+    Returns:
+        list: A RegionGroup for each group, highest peak first
+    """
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+    errors = np.nan_to_num(np.asarray(errors, dtype=float))
+    size = len(keys)
+    counts = np.bincount(groups, minlength=size)
+    sums = np.bincount(groups, weights=values, minlength=size)
+    variances = np.bincount(groups, weights=(values * errors) ** 2, minlength=size)
+    means = sums / np.maximum(counts, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_errors = np.where(sums != 0, np.sqrt(variances) / np.abs(sums), 0.0)
+    # the peak of each group: sort by group then value, and take the last region of each group
+    order = np.lexsort((values, groups))
+    last = order[np.r_[np.nonzero(np.diff(groups[order]))[0], len(order) - 1]] if len(order) else order
+    peaks = np.zeros(size)
+    peak_errors = np.zeros(size)
+    peaks[groups[last]] = values[last]
+    peak_errors[groups[last]] = errors[last]
+    chosen = np.argsort(-peaks, kind='stable')[:limit]
+    return [RegionGroup(label_of(keys[n]), int(counts[n]), float(means[n]), float(mean_errors[n]),
+                        float(peaks[n]), float(peak_errors[n])) for n in chosen]
+
+
+def unique_rows(array):
+    """Find the distinct rows of an array of codes (which are -1 or more), and which of them each row is.
+    If the codes are small enough, each row is packed into one integer first, which is much faster to sort.
+
+    Args:
+        array (numpy.ndarray): A 2D array of codes
+
+    Returns:
+        tuple:
+            numpy.ndarray: The distinct rows
+            numpy.ndarray: The position in the distinct rows of each row of the array
+    """
+    radix = int(array.max(initial=-1)) + 2
+    if radix ** array.shape[1] < 2 ** 62:
+        weights = radix ** np.arange(array.shape[1] - 1, -1, -1, dtype=np.int64)
+        packed = (array.astype(np.int64) + 1) @ weights
+        _, first, groups = np.unique(packed, return_index=True, return_inverse=True)
+        return array[first], groups.reshape(-1)
+    keys, groups = np.unique(array, axis=0, return_inverse=True)
+    return keys, groups.reshape(-1)
+
+
+def split_levels(label):
+    """Split a region label into its levels, innermost first, e.g. '(12<5[1 2 0]<3)' into ['12', '5[1 2 0]', '3'].
+
+    Args:
+        label (str): The label, as MCNP prints it (without the leading 'cell' or 'surface')
+
+    Returns:
+        list: The text of each level, with its spaces tidied
+    """
+    label = label.strip()
+    if label.startswith('(') and label.endswith(')'):
+        label = label[1:-1]
+    return [' '.join(level.split()) for level in label.split('<')]
+
+
+def get_lattice_index(level):
+    """Read the lattice element index of a level, e.g. (1, 2, 0) from '5[1 2 0]'.
+    Ranges of elements (e.g. '0:2') are kept as text.
+
+    Args:
+        level (str): The text of the level
+
+    Returns:
+        tuple: The index, or None if the level is not a lattice element
+    """
+    match = PATTERN_lattice_index.search(level)
+    if match is None:
+        return None
+    return tuple(int(word) if word.lstrip('-').isdigit() else word for word in match.group(1).split())
+
+
+def is_balanced(text):
+    """Check whether every bracket opened in a label is closed, i.e. the label does not run on to the next line."""
+    return text.count('(') <= text.count(')') and text.count('[') <= text.count(']')
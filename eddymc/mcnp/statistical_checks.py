@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""
+    This module reads the statistical check tables that MCNP prints for all the tallies at once.
+
+    The status table ('1status of the statistical checks used to form confidence intervals...')
+    gives two lines for each tally, whether it passed the 10 statistical checks (and, if not,
+    the first check it missed) and whether all its bins passed the relative error check:
+
+            6   missed  2 of 10 tfc bin checks: the figure of merit does not appear to be a constant ...
+             passed all bin error check:     2 tally bins all have relative errors less than 0.10 with no zero bins
+
+    The unnormed tally density tables (print table 161) give the probability density function
+    of the history scores in the tally fluctuation chart bin of each tally, which the pdf slope
+    check is fitted to. MCNP prints the numbers without the 'E', e.g. '3.16-07' for 3.16E-07:
+
+     abscissa              ordinate   log plot of tally probability density function ...
+      tally  number num den log den:d------------d-------------d---
+     3.16-07    630 2.81+03   3.449 *************|*************|***
+      total 3447731 1.00+00         d------------d-------------d---
+"""
+
+# Imports from standard library
+import re
+from collections import namedtuple
+# Third party imports
+import numpy as np
+
+# The status of one tally in the status table.
+#   tally_number (str): the number of the tally
+#   passed (bool): True if the tally passed all 10 statistical checks
+#   missed (int): the number of checks missed
+#   first_missed (str): MCNP's description of the first check missed ('' if it passed)
+#   bins_passed (bool): True if every bin of the tally passed the relative error check
+#   bins_message (str): MCNP's description of the bin error check
+CheckStatus = namedtuple('CheckStatus', ['tally_number', 'passed', 'missed', 'first_missed', 'bins_passed',
+                                         'bins_message'])
+
+PATTERN_status = re.compile(r'^\s+(\d+)\s+(passed|missed)\s+(.*?)\s*$')
+PATTERN_missed = re.compile(r'^(\d+|all)\s+of\s+10\s+tfc bin checks:\s*(.*)$')
+PATTERN_bin_check = re.compile(r'^\s+(passed|missed)\s+all bin error check:\s*(.*?)\s*$')
+PATTERN_density_heading = re.compile(r'for tally\s+(\d+).*mean\(m\)\s*=\s*(\S+)\s+nps\s*=\s*(\d+)')
+PATTERN_exponent = re.compile(r'(?<=\d)([+-])(?=\d)')
+
+
+class TallyDensity:
+    """The unnormed tally density of the history scores in the tally fluctuation chart bin of one tally
+    (print table 161), as arrays with one entry per score bin.
+    The density describes the scores of single histories, before any normalisation, so it is not
+    changed by the scaling factor.
+    """
+
+    def __init__(self, tally_number, mean, nps, scores, counts, density):
+        """
+        Args:
+            tally_number (str): The number of the tally
+            mean (float): The nonzero tally mean (m) MCNP prints in the heading
+            nps (int): The number of histories run
+            scores (numpy.ndarray): The history score at each bin (the abscissa)
+            counts (numpy.ndarray): The number of histories scoring in each bin
+            density (numpy.ndarray): The number density of the scores in each bin
+        """
+        self.tally_number = tally_number
+        self.mean = mean
+        self.nps = nps
+        self.scores = scores
+        self.counts = counts
+        self.density = density
+
+    def __repr__(self):
+        return f"Tally density of tally {self.tally_number}, {len(self.scores)} bins"
+
+    def log_log(self):
+        """Get the nonzero densities on log scales, for plotting; the slope of the high-score
+        end of this curve is what the pdf slope check measures.
+
+        Returns:
+            tuple:
+                numpy.ndarray: log10 of the scores
+                numpy.ndarray: log10 of the densities
+        """
+        nonzero = (self.density > 0) & (self.scores > 0)
+        return np.log10(self.scores[nonzero]), np.log10(self.density[nonzero])
+
+
+def read_check_status(data):
+    """Read the status of every tally from the status of the statistical checks page.
+
+    Args:
+        data (list): The lines of the page
+
+    Returns:
+        dict: The CheckStatus of each tally, keyed by tally number
+    """
+    statuses = {}
+    for n, line in enumerate(data):
+        match = PATTERN_status.match(line)
+        if not match:
+            continue
+        tally_number, result, description = match.groups()
+        missed, first_missed = 0, ''
+        if result == 'missed':
+            missed_match = PATTERN_missed.match(description)
+            if missed_match:
+                missed = 10 if missed_match.group(1) == 'all' else int(missed_match.group(1))
+                first_missed = missed_match.group(2)
+            else:
+                first_missed = description
+        bins_passed, bins_message = True, ''
+        bin_match = PATTERN_bin_check.match(data[n + 1]) if n + 1 < len(data) else None
+        if bin_match:
+            bins_passed, bins_message = bin_match.group(1) == 'passed', bin_match.group(2)
+        statuses[tally_number] = CheckStatus(tally_number, result == 'passed', missed, first_missed,
+                                             bins_passed, bins_message)
+    return statuses
+
+
+def read_tally_density(data):
+    """Read an unnormed tally density page (print table 161).
+
+    Args:
+        data (list): The lines of the page, starting with the heading
+
+    Returns:
+        TallyDensity: The tally density
+    """
+    heading = PATTERN_density_heading.search(data[0])
+    if heading is None:
+        raise Exception(f"The tally density heading could not be read: {data[0].strip()}")
+    tally_number, mean, nps = heading.group(1), float(heading.group(2)), int(heading.group(3))
+    start = end = next(n for n, line in enumerate(data) if line.split()[:2] == ['tally', 'number']) + 1
+    while end < len(data) and data[end].split() and data[end].split()[0] != 'total':
+        end += 1
+    # only the first three columns are numbers; the rest of each line is the plot
+    text = ' '.join(' '.join(line.split()[:3]) for line in data[start:end])
+    block = np.array(PATTERN_exponent.sub(r'E\1', text).split(), dtype=float).reshape(end - start, 3)
+    return TallyDensity(tally_number, mean, nps, block[:, 0], block[:, 1].astype(np.int64), block[:, 2])
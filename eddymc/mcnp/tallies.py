@@ -7,10 +7,590 @@
 """
 
 # standard library imports
-import re
+from itertools import islice
+# Third party imports
+import numpy as np
 
 
 # local imports:
+from .repeated_structures import RegionIndex, is_balanced
+
+# The axes of a tally that MCNP prints as a heading line before each bin, in the order MCNP loops over them,
+# and the words that start each heading
+HEADING_WORDS = {
+    'user': ['user', 'bin'],
+    'segment': ['segment:'],
+    'multiplier': ['multiplier', 'bin:'],
+    'cosine': ['angle', 'bin:'],
+}
+HEADING_AXES = tuple(HEADING_WORDS)
+
+
+class TallyBins:
+    """The results of one region of a tally that has bins, held as a labelled N-dimensional array.
+    The axes are in the order MCNP loops over them: user bins (FT or FU cards), segments (FS),
+    multiplier bins (FM), cosine (C), energy (E) and time (T); only the binned axes are kept.
+    The 'total' bins that MCNP prints are not included. The edges of the cosine, energy and time
+    axes are the upper bin edges, as numbers; the other axes are labelled with the text MCNP prints.
+    """
+    AXES = ('user', 'segment', 'multiplier', 'cosine', 'energy', 'time')
+    # the axes along which results can be added up; the multiplier bins are different responses
+    ADDITIVE_AXES = ('user', 'segment', 'cosine', 'energy', 'time')
+
+    def __init__(self, axes, edges, values, errors, total, total_error):
+        """
+        Args:
+            axes (tuple): The names of the binned axes, in the order of the array dimensions
+            edges (dict): The upper bin edges (or labels) for each axis
+            values (numpy.ndarray): The result in each bin
+            errors (numpy.ndarray): The relative error in each bin
+            total (float): The result over all the bins
+            total_error (float): The relative error of the total
+        """
+        self.axes = axes
+        self.edges = edges
+        self.values = values
+        self.errors = errors
+        self.total = total
+        self.total_error = total_error
+
+    def __repr__(self):
+        shape = ' x '.join(f"{len(self.edges[axis])} {axis}" for axis in self.axes)
+        return f"TallyBins of {shape} bins"
+
+    def __eq__(self, other):
+        if not isinstance(other, TallyBins):
+            return NotImplemented
+        return (self.axes == other.axes and self.total == other.total and self.total_error == other.total_error
+                and all(np.array_equal(self.edges[axis], other.edges[axis]) for axis in self.axes)
+                and np.array_equal(self.values, other.values) and np.array_equal(self.errors, other.errors))
+
+    __hash__ = None
+
+    @property
+    def shape(self):
+        """tuple: The number of bins along each axis"""
+        return self.values.shape
+
+    @property
+    def size(self):
+        """int: The number of bins"""
+        return self.values.size
+
+    def scaled(self, scaling_factor):
+        """Get a copy of the bins with the scaling factor applied; the relative errors are unchanged.
+
+        Args:
+            scaling_factor (float): a number by which the results are multiplied
+
+        Returns:
+            TallyBins: The scaled bins
+        """
+        return TallyBins(self.axes, self.edges, self.values * scaling_factor, self.errors,
+                         self.total * scaling_factor, self.total_error)
+
+    def take(self, axis, index):
+        """Slice the bins at one bin of an axis, e.g. take('multiplier', 0) for the first multiplier bin.
+        The total of the region is kept as it is.
+
+        Args:
+            axis (str): The name of the axis
+            index (int): The position of the bin along the axis
+
+        Returns:
+            TallyBins: The bins without that axis
+        """
+        dimension = self.axes.index(axis)
+        axes = tuple(name for name in self.axes if name != axis)
+        return TallyBins(axes, {name: self.edges[name] for name in axes},
+                         np.take(self.values, index, axis=dimension), np.take(self.errors, index, axis=dimension),
+                         self.total, self.total_error)
+
+    def sum(self, axis):
+        """Add up the bins along an axis, treating the bins as independent, so their absolute errors
+        are added in quadrature.
+
+        Args:
+            axis (str): The name of the axis
+
+        Returns:
+            TallyBins: The bins without that axis
+        """
+        dimension = self.axes.index(axis)
+        axes = tuple(name for name in self.axes if name != axis)
+        values = self.values.sum(axis=dimension)
+        variances = ((self.values * self.errors) ** 2).sum(axis=dimension)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            errors = np.where(values != 0, np.sqrt(variances) / np.abs(values), 0.0)
+        return TallyBins(axes, {name: self.edges[name] for name in axes}, values, errors,
+                         self.total, self.total_error)
+
+    def along(self, axis):
+        """Get the results along one axis, added up over every other additive axis. Adding up
+        multiplier bins would mix different responses, so the first multiplier bin is used instead.
+
+        Args:
+            axis (str): The name of the axis
+
+        Returns:
+            TallyBins: The bins with only that axis
+        """
+        bins = self
+        for other in self.axes:
+            if other == axis:
+                continue
+            bins = bins.sum(other) if other in self.ADDITIVE_AXES else bins.take(other, 0)
+        return bins
+
+    def rows(self, max_rows=None):
+        """List the bins as rows of a table, for the html.
+
+        Args:
+            max_rows (int): The largest number of bins to list, from the first (by default, every bin)
+
+        Returns:
+            list: A tuple for each bin of (the upper edge or label on each axis, value, relative error)
+        """
+        rows = []
+        for index in islice(np.ndindex(*self.values.shape), max_rows):
+            labels = tuple(self.edges[axis][i] for axis, i in zip(self.axes, index))
+            rows.append((labels, self.values[index], self.errors[index]))
+        return rows
+
+
+class TallyResults:
+    """The results of a tally, held as parallel columns rather than as a dict per region: the label
+    of each region, its result and relative error, its bins (if the tally has any) and any other
+    columns the tally type needs, such as detector positions or cell masses. A tally over hundreds
+    of thousands of lattice cells takes a few arrays this way, rather than a dict for every cell.
+
+    Iterating over the results gives a TallyRow for each region, which can be read like a dict,
+    e.g. row['result']; a row can also be looked up by its position, or by its key (e.g. the cell
+    number of an F6 tally) if the results have keys. The regions of a repeated-structure tally
+    also have a RegionIndex of their structured labels, for the results by lattice element.
+    """
+    __slots__ = ('label_name', 'labels', 'values', 'errors', 'bins', 'columns', 'keys', 'positions', 'index')
+
+    def __init__(self, label_name, labels, values, errors, bins=None, columns=None, keys=None, index=None):
+        """
+        Args:
+            label_name (str): The name the labels are read by, e.g. 'surface' or 'region' (None if there are no labels)
+            labels (list): The label of each region, e.g. 'Cell 3' (None if there are no labels)
+            values (list): The result of each region
+            errors (list): The relative error of each region
+            bins (list): The TallyBins of each region (None for a region without bins, or for the whole
+                list if no region has bins)
+            columns (dict): Any other columns, e.g. {'mass': [...]}, each with a value for every region
+            keys (list): The key each region can be looked up by, e.g. the cell number (or None)
+            index (RegionIndex): The structured labels of a repeated-structure tally (or None)
+        """
+        self.label_name = label_name
+        self.labels = labels
+        self.values = np.asarray(values, dtype=float)
+        self.errors = np.asarray(errors, dtype=float)
+        self.bins = bins if bins is not None and any(item is not None for item in bins) else None
+        self.columns = {name: np.asarray(column) for name, column in (columns or {}).items()}
+        self.keys = keys
+        self.positions = {key: n for n, key in enumerate(keys)} if keys is not None else None
+        self.index = index
+
+    def __repr__(self):
+        return f"TallyResults of {len(self)} regions"
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return (TallyRow(self, n) for n in range(len(self)))
+
+    def __getitem__(self, item):
+        """Get the row of a region, by its position (an int) or by its key (e.g. a cell number)."""
+        if isinstance(item, (int, np.integer)):
+            if not -len(self) <= item < len(self):
+                raise IndexError(item)
+            return TallyRow(self, item % len(self))
+        if self.positions is None or item not in self.positions:
+            raise KeyError(item)
+        return TallyRow(self, self.positions[item])
+
+    def __eq__(self, other):
+        if not isinstance(other, TallyResults):
+            return NotImplemented
+        return (self.label_name == other.label_name and self.labels == other.labels and self.keys == other.keys
+                and np.array_equal(self.values, other.values) and np.array_equal(self.errors, other.errors)
+                and self.bins == other.bins and self.columns.keys() == other.columns.keys()
+                and all(np.array_equal(self.columns[name], other.columns[name]) for name in self.columns))
+
+    __hash__ = None
+
+    def items(self):
+        """Iterate over the key and row of each region, as for a dict of results.
+
+        Returns:
+            iterator: A (key, TallyRow) tuple for each region
+        """
+        return ((self.keys[n], TallyRow(self, n)) for n in range(len(self)))
+
+    def get(self, name, n):
+        """Get one value of one region.
+
+        Args:
+            name (str): 'result', 'variance', 'bins', the label name, or the name of one of the other columns
+            n (int): The position of the region
+
+        Returns:
+            The value
+        """
+        if name == 'result':
+            return float(self.values[n])
+        if name == 'variance':
+            return float(self.errors[n])
+        if name == 'bins':
+            return self.bins[n] if self.bins is not None else None
+        if name == self.label_name and name is not None:
+            return self.labels[n]
+        if name in self.columns:
+            return self.columns[name][n].item()
+        raise KeyError(name)
+
+    def names(self):
+        """list: The names each row can be read by"""
+        return ([self.label_name] if self.label_name is not None else []) + list(self.columns) + \
+            ['result', 'variance', 'bins']
+
+    def scaled(self, scaling_factor):
+        """Get a copy of the results with the scaling factor applied; the relative errors, labels and
+        other columns are shared with these results, rather than copied.
+
+        Args:
+            scaling_factor (float): a number by which the results are multiplied
+
+        Returns:
+            TallyResults: The scaled results
+        """
+        bins = [scale_bins(item, scaling_factor) for item in self.bins] if self.bins is not None else None
+        return TallyResults(self.label_name, self.labels, self.values * scaling_factor, self.errors,
+                            bins=bins, columns=self.columns, keys=self.keys, index=self.index)
+
+    def table_rows(self, limit):
+        """Get the rows to list in a table of the html. A repeated-structure tally can have tens of
+        thousands of regions, so only the first few are listed; the rest are covered by the results
+        by lattice element. Every row of any other tally is listed.
+
+        Args:
+            limit (int): The largest number of rows of a repeated-structure tally to list
+
+        Returns:
+            iterator: The TallyRow of each region to list
+        """
+        end = min(limit, len(self)) if self.index is not None else len(self)
+        return (TallyRow(self, n) for n in range(end))
+
+    def lattice_elements(self, limit=None):
+        """Combine the results of the regions in each lattice element of a repeated-structure tally.
+
+        Args:
+            limit (int): The largest number of lattice elements to return (by default, all of them)
+
+        Returns:
+            list: A RegionGroup for each lattice element, highest peak first
+        """
+        return self.index.group_by_lattice_element(self.values, self.errors, limit)
+
+    def level_summary(self):
+        """Summarise a repeated-structure tally at each universe level.
+
+        Returns:
+            list: A (level, number of groups, RegionGroup with the highest peak) tuple for each level
+        """
+        return self.index.level_summary(self.values, self.errors)
+
+
+class TallyRow:
+    """The results of one region of a tally: a view of one position in a TallyResults,
+    read like a dict, e.g. row['result'] or row['variance'].
+    """
+    __slots__ = ('results', 'n')
+
+    def __init__(self, results, n):
+        """
+        Args:
+            results (TallyResults): The results of the tally
+            n (int): The position of the region
+        """
+        self.results = results
+        self.n = n
+
+    def __repr__(self):
+        return f"TallyRow({self.as_dict()})"
+
+    def __getitem__(self, name):
+        return self.results.get(name, self.n)
+
+    def __contains__(self, name):
+        return name in self.results.names()
+
+    def __iter__(self):
+        return iter(self.results.names())
+
+    def __eq__(self, other):
+        if isinstance(other, TallyRow):
+            other = other.as_dict()
+        return self.as_dict() == other
+
+    __hash__ = None
+
+    def keys(self):
+        """list: The names the row can be read by"""
+        return self.results.names()
+
+    def as_dict(self):
+        """dict: The row as a dict of its values, keyed by name"""
+        return {name: self[name] for name in self.results.names()}
+
+
+def read_region(data, start):
+    """Read the results printed under a region header (a cell, surface or detector line).
+    An unbinned tally has a single line of value and relative error. A binned tally prints a
+    block of time and energy bins for each combination of its user, segment, multiplier and
+    angle bins, each combination under its own heading lines, e.g.
+
+     multiplier bin:   1.00000E+00      1   -6
+     angle  bin:  -1.         to  0.00000E+00 mu
+          energy
+        1.0000E+00   1.00000E-04 0.0300
+          total      1.00000E-04 0.0300
+
+    Args:
+        data (list): The lines of the tally section
+        start (int): The index of the line after the region header
+
+    Returns:
+        tuple:
+            float: The total result for the region
+            float: The relative error of the total
+            TallyBins: The binned results, or None if the tally has no bins
+    """
+    words = data[start].split()
+    if read_bin_heading(words) is None and not is_time_heading(words) and words != ['energy']:
+        return float(words[0]), float(words[1]), None
+    labels = {axis: {} for axis in HEADING_AXES}
+    blocks = []
+    totals = {}
+    current = {}
+    n = start
+    while True:
+        heading = read_bin_heading(words)
+        if heading is not None:
+            axis, label = heading
+            # a heading replaces the label of its own axis and of the axes inside it
+            current = {name: value for name, value in current.items()
+                       if HEADING_AXES.index(name) < HEADING_AXES.index(axis)}
+            current[axis] = label
+            n, words = next_words(data, n + 1)
+            continue
+        block, n = read_block(data, n)
+        blocks.append((dict(current), block))
+        for axis, label in current.items():
+            if label != 'total':
+                labels[axis].setdefault(label, len(labels[axis]))
+        next_n, words = next_words(data, n)
+        if words[:1] == ['total'] and len(words) == 3:
+            # the total over the angle bins, printed after the last of them
+            totals[tuple(sorted(item for item in current.items() if item[0] != 'cosine'))] = \
+                (float(words[1]), float(words[2]))
+            next_n, words = next_words(data, next_n + 1)
+        if not current or read_bin_heading(words) is None:
+            break
+        n = next_n
+    # the bins labelled 'total' (e.g. 'user bin total') are totals over their axis, not bins
+    totals.update({tuple(sorted(item for item in heading.items() if item[1] != 'total')): (block[4], block[5])
+                   for heading, block in blocks if 'total' in heading.values()})
+    blocks = [(heading, block) for heading, block in blocks if 'total' not in heading.values()]
+    heading_axes = tuple(axis for axis in HEADING_AXES if labels[axis])
+    energies, times = blocks[0][1][0], blocks[0][1][1]
+    edges = {axis: np.array(list(labels[axis])) for axis in heading_axes}
+    if 'cosine' in edges:
+        edges['cosine'] = np.array([get_cosine_edge(label) for label in labels['cosine']])
+    if energies is not None:
+        edges['energy'] = np.array(energies)
+    if times is not None:
+        edges['time'] = np.array(times)
+    axes = heading_axes + tuple(axis for axis in ('energy', 'time') if axis in edges)
+    shape = tuple(len(edges[axis]) for axis in axes)
+    values = np.zeros(shape)
+    errors = np.zeros(shape)
+    for heading, block in blocks:
+        index = tuple(labels[axis][heading[axis]] for axis in heading_axes)
+        values[index] = block[2].reshape(shape[len(heading_axes):])
+        errors[index] = block[3].reshape(shape[len(heading_axes):])
+    total, total_error = get_region_total(blocks, totals, heading_axes, labels)
+    return total, total_error, TallyBins(axes, edges, values, errors, total, total_error)
+
+
+def read_bin_heading(words):
+    """Read the heading of a user, segment, multiplier or angle bin, e.g. 'multiplier bin:   1.00000E+00  1  -6'.
+
+    Args:
+        words (list): The words of a line
+
+    Returns:
+        tuple: The axis and the label of the bin (the rest of the line), or None if the line is not a bin heading
+    """
+    for axis, heading in HEADING_WORDS.items():
+        if words[:len(heading)] == heading:
+            return axis, ' '.join(words[len(heading):])
+    return None
+
+
+def get_cosine_edge(label):
+    """Get the upper edge of an angle bin from its label, e.g. 0.0 from '-1. to 0.00000E+00 mu'."""
+    return float(label.split()[-2])
+
+
+def get_region_total(blocks, totals, heading_axes, labels):
+    """Get the total result of a binned region. MCNP prints the total over all the bins if the region
+    has only angle bins or a 'total' user bin, and the total over the angle bins of each of the outer
+    bins; otherwise the totals of the blocks are added up, treating them as independent. Multiplier
+    bins are different responses, so only the first is used.
+
+    Args:
+        blocks (list): The heading labels and the results of each block, from read_block
+        totals (dict): The totals MCNP printed, keyed by the heading labels of the bins they are a total over
+        heading_axes (tuple): The binned axes that have headings
+        labels (dict): The position of each label along each heading axis
+
+    Returns:
+        tuple:
+            float: The total result
+            float: The relative error of the total
+    """
+    if () in totals:
+        return totals[()]
+    if 'multiplier' in heading_axes:
+        first = next(iter(labels['multiplier']))
+        blocks = [(heading, block) for heading, block in blocks if heading['multiplier'] == first]
+    parts = {}
+    for heading, block in blocks:
+        outer = tuple(sorted(item for item in heading.items() if item[0] != 'cosine'))
+        if outer in totals:
+            parts[outer] = totals[outer]
+        else:
+            parts[tuple(sorted(heading.items()))] = (block[4], block[5])
+    if len(parts) == 1:
+        return next(iter(parts.values()))
+    part_totals = np.array([total for total, error in parts.values()])
+    part_errors = np.array([error for total, error in parts.values()])
+    total = part_totals.sum()
+    if total == 0:
+        return 0.0, 0.0
+    return float(total), float(np.sqrt(np.sum((part_totals * part_errors) ** 2)) / total)
+
+
+def read_block(data, start):
+    """Read the time and energy bins of one block: one combination of user, segment, multiplier and
+    angle bins (or the whole region, if it has none of them).
+    Many time bins are printed a few columns at a time, each block of columns under its own time heading.
+
+    Args:
+        data (list): The lines of the tally section
+        start (int): The index of the time heading, energy heading or the line of results
+
+    Returns:
+        tuple:
+            tuple: The energy bin edges (or None), the time bin edges (or None), the values
+                and relative errors as 2D arrays of (energy, time), the total and its relative error
+            int: The index of the line after the block
+    """
+    energies = None
+    times = []
+    columns = []
+    total_row = []
+    n = start
+    while True:
+        words = data[n].split()
+        if is_time_heading(words):
+            times.extend(float(word) for word in words[1:] if word != 'total')
+            n += 1
+            words = data[n].split()
+        if words == ['energy']:
+            energies, block, totals, n = read_energy_block(data, n + 1)
+        else:
+            block, totals, n = None, np.array(words, dtype=float), n + 1
+        columns.append(block)
+        total_row.append(totals)
+        next_n, words = next_words(data, n)
+        if not times or not is_time_heading(words):
+            break
+        n = next_n
+    totals = np.concatenate(total_row)
+    total, total_error = float(totals[-2]), float(totals[-1])
+    if energies is not None:
+        pairs = np.concatenate(columns, axis=1)
+    else:
+        pairs = totals[np.newaxis, :]
+    # with more than one time bin there is a total column, which is not a bin
+    if len(times) > 1:
+        pairs = pairs[:, :2 * len(times)]
+    values = pairs[:, 0::2]
+    errors = pairs[:, 1::2]
+    return (energies, times or None, values, errors, total, total_error), n
+
+
+def read_energy_block(data, start):
+    """Read the lines of energy bins up to and including the total row. The whole block
+    is converted to numbers at once, rather than a line at a time.
+
+    Args:
+        data (list): The lines of the tally section
+        start (int): The index of the first energy bin line
+
+    Returns:
+        tuple:
+            numpy.ndarray: The upper edge of each energy bin
+            numpy.ndarray: The (value, relative error) pairs for each energy bin, one row per bin
+            numpy.ndarray: The (value, relative error) pairs of the total row
+            int: The index of the line after the total row
+    """
+    end = start
+    while end < len(data) and data[end].split()[:1] != ['total']:
+        end += 1
+    if end == len(data):
+        raise Exception(f"The energy bins starting on line {start} of the tally have no total row")
+    block = np.array(' '.join(data[start:end]).split(), dtype=float).reshape(end - start, -1)
+    totals = np.array(data[end].split()[1:], dtype=float)
+    return block[:, 0], block[:, 1:], totals, end + 1
+
+
+def scale_bins(bins, scaling_factor):
+    """Scale the bins of a region, if it has any.
+
+    Args:
+        bins (TallyBins): The bins of the region, or None
+        scaling_factor (float): a number by which the results are multiplied
+
+    Returns:
+        TallyBins: The scaled bins, or None
+    """
+    return bins.scaled(scaling_factor) if bins is not None else None
+
+
+def is_time_heading(words):
+    """Check whether the words of a line make a time bin heading."""
+    return bool(words) and words[0] in ('time:', 'time')
+
+
+def next_words(data, n):
+    """Find the first line from n onwards that is not blank.
+
+    Returns:
+        tuple:
+            int: The index of the line (len(data) if there is none)
+            list: The words of the line (empty if there is none)
+    """
+    while n < len(data) and not data[n].strip():
+        n += 1
+    return n, (data[n].split() if n < len(data) else [])
 
 
 class Tally:
@@ -19,8 +599,7 @@ class Tally:
     """
 
     def __init__(self, data):
-        # for item in data: print(item)
-        self.data = data  # can be removed once this method is complete
+        self.data = data  # the section of the output is only kept while the tally is read
         self.tally_number = data[0].split()[1]
         self.nps = data[0].split()[4]
         self.f_type = 'F' + data[1].split()[2]
@@ -31,6 +610,10 @@ class Tally:
         self.results = self.get_results()
         self.statistical_checks = self.get_statistical_checks()
         self.passes = self.get_passes()
+        self.fluctuation_chart = None  # set by the EddyMCNPCase, from the tally fluctuation charts page
+        self.check_status = None  # set by the EddyMCNPCase, from the status of the statistical checks page
+        self.density = None  # set by the EddyMCNPCase, from the unnormed tally density page
+        self.data = None  # everything needed has been read, so the lines of the section are released
 
     def get_dose_functions(self):
         """Gets the dose function, if any, that the results of this tally are multiplied by
@@ -55,11 +638,11 @@ class Tally:
         Returns:
             statistical_checks, a dictionary with the results of the statistical checks for this tally.
         """
-        start_PATTERN = re.compile(r"\s+results of 10 statistical checks.+")
         value = None
         pass_fail = None
-        for n, line in enumerate(self.data):
-            if start_PATTERN.match(line):
+        # the checks are printed after the results, so the section is searched from the end
+        for n in range(len(self.data) - 1, -1, -1):
+            if 'results of 10 statistical checks' in self.data[n]:
                 value = self.data[n + 6].split()
                 pass_fail = self.data[n + 7].split()
                 break
@@ -105,10 +688,25 @@ class Tally:
                     passes += 1
         return passes
 
-    def scale_result(self, scaling_factor):
-        """Each subclass of Tally should have its own normalise_data method"""
-        print("This Tally class appears not to have its own 'normalise_data() method.")
-        raise NotImplementedError(f"The {self.__class__} subclass should have its own normalise_data method")
+    def scaled(self, scaling_factor):
+        """Get a view of this tally with its results multiplied by a scaling factor.
+        The tally itself is not changed, so it can be shown at any number of scaling factors.
+
+        Args:
+            scaling_factor (float): a number by which the results are multiplied
+
+        Returns:
+            ScaledTally: The scaled view of this tally
+        """
+        return ScaledTally(self, scaling_factor)
+
+    def get_scaled_results(self, scaling_factor):
+        """Get a copy of the results with the scaling factor applied
+            Args:
+                scaling_factor (float): a number by which the results are multiplied
+            Returns: new TallyResults; self.results is not changed
+        """
+        return self.results.scaled(scaling_factor)
 
     def describe_object(self):
         """ Print a description of the Tally object to the terminal."""
@@ -141,27 +739,18 @@ class F2Tally(Tally):
         """
             Gets the tally results from the mcnp output file
             Args: self: the object, data: the mcnp output tally section
-            Returns: regions: a dictionary holding the results for that tally
+            Returns: TallyResults: the result of each surface, read by 'surface', 'result', 'variance' and 'bins'
         """
         data = self.data
-        results = []
+        surfaces, values, errors, bins = [], [], [], []
         for num, line in enumerate(data):
             if "surface " in line:
-                results.append({
-                    "surface": line.strip().capitalize(),
-                    "result": float(data[num + 1].split()[0]),
-                    "variance": float(data[num + 1].split()[1])
-                })
-        return results
-
-    def scale_result(self, scaling_factor):
-        """Applies scaling factor to results
-            Args:
-                scaling_factor (float): a number by which the region results are multiplied
-            Returns: none, but modifies self.results
-        """
-        for surface in self.results:
-            surface['result'] *= scaling_factor
+                result, variance, region_bins = read_region(data, num + 1)
+                surfaces.append(line.strip().capitalize())
+                values.append(result)
+                errors.append(variance)
+                bins.append(region_bins)
+        return TallyResults('surface', surfaces, values, errors, bins=bins)
 
 
 class F4Tally(Tally):
@@ -172,28 +761,26 @@ class F4Tally(Tally):
         """Get the tally results from the mcnp output file
 
         Returns:
-            list: A list of dictionaries, each corresponding to a cell
-                            in this tally, with entries for region, result and variance.
+            TallyResults: The result of each cell in this tally, read by region, result,
+                            variance and bins (a TallyBins, or None if the tally has no bins).
         """
         data = self.data
-        results = []
+        regions, values, errors, bins = [], [], [], []
         for num, line in enumerate(data):
             if (" cell " in line) or (" surface  " in line):
-                results.append({
-                    "region": line.strip().capitalize(),
-                    "result": float(data[num + 1].split()[0]),
-                    "variance": float(data[num + 1].split()[1])
-                })
-        return results
-
-    def scale_result(self, scaling_factor):
-        """Applies scaling factor to results
-            Args:
-                scaling_factor (float): a number by which the region results are multiplied
-            Returns: none, but modifies self.results
-        """
-        for region in self.results:
-            region['result'] *= scaling_factor
+                label = line.strip()
+                start = num + 1
+                while not is_balanced(label) and start < len(data):
+                    # a long repeated-structure label runs on to the next line
+                    label += ' ' + data[start].strip()
+                    start += 1
+                result, variance, region_bins = read_region(data, start)
+                regions.append(label.capitalize())
+                values.append(result)
+                errors.append(variance)
+                bins.append(region_bins)
+        index = RegionIndex.from_labels([region.split(None, 1)[1] for region in regions])
+        return TallyResults('region', regions, values, errors, bins=bins, index=index)
 
 
 class F5Tally(Tally):
@@ -204,29 +791,19 @@ class F5Tally(Tally):
         """
             Gets the tally results from the mcnp output file
             Args: self: the object, data: the mcnp output tally section
-            Returns: regions: a dictionary holding the results for that tally
+            Returns: TallyResults: the result of each detector, read by 'x', 'y', 'z', 'result', 'variance' and 'bins'
         """
         data = self.data
-        results = []
+        positions, values, errors, bins = [], [], [], []
         for num, line in enumerate(data):
             if "detector located at" in line and "uncollided" not in data[num + 1]:
-                results.append({
-                    "x": float(line[28:40]),
-                    "y": float(line[40:52]),
-                    "z": float(line[52:64]),
-                    "result": float(data[num + 1].split()[0]),
-                    "variance": float(data[num + 1].split()[1]),
-                })
-        return results
-
-    def scale_result(self, scaling_factor):
-        """Applies scaling factor to results
-            Args:
-                scaling_factor (float): a number by which the region results are multiplied
-            Returns: none, but modifies self.results
-        """
-        for detector in self.results:
-            detector['result'] *= scaling_factor
+                result, variance, region_bins = read_region(data, num + 1)
+                positions.append((float(line[28:40]), float(line[40:52]), float(line[52:64])))
+                values.append(result)
+                errors.append(variance)
+                bins.append(region_bins)
+        x, y, z = np.array(positions, dtype=float).reshape(-1, 3).T
+        return TallyResults(None, None, values, errors, bins=bins, columns={'x': x, 'y': y, 'z': z})
 
 
 class F6Tally(Tally):
@@ -236,16 +813,13 @@ class F6Tally(Tally):
             self.particles = "Collision Heating"
 
     def get_results(self):
-        data = self.data
         """Get the tally results from the MCNP output file
-        Args:
-            data (list): the section of the MCNP output file for this tally
+
         Returns:
-            results (dict): A dictionary of dictionaries of dictionaries, each corresponding to a cell
-                            in this tally, with entries for region, mass, result 
-                            and variance.
+            TallyResults: The result of each cell in this tally, in the order of the masses table,
+                            looked up by cell number and read by region, mass, result, variance and bins.
         """
-        results = {}
+        data = self.data
         for num, line in enumerate(data):
             if 'masses' in line:
                 masses_start = num
@@ -255,30 +829,188 @@ class F6Tally(Tally):
                 masses_end = num - 1
                 break
         mass_data = data[masses_start:masses_end]
+        cells = []
+        masses = []
         for num, line in enumerate(mass_data):
             if "cell" in line:
                 for n, mass in enumerate(mass_data[num + 1].split()):
-                    cell_no = mass_data[num].split()[n + 1]
-                    results[cell_no] = {'region': f"Cell {cell_no}", 'mass': float(mass)}
+                    cells.append(mass_data[num].split()[n + 1])
+                    masses.append(float(mass))
+        positions = {cell_no: n for n, cell_no in enumerate(cells)}
+        values = np.full(len(cells), np.nan)
+        errors = np.full(len(cells), np.nan)
+        bins = [None] * len(cells)
 
-        PATTERN_f6_cell = re.compile(r'^\s+cell\s+\d+')
         for num, line in enumerate(data):
             if 'cell ' in line:
-                # if PATTERN_f6_cell.match(line):
                 cell_no = line.split()[1]
-                results[cell_no]["result"] = float(data[num + 1].split()[0])
-                results[cell_no]["variance"] = float(data[num + 1].split()[1])
+                n = positions[cell_no]
+                values[n], errors[n], bins[n] = read_region(data, num + 1)
 
-        return results
+        return TallyResults('region', [f"Cell {cell_no}" for cell_no in cells], values, errors, bins=bins,
+                            columns={'mass': masses}, keys=cells)
 
-    def scale_result(self, scaling_factor):
-        """Applies scaling factor to results
-            Args:
-                scaling_factor (float): a number by which the region results are multiplied
-            Returns: none, but modifies self.results
+
+class ScaledTally:
+    """A view of a Tally with its results multiplied by a scaling factor.
+    Everything except the results is read from the original tally, which is not changed.
+    """
+
+    def __init__(self, tally, scaling_factor):
         """
-        for region in self.results:
-            self.results[region]['result'] *= scaling_factor
+        Args:
+            tally (Tally): The tally to scale
+            scaling_factor (float): a number by which the results are multiplied
+        """
+        self.tally = tally
+        self.scaling_factor = scaling_factor
+        self.results = tally.get_scaled_results(scaling_factor)
+        if tally.fluctuation_chart is not None:
+            self.fluctuation_chart = tally.fluctuation_chart.scaled(scaling_factor)
+        else:
+            self.fluctuation_chart = None
+
+    def __getattr__(self, name):
+        # only called for attributes the view does not set itself
+        if name == 'tally':
+            raise AttributeError(name)
+        return getattr(self.tally, name)
+
+    def __repr__(self):
+        return f"Tally {self.tally.tally_number} scaled by {self.scaling_factor}"
+
+
+class F1Tally(F2Tally):
+    """Surface current tallies are printed in the same layout as F2 tallies, one result per surface."""
+
+    def __init__(self, data):
+        super().__init__(data)
+
+
+class F7Tally(F6Tally):
+    """Fission energy deposition tallies are printed in the same layout as F6 tallies,
+    with the cell masses followed by one result per cell."""
+
+    def __init__(self, data):
+        super().__init__(data)
+
+
+class F8Tally(F4Tally):
+    """Pulse height tallies are printed with one result per cell, usually with many energy bins,
+    which are read into the 'bins' of each result."""
+
+    def __init__(self, data):
+        super().__init__(data)
+
+
+class RawTally:
+    """A tally that Eddy cannot read, either because it is of a type with no registered Tally
+    subclass or because its section could not be read; the section is kept as it is, so that
+    it can be shown in the html, rather than stopping the whole conversion.
+    """
+
+    def __init__(self, data, reason):
+        """
+        Args:
+            data (list): The section of the mcnp output for this tally
+            reason (str): Why the tally could not be read
+        """
+        self.data = data
+        self.tally_number = data[0].split()[1]
+        self.f_type = 'F' + data[1].split()[2]
+        self.tally_type = ' '.join(data[1].split()[3:])
+        self.particles = data[2].split()[1] if 'particle(s):' in data[2] else 'unknown'
+        self.reason = reason
+
+    def __repr__(self):
+        return f"Unread tally {self.tally_number} ({self.f_type}): {self.reason}"
+
+    @property
+    def text(self):
+        """str: The section of the output for this tally, as one string"""
+        return '\n'.join(line.rstrip('\n') for line in self.data)
+
+    def scaled(self, scaling_factor):
+        """The section is shown as it was printed, so it is not scaled.
+
+        Returns:
+            RawTally: This tally
+        """
+        return self
+
+
+# The Tally subclass that reads each type of tally, keyed by the type given in the tally
+# heading (e.g. '4' for 'tally type 4'); see register_tally_type
+TALLY_TYPES = {}
+# The group each type of tally is listed in, keyed by type (e.g. both '6' and '6+' tallies are in 'F6')
+TALLY_GROUPS = {}
+# The particles each group lists, even if it has no tallies for them, keyed by group
+GROUP_PARTICLES = {}
+
+
+def register_tally_type(tally_type, tally_class, group, particles=('neutrons', 'photons', 'electrons')):
+    """Register the Tally subclass that reads one type of tally. To add support for a new type of
+    tally, write a Tally subclass with its own get_results method and register it here.
+
+    Args:
+        tally_type (str): The type given in the tally heading, e.g. '4' or '6+'
+        tally_class (type): The Tally subclass
+        group (str): The group the tallies are listed in, e.g. 'F4', which is kept in the case's tally_groups
+        particles (tuple): The particles the group lists, even if it has no tallies for them
+    """
+    TALLY_TYPES[tally_type] = tally_class
+    TALLY_GROUPS[tally_type] = group
+    GROUP_PARTICLES.setdefault(group, [])
+    GROUP_PARTICLES[group] += [particle for particle in particles if particle not in GROUP_PARTICLES[group]]
+
+
+register_tally_type('1', F1Tally, 'F1')
+register_tally_type('2', F2Tally, 'F2')
+register_tally_type('4', F4Tally, 'F4')
+register_tally_type('5', F5Tally, 'F5')
+register_tally_type('6', F6Tally, 'F6')
+register_tally_type('6+', F6Tally, 'F6', particles=('Collision Heating',))
+register_tally_type('7', F7Tally, 'F7')
+register_tally_type('8', F8Tally, 'F8')
+
+
+def group_tallies(tallies):
+    """Sort tallies into the group registered for their type, and by particle within each group.
+
+    Args:
+        tallies (list): The tallies, in the order they are printed
+
+    Returns:
+        dict: The tallies of each group in lists keyed by particle, keyed by group (e.g. 'F4'). Every
+            registered group is included, even if it has no tallies; unread tallies are left out.
+    """
+    groups = {group: {particle: [] for particle in particles} for group, particles in GROUP_PARTICLES.items()}
+    for tally in tallies:
+        group = TALLY_GROUPS.get(tally.f_type[1:])
+        if group is not None and not isinstance(tally, RawTally):
+            groups[group].setdefault(tally.particles, []).append(tally)
+    return groups
+
+
+def create_tally(data):
+    """Create the Tally object for a tally section, using the Tally subclass registered for its type.
+
+    Args:
+        data (list): The section of the mcnp output for this tally
+
+    Returns:
+        Tally: The new tally, or a RawTally if the tally type is not registered or the section cannot be read
+    """
+    tally_type = data[1].split()[2]
+    tally_class = TALLY_TYPES.get(tally_type)
+    if tally_class is None:
+        return RawTally(data, f"Eddy cannot read type {tally_type} tallies")
+    try:
+        return tally_class(data)
+    except Exception as error:
+        # one tally that cannot be read should not stop the rest of the output being converted
+        return RawTally(data, f"Eddy could not read this tally ({type(error).__name__}: {error})")
+
 
 ############################################################
 #  End of Tally class                                      #
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""This module contains the ParseCache class, which keeps the parsed EddyMCNPCase and
+EddySCALECase objects on disk, so that converting the same output again (e.g. after a
+template change, or with a different scaling factor) can go straight to writing the html.
+
+Each case is stored before its scaling factor is applied, in a file named after a hash of
+the Eddy version, the layout of the cached objects (CACHE_FORMAT) and the contents of the
+output file; a new version of Eddy, a change to a cached class, or a change to the output,
+gives a new name, and the old entry is eventually evicted. When the cache
+grows past its size limit, the entries that were used least recently are deleted.
+
+A case that can summarise itself (with get_cache_summary) also has its summary kept beside
+it as a small JSON file, so that many cached runs can be searched, e.g. for the nuclear data
+libraries they used, without loading the cases themselves. An index of the size, modification
+time and key of each output file looked up with find_keys is kept in the cache too, so that the
+summary of an output that has not changed can be found without reading the output again.
+"""
+
+# Imports from standard library
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+
+# The version of the layout of the cached objects. It is part of every cache key, so it must be
+# increased whenever a change to Eddy changes a class that is pickled into the cache, or what is
+# read into it (e.g. the library of each cross-section table); entries written with the old
+# layout are then never loaded, and are eventually evicted.
+CACHE_FORMAT = 4
+# The number of bytes hashed at a time
+CHUNK_SIZE = 1024 * 1024
+# The default location and size limit of the cache
+DEFAULT_CACHE_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'eddy')
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+
+class ParseCache:
+    """A directory of pickled case objects, keyed by output file contents and Eddy version,
+    with least-recently-used eviction once the directory passes a size limit.
+    """
+    EXTENSION = '.pickle'
+    SUMMARY_EXTENSION = '.summary.json'
+    INDEX_NAME = 'index.json'
+
+    def __init__(self, version, directory=DEFAULT_CACHE_DIRECTORY, max_size=DEFAULT_MAX_SIZE):
+        """
+        Args:
+            version (str): The version of Eddy; cases parsed by other versions are not used
+            directory (str): The directory to keep the cache in (it is created if needed)
+            max_size (int): The maximum total size of the cache, in bytes
+        """
+        self.version = version
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __repr__(self):
+        return f"ParseCache in {self.directory} for Eddy {self.version}"
+
+    def get_key(self, filename):
+        """Hash the contents of an output file, together with the Eddy version.
+
+        Args:
+            filename (str): The file path (including the name) of the output file
+
+        Returns:
+            str: The cache key for this file
+        """
+        content_hash = hashlib.sha256(f"{self.version}/{CACHE_FORMAT}".encode())
+        with open(filename, 'rb') as file:
+            chunk = file.read(CHUNK_SIZE)
+            while chunk:
+                content_hash.update(chunk)
+                chunk = file.read(CHUNK_SIZE)
+        return content_hash.hexdigest()
+
+    def find_keys(self, filenames):
+        """Get the cache keys of some output files, without reading a file if it has the same size
+        and modification time as when its key was last found. Reading every byte of thousands of
+        big outputs is the slow part of looking them up, so the keys are kept in an index.
+
+        Args:
+            filenames (list): The file paths (including the names) of the output files
+
+        Returns:
+            dict: The cache key of each file, keyed by file path as given; a file that does not exist is left out
+        """
+        index = self.load_index()
+        keys = {}
+        changed = False
+        for filename in filenames:
+            path = os.path.abspath(filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue    # the caller reports the files that cannot be read
+            stamp = [stat.st_size, stat.st_mtime_ns, f"{self.version}/{CACHE_FORMAT}"]
+            if index.get(path, [None])[:-1] == stamp:
+                keys[filename] = index[path][-1]
+                continue
+            keys[filename] = self.get_key(filename)
+            index[path] = stamp + [keys[filename]]
+            changed = True
+        if changed:
+            # the files whose cases have been evicted are dropped, so the index does not keep growing
+            found = set(keys.values())
+            index = {path: entry for path, entry in index.items()
+                     if entry[-1] in found or os.path.exists(self.get_path(entry[-1]))}
+            self.write(os.path.join(self.directory, self.INDEX_NAME), json.dumps(index).encode())
+        return keys
+
+    def load_index(self):
+        """Load the index of the output files whose keys have been found with find_keys.
+
+        Returns:
+            dict: The size, modification time (in ns), Eddy version and cache key of each file, keyed by absolute path
+        """
+        try:
+            with open(os.path.join(self.directory, self.INDEX_NAME)) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def get_path(self, key):
+        """Get the path of the cache entry for a key.
+
+        Args:
+            key (str): The cache key, from get_key
+
+        Returns:
+            str: The file path of the cache entry
+        """
+        return os.path.join(self.directory, key + self.EXTENSION)
+
+    def get_summary_path(self, key):
+        """Get the path of the summary of the cache entry for a key.
+
+        Args:
+            key (str): The cache key, from get_key
+
+        Returns:
+            str: The file path of the summary
+        """
+        return os.path.join(self.directory, key + self.SUMMARY_EXTENSION)
+
+    def load(self, key):
+        """Load a case from the cache, and mark it as recently used.
+
+        Args:
+            key (str): The cache key, from get_key
+
+        Returns:
+            EddyMCNPCase or EddySCALECase: The cached case (without its scaling factor applied),
+                or None if the case is not in the cache
+        """
+        path = self.get_path(key)
+        try:
+            with open(path, 'rb') as file:
+                case = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # an entry that cannot be read is no use to anyone, so it is removed
+            self.remove(path)
+            return None
+        try:
+            os.utime(path)  # the modification time records when the entry was last used
+        except FileNotFoundError:
+            pass    # another Eddy run has just evicted it
+        return case
+
+    def store(self, key, case):
+        """Store a case in the cache, then evict old entries if the cache is too big.
+        The lines of the output file are not stored, as they are not needed to write the html.
+
+        Args:
+            key (str): The cache key, from get_key
+            case (EddyMCNPCase or EddySCALECase): The case, before its scaling factor is applied
+        """
+        file = case.file
+        case.file = None
+        try:
+            data = pickle.dumps(case, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            case.file = file
+        self.write(self.get_path(key), data)
+        if hasattr(case, 'get_cache_summary'):
+            self.write(self.get_summary_path(key), json.dumps(case.get_cache_summary()).encode())
+        self.evict()
+
+    def write(self, path, data):
+        """Write a file in the cache.
+
+        Args:
+            path (str): The file path
+            data (bytes): The contents of the file
+        """
+        # write to a temporary file first, so another Eddy run never reads half an entry
+        handle, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as temporary_file:
+            temporary_file.write(data)
+        os.replace(temporary_path, path)
+
+    def load_summary(self, key):
+        """Load the summary of a cached case, without loading the case.
+
+        Args:
+            key (str): The cache key, from get_key
+
+        Returns:
+            dict: The summary, or None if the case is not in the cache or has no summary
+        """
+        try:
+            with open(self.get_summary_path(key)) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def summaries(self):
+        """Load the summaries of every case in the cache.
+
+        Returns:
+            dict: The summary of each case that has one, keyed by cache key
+        """
+        summaries = {}
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUMMARY_EXTENSION):
+                key = entry.name[:-len(self.SUMMARY_EXTENSION)]
+                summary = self.load_summary(key)
+                if summary is not None:
+                    summaries[key] = summary
+        return summaries
+
+    def evict(self):
+        """Delete the least recently used entries until the cache is no bigger than max_size."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.EXTENSION):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue    # another Eddy run has just evicted it
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size = sum(size for last_used, size, path in entries)
+        for last_used, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            self.remove(path)
+            total_size -= size
+
+    def discard(self, key):
+        """Delete the cache entry for a key, e.g. one that this version of Eddy cannot use.
+
+        Args:
+            key (str): The cache key, from get_key
+        """
+        self.remove(self.get_path(key))
+
+    def remove(self, path):
+        """Delete a cache entry and its summary, if another Eddy run has not already done so.
+
+        Args:
+            path (str): The file path of the cache entry
+        """
+        summary_path = path[:-len(self.EXTENSION)] + self.SUMMARY_EXTENSION
+        for file_path in (path, summary_path):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
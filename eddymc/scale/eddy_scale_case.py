@@ -25,7 +25,6 @@ class EddySCALECase:
         # Tallies
         self.tally_data = self.get_tally_data()
         self.tally_list = self.create_tallies()
-        self.scale_tally_results()
 
         # Mixtures
         mixture_data = self.get_mixture_data()
@@ -97,11 +96,19 @@ class EddySCALECase:
                 tally_list.append(Tally(tally_info))
         return tally_list
 
-    def scale_tally_results(self):
-        """Scale the results of each tally by the scaling factor"""
-        if self.scaling_factor != 1:
-            for tally in self.tally_list:
-                tally.scale_results(self.scaling_factor)
+    def scaled(self, scaling_factor=None):
+        """Get a view of this case with the tally results multiplied by a scaling factor.
+        The case is not changed, so one parse can be written out at any number of scaling factors.
+
+        Args:
+            scaling_factor (float): A number to multiply the results by (by default, self.scaling_factor)
+
+        Returns:
+            ScaledSCALECase: The scaled view of this case
+        """
+        if scaling_factor is None:
+            scaling_factor = self.scaling_factor
+        return ScaledSCALECase(self, scaling_factor)
 
     def get_mixture_data(self):
         """Get the part of the SCALE output concerning mixtures
@@ -136,3 +143,42 @@ class EddySCALECase:
                         mixture_list.append(Mixture(mix))
                         break
         return mixture_list
+
+
+class ScaledSCALECase:
+    """A view of an EddySCALECase with its tally results multiplied by a scaling factor.
+    Everything except the scaling factor and the tallies is read from the original case.
+    """
+    def __init__(self, case, scaling_factor):
+        self.case = case
+        self.scaling_factor = scaling_factor
+        self.scaled_tallies = None
+
+    def __getattr__(self, name):
+        # only called for attributes the view does not set itself
+        if name == 'case':
+            raise AttributeError(name)
+        return getattr(self.case, name)
+
+    def __repr__(self):
+        return f"{self.case.name} scaled by {self.scaling_factor}"
+
+    @property
+    def tally_list(self):
+        # the scaled tallies are only created when they are first needed
+        if self.scaled_tallies is None:
+            self.scaled_tallies = [tally.scaled(self.scaling_factor) for tally in self.case.tally_list]
+        return self.scaled_tallies
+
+    def scaled(self, scaling_factor=None):
+        """Get a view of the original case with a different scaling factor.
+
+        Args:
+            scaling_factor (float): A number to multiply the results by (by default, this view's)
+
+        Returns:
+            ScaledSCALECase: The scaled view
+        """
+        if scaling_factor is None or scaling_factor == self.scaling_factor:
+            return self
+        return self.case.scaled(scaling_factor)
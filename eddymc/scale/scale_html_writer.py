@@ -12,6 +12,7 @@ except ImportError:
     import importlib_resources as pkg_resources
 # Third party imports
 from jinja2 import Template
+from markupsafe import Markup
 # local imports
 try:
     from .. import static
@@ -38,15 +39,18 @@ def get_html(case):
     Returns:
         html (str): the html output as a single string
     """
+    # the results are shown at the case's scaling factor (a scaled view is shown as it is)
+    case = case.scaled()
     inline_css = get_css()
     html_template = pkg_resources.read_text(static, 'SCALE_template.html')
-    template = Template(html_template)
+    # autoescape replaces any html control characters in the output data as it is rendered
+    template = Template(html_template, autoescape=True)
     # render template as a unicode string
     html = template.render(
         filename=case.filepath,
         case_name=case.name,
         # logo=f"{os.getcwd()}/static/logo.png",
-        inline_css=inline_css,
+        inline_css=Markup(inline_css),  # the css is trusted, so is not escaped
         rundate=case.rundate,
         runtime=case.runtime,
         date=datetime.datetime.now().strftime("%Y/%m/%d"),
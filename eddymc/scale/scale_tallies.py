@@ -30,18 +30,37 @@ class Tally:
             self.checks[check] = ('Pass' if result == 'X' else 'Fail')
 
 
-    def scale_results(self, scaling_factor):
-        """Scale the results of each tally by the project-level scaling factor
+    def scaled(self, scaling_factor):
+        """Get a view of this tally with its response multiplied by the project-level scaling factor.
+        The tally itself is not changed.
 
         Args:
             scaling_factor (float): A number to multiply results by
+
+        Returns:
+            ScaledTally: The scaled view of this tally
             """
-        self.response *= scaling_factor
+        return ScaledTally(self, scaling_factor)
 
 
 # END OF TALLY CLASS
 
 
+class ScaledTally:
+    """A view of a SCALE Tally with its response multiplied by a scaling factor.
+    Everything except the response is read from the original tally."""
+    def __init__(self, tally, scaling_factor):
+        self.tally = tally
+        self.scaling_factor = scaling_factor
+        self.response = tally.response * scaling_factor
+
+    def __getattr__(self, name):
+        # only called for attributes the view does not set itself
+        if name == 'tally':
+            raise AttributeError(name)
+        return getattr(self.tally, name)
+
+
 def get_tally_data(output_data):
     """Find the parts of the SCALE output with the tally data
 
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# Peter Evans
+# Cerberus Nuclear Ltd
+
+"""
+    This module draws simple line charts and heat maps as inline SVG, so that they can be written straight
+    into the html output without any javascript or image files.
+"""
+
+# Imports from standard library
+import html
+import zlib
+import base64
+import struct
+# Third party imports
+import numpy as np
+from markupsafe import Markup
+
+# The colours of the heat map scale, from the lowest to the highest value
+HEAT_MAP_COLOURS = np.array([
+    [48, 18, 59], [50, 101, 230], [27, 207, 212], [97, 252, 108], [210, 233, 53], [254, 155, 45], [122, 4, 3],
+], dtype=float)
+# The colour of voxels with no result
+EMPTY_COLOUR = (230, 230, 230)
+# The size of a chart, and the space around the plot for the axis labels, in pixels
+WIDTH = 300
+HEIGHT = 180
+MARGIN_LEFT = 60
+MARGIN_RIGHT = 10
+MARGIN_TOP = 25
+MARGIN_BOTTOM = 30
+
+
+def line_chart(x, y, title, limit=None, x_label='nps', x_from_zero=True):
+    """Draw a line chart of y against x.
+
+    Args:
+        x (numpy.ndarray): The values along the horizontal axis
+        y (numpy.ndarray): The values along the vertical axis
+        title (str): The title shown above the chart
+        limit (float): The value of an optional dashed horizontal line, e.g. a pass/fail threshold
+        x_label (str): The name of the horizontal axis
+        x_from_zero (bool): True to start the horizontal axis at zero, False to fit it to the values of x
+
+    Returns:
+        Markup: The svg element (it is built from numbers and an escaped title, so is safe to insert as it is)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # points that are not known (nan) are left out
+    known = np.isfinite(y)
+    x, y = x[known], y[known]
+    plot_width = WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+    plot_height = HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+    if x_from_zero:
+        x_low, x_high = 0.0, float(np.max(x, initial=0.0)) or 1.0
+    else:
+        x_low, x_high = get_range(x)
+    y_values = y if limit is None else np.append(y, limit)
+    y_low, y_high = get_range(y_values)
+
+    def to_x(value):
+        return MARGIN_LEFT + (value - x_low) / (x_high - x_low) * plot_width
+
+    def to_y(value):
+        return MARGIN_TOP + (y_high - value) / (y_high - y_low) * plot_height
+
+    points = ' '.join(f"{to_x(a):.1f},{to_y(b):.1f}" for a, b in zip(x, y))
+    parts = [
+        f'<svg class="chart" width="{WIDTH}" height="{HEIGHT}" viewBox="0 0 {WIDTH} {HEIGHT}" '
+        f'xmlns="http://www.w3.org/2000/svg">',
+        f'<text x="{WIDTH / 2:.0f}" y="15" text-anchor="middle" font-size="13">{html.escape(title)}</text>',
+        f'<rect x="{MARGIN_LEFT}" y="{MARGIN_TOP}" width="{plot_width}" height="{plot_height}" '
+        f'fill="none" stroke="#999"/>',
+        f'<text x="{MARGIN_LEFT - 4}" y="{MARGIN_TOP + 4}" text-anchor="end" font-size="10">{y_high:.4g}</text>',
+        f'<text x="{MARGIN_LEFT - 4}" y="{MARGIN_TOP + plot_height}" text-anchor="end" font-size="10">{y_low:.4g}</text>',
+        f'<text x="{MARGIN_LEFT}" y="{HEIGHT - MARGIN_BOTTOM + 12}" text-anchor="middle" font-size="10">{x_low:.4g}</text>',
+        f'<text x="{WIDTH - MARGIN_RIGHT}" y="{HEIGHT - MARGIN_BOTTOM + 12}" text-anchor="end" font-size="10">{x_high:.4g}</text>',
+        f'<text x="{MARGIN_LEFT + plot_width / 2:.0f}" y="{HEIGHT - 4}" text-anchor="middle" font-size="10">'
+        f'{html.escape(x_label)}</text>',
+    ]
+    if limit is not None:
+        parts.append(f'<line x1="{MARGIN_LEFT}" y1="{to_y(limit):.1f}" x2="{WIDTH - MARGIN_RIGHT}" '
+                     f'y2="{to_y(limit):.1f}" stroke="tomato" stroke-dasharray="4 3"/>')
+    if len(y):
+        parts.append(f'<polyline points="{points}" fill="none" stroke="#1f5fa8" stroke-width="1.5"/>')
+    parts.extend(f'<circle cx="{to_x(a):.1f}" cy="{to_y(b):.1f}" r="2" fill="#1f5fa8"/>' for a, b in zip(x, y))
+    parts.append('</svg>')
+    return Markup(''.join(parts))
+
+
+def get_range(values):
+    """Get the range of an axis, padded a little so that the line does not run along the edge of the plot.
+
+    Args:
+        values (numpy.ndarray): The values to be shown on the axis (if there are none, the range is 0 to 1)
+
+    Returns:
+        tuple: The lowest and highest values on the axis
+    """
+    if not len(values):
+        return 0.0, 1.0
+    low, high = float(np.min(values)), float(np.max(values))
+    if high == low:
+        padding = abs(high) * 0.1 or 1.0
+    else:
+        padding = (high - low) * 0.05
+    return low - padding, high + padding
+
+
+def heat_map(values, title, x_label, y_label, x_range, y_range):
+    """Draw a 2D array of results as a heat map, coloured on a log scale.
+    The pixels are drawn as a PNG image inside the svg, which is much smaller than a rectangle per pixel.
+
+    Args:
+        values (numpy.ndarray): The results, indexed (x, y)
+        title (str): The title shown above the heat map
+        x_label (str): The name of the horizontal axis
+        y_label (str): The name of the vertical axis
+        x_range (tuple): The lowest and highest positions along the horizontal axis
+        y_range (tuple): The lowest and highest positions along the vertical axis
+
+    Returns:
+        Markup: The svg element (it is built from numbers and escaped text, so is safe to insert as it is)
+    """
+    values = np.asarray(values, dtype=float)
+    plot_width = WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+    plot_height = HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+    positive = values[values > 0]
+    low, high = (float(positive.min()), float(positive.max())) if len(positive) else (1.0, 1.0)
+    # the image rows run from the top down, so the y axis is flipped to increase upwards
+    image = encode_png(colour_pixels(values.T[::-1], low, high))
+    parts = [
+        f'<svg class="chart" width="{WIDTH}" height="{HEIGHT}" viewBox="0 0 {WIDTH} {HEIGHT}" '
+        f'xmlns="http://www.w3.org/2000/svg">',
+        f'<text x="{WIDTH / 2:.0f}" y="15" text-anchor="middle" font-size="13">{html.escape(title)}</text>',
+        f'<image x="{MARGIN_LEFT}" y="{MARGIN_TOP}" width="{plot_width}" height="{plot_height}" '
+        f'preserveAspectRatio="none" style="image-rendering: pixelated" '
+        f'href="data:image/png;base64,{base64.b64encode(image).decode()}"/>',
+        f'<rect x="{MARGIN_LEFT}" y="{MARGIN_TOP}" width="{plot_width}" height="{plot_height}" '
+        f'fill="none" stroke="#999"/>',
+        f'<text x="{MARGIN_LEFT - 4}" y="{MARGIN_TOP + 4}" text-anchor="end" font-size="10">{y_range[1]:.4g}</text>',
+        f'<text x="{MARGIN_LEFT - 4}" y="{MARGIN_TOP + plot_height}" text-anchor="end" font-size="10">{y_range[0]:.4g}</text>',
+        f'<text x="{MARGIN_LEFT - 4}" y="{MARGIN_TOP + plot_height / 2:.0f}" text-anchor="end" font-size="10">'
+        f'{html.escape(y_label)}</text>',
+        f'<text x="{MARGIN_LEFT}" y="{HEIGHT - MARGIN_BOTTOM + 12}" text-anchor="middle" font-size="10">{x_range[0]:.4g}</text>',
+        f'<text x="{WIDTH - MARGIN_RIGHT}" y="{HEIGHT - MARGIN_BOTTOM + 12}" text-anchor="end" font-size="10">{x_range[1]:.4g}</text>',
+        f'<text x="{MARGIN_LEFT + plot_width / 2:.0f}" y="{HEIGHT - 4}" text-anchor="middle" font-size="10">'
+        f'{html.escape(x_label)} (colour scale {low:.3g} to {high:.3g})</text>',
+        '</svg>',
+    ]
+    return Markup(''.join(parts))
+
+
+def colour_pixels(values, low, high):
+    """Colour each value on a log scale between low and high; values that are not positive are grey.
+
+    Args:
+        values (numpy.ndarray): A 2D array of values
+        low (float): The value given the first colour of the scale
+        high (float): The value given the last colour of the scale
+
+    Returns:
+        numpy.ndarray: The (rows, columns, 3) array of 8-bit RGB colours
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logs = np.log10(np.where(values > 0, values, np.nan))
+    span = np.log10(high) - np.log10(low)
+    fraction = (logs - np.log10(low)) / span if span else np.zeros_like(logs)
+    position = np.nan_to_num(fraction, nan=0.0).clip(0, 1) * (len(HEAT_MAP_COLOURS) - 1)
+    lower = np.minimum(position.astype(int), len(HEAT_MAP_COLOURS) - 2)
+    weight = (position - lower)[..., np.newaxis]
+    pixels = HEAT_MAP_COLOURS[lower] * (1 - weight) + HEAT_MAP_COLOURS[lower + 1] * weight
+    pixels[np.isnan(logs)] = EMPTY_COLOUR
+    return pixels.round().astype(np.uint8)
+
+
+def encode_png(pixels):
+    """Encode an array of RGB pixels as a PNG image.
+
+    Args:
+        pixels (numpy.ndarray): The (rows, columns, 3) array of 8-bit RGB colours
+
+    Returns:
+        bytes: The PNG file
+    """
+    rows, columns = pixels.shape[:2]
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    # each row of the image starts with a filter type byte, 0 for no filter
+    raw = np.hstack([np.zeros((rows, 1), dtype=np.uint8), pixels.reshape(rows, columns * 3)]).tobytes()
+    header = struct.pack('>IIBBBBB', columns, rows, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
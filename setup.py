@@ -1,11 +1,15 @@
+import re
 import setuptools
 
 with open("README.md", "r") as readme:
     long_description = readme.read()
 
+with open("eddymc/__init__.py", "r") as init:
+    version = re.search(r"__version__ = '(.+)'", init.read()).group(1)
+
 setuptools.setup(
     name="eddy_mc", 
-    version="0.3.6",
+    version=version,
     author="Cerberus Nuclear",
     author_email="nuclear@cerberusnuclear.com",
     description="Eddy, the MCNP and SCALE HTML output converter",
@@ -14,7 +18,7 @@ setuptools.setup(
     url="https://github.com/Cerberus-Nuclear/Eddy-Source",
     packages=['eddymc', 'eddymc//mcnp', 'eddymc//scale', 'eddymc//static'],
     package_data={'eddymc//static': ['*']},
-    install_requires=['Jinja2', 'importlib-resources'],
+    install_requires=['Jinja2', 'importlib-resources', 'numpy'],
     classifiers=[
         "Programming Language :: Python :: 3",
         'License :: OSI Approved :: GNU General Public License v3 or later (GPLv3+)',
@@ -4,6 +4,7 @@ or add a configuration in pycharm
 """
 
 import pytest
+import numpy as np
 from eddymc.mcnp import cells
 from tests import mcnp_examples
 try:
@@ -34,3 +35,154 @@ def f2_cell_section(tmpdir):
             " total                                               5.57528E+03 3.94276E+01",
             ]
 
+
+
+@pytest.fixture
+def neutron_populations():
+    return ["1neutron  activity in each cell                                                                         print table 126",
+            "",
+            "                       tracks     population   collisions   collisions     number        flux        average      average",
+            "              cell    entering                               * weight     weighted     weighted   track weight   track mfp",
+            "                                                          (per history)    energy       energy     (relative)      (cm)",
+            "",
+            "        1        1     5294408      5294323      1231377    2.3240E-01   1.3045E+00   2.0052E+00   9.9922E-01   3.8168E+00",
+            "        2        2     5294662      5294322         5358    1.0111E-03   1.3238E+00   2.0183E+00   9.9911E-01   1.0275E+04",
+            "1neutron  activity in each cell                                                                         print table 126",
+            "",
+            "                       tracks     population   collisions   collisions     number        flux        average      average",
+            "              cell    entering                               * weight     weighted     weighted   track weight   track mfp",
+            "                                                          (per history)    energy       energy     (relative)      (cm)",
+            "",
+            "        3        3     5294655      5294322           52    9.8199E-06   1.3237E+00   2.0181E+00   9.9909E-01   1.0275E+04",
+            "",
+            "           total      21178203     21177289      1237345    2.3353E-01",
+            ]
+
+
+def test_read_cell_table(neutron_populations):
+    # act
+    table = cells.read_cell_table(neutron_populations)
+    # assert
+    assert table.names == ['tracks entering', 'population', 'collisions', 'collisions * weight (per history)',
+                           'number weighted energy', 'flux weighted energy', 'average track weight (relative)',
+                           'average track mfp (cm)']
+    assert list(table.cell_numbers) == [1, 2, 3]
+    assert list(table.values[2]) == [5294655, 5294322, 52, 9.8199E-06, 1.3237, 2.0181, 0.99909, 1.0275E+04]
+
+
+def test_read_cell_table_without_table():
+    # act, assert
+    assert cells.read_cell_table(None) is None
+
+
+@pytest.fixture
+def neutron_weight_balance():
+    return ["1neutron  weight balance in each cell                                                                   print table 130",
+            "",
+            "                              external events                     variance reduction events",
+            "              cell    entering      source     exiting      weight window   cell importance",
+            "",
+            "        1        1    1.0000E+00   1.0000E+00  -2.0000E+00    0.0000E+00     0.0000E+00",
+            "        2        2    2.0000E+00   0.0000E+00  -1.5000E+00   -5.0000E-01     0.0000E+00",
+            "",
+            "           total      3.0000E+00   1.0000E+00  -3.5000E+00   -5.0000E-01     0.0000E+00",
+            "",
+            "                              physical events",
+            "              cell     capture    fission",
+            "",
+            "        1        1   -1.0000E-02   0.0000E+00",
+            "        2        2   -2.0000E-02   0.0000E+00",
+            "",
+            "           total     -3.0000E-02   0.0000E+00",
+            ]
+
+
+def test_read_cell_table_with_blocks(neutron_weight_balance):
+    # act
+    table = cells.read_cell_table(neutron_weight_balance)
+    # assert
+    # a heading over several columns is given to the column under its centre
+    assert table.names == ['entering', 'external events source', 'exiting', 'weight window',
+                           'variance reduction events cell importance', 'capture', 'physical events fission']
+    assert list(table.cell_numbers) == [1, 2]
+    assert list(table.values[1]) == [2.0, 0.0, -1.5, -0.5, 0.0, -0.02, 0.0]
+
+
+@pytest.fixture
+def cell_table(f2_cell_section):
+    rows = [line.split() for line in f2_cell_section[5:10]]
+    return cells.CellTable.from_rows(rows, {'neutron': 8, 'photon': 9, 'electron': None})
+
+
+def test_cell_table_from_rows(cell_table):
+    # assert
+    assert len(cell_table) == 5
+    assert list(cell_table.cell_numbers) == [1, 2, 3, 4, 5]
+    assert cell_table.columns['material_number'].dtype == np.int32
+    assert list(cell_table.columns['mass']) == [3.27145E+01, 4.89253E+00, 1.49916E-01, 1.67072E+00, 0.0]
+    assert list(cell_table.importances['photon']) == [1.0, 1.0, 1.0, 1.0, 0.0]
+    assert list(cell_table.importances['electron']) == [0.0] * 5
+
+
+def test_cell_row(cell_table):
+    # act
+    cell = cell_table[1]
+    # assert
+    assert cell.cell_number == '2'
+    assert cell.material_number == 2
+    assert cell.gram_density == 1.205E-03
+    assert cell.volume == 4.06019E+03
+    assert cell.neutron_importance == 1.0
+    assert cell['mass'] == 4.89253E+00
+    with pytest.raises(AttributeError):
+        cell.neutron_population
+
+
+def test_cell_table_sorted_by(cell_table):
+    # act
+    heaviest = cell_table.sorted_by('mass', descending=True)
+    # assert
+    assert list(heaviest.cell_numbers) == [1, 2, 4, 3, 5]
+    assert heaviest[0].mass == 3.27145E+01
+
+
+def test_assign_populations(cell_table, neutron_populations):
+    # act
+    cell_table.assign_populations('neutron', cells.read_cell_table(neutron_populations))
+    cell_table.assign_populations('photon', None)
+    # assert
+    cell = cell_table.find('2')
+    assert cell.neutron_tracks_entering == 5294662
+    assert cell.neutron_population == 5294322
+    assert cell.neutron_collisions == 5358
+    assert cell.neutron_flux_weighted_energy == 2.0183
+    assert cell.neutron_average_track_mfp == 1.0275E+04
+    assert cell.has_population('neutron')
+    assert not cell.has_population('photon')
+    assert not cell_table.find(4).has_population('neutron')
+    assert list(cell_table.with_population('neutron').cell_numbers) == [1, 2, 3]
+    assert len(cell_table.with_population('photon')) == 0
+
+
+def test_hot_cells(cell_table, neutron_populations):
+    # arrange
+    cell_table.assign_populations('neutron', cells.read_cell_table(neutron_populations))
+    # act
+    busiest = cell_table.hot_cells('neutron', limit=2)
+    most_collisions = cell_table.hot_cells('neutron', column='collisions')
+    # assert
+    assert list(busiest.cell_numbers) == [1, 2]
+    assert list(most_collisions.cell_numbers) == [1, 2, 3]
+    assert len(cell_table.hot_cells('photon')) == 0
+    assert cell_table.population_total('neutron') == 5294323 + 5294322 + 5294322
+
+
+def test_assign_weight_balance(cell_table, neutron_weight_balance):
+    # act
+    cell_table.assign_weight_balance('neutron', cells.read_cell_table(neutron_weight_balance))
+    # assert
+    assert cell_table.find(2).weight_balance('neutron')['exiting'] == -1.5
+    assert cell_table.find(2).weight_balance('neutron')['capture'] == -0.02
+    assert cell_table.find(3).weight_balance('neutron') == {}
+    assert cell_table.find(1).weight_balance('photon') == {}
+    assert list(cell_table.sorted_by('mass').weight_balances['neutron'].cell_numbers) == [5, 3, 4, 2, 1]
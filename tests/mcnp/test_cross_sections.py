@@ -0,0 +1,76 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import pytest
+from eddymc.mcnp import cross_sections
+
+
+@pytest.fixture
+def cross_section_page():
+    return ["1cross-section tables                                                                                   print table 100",
+            "     XSDIR used: C:\\MY_MCNP\\MCNP_DATA/xsdir_mcnp6.2",
+            "",
+            "     table    length",
+            "",
+            "                        tables from file xdata/endf71x/N/7014.710nc                                      ",
+            "",
+            "   7014.80c  102640  N14 ENDF71x (jlconlin)  Ref. see jlconlin (ref 09/10/2012  10:00:53)         mat 725      12/16/12",
+            "                     Energy range:   1.00000E-11  to  1.50000E+02 MeV.",
+            "                     particle-production data for protons   being expunged from   7014.80c          ",
+            "",
+            "                        tables from file xdata/endf80/O/8016.800nc                                      ",
+            "",
+            "   8016.00c  264508  O16 ENDF/B-VIII.0",
+            "                     Energy range:   1.00000E-11  to  1.50000E+02 MeV.",
+            "",
+            "                        tables from file xdata/mcplib84                                                  ",
+            "",
+            "   7000.84p    3270  Update of MCPLIB04 Photon Compton Broadening Data For MCNP5 see LA-UR-    12-00018        01/03/12",
+            "   8000.84p    3348  Update of MCPLIB04 Photon Compton Broadening Data For MCNP5 see LA-UR-    12-00018        01/03/12",
+            "",
+            "  total      373766",
+            ]
+
+
+def test_read_cross_sections(cross_section_page):
+    # act
+    tables = cross_sections.read_cross_sections(cross_section_page)
+    # assert
+    assert len(tables) == 4
+    assert [table.zaid for table in tables] == ['7014.80c', '8016.00c', '7000.84p', '8000.84p']
+    assert tables.find('8016.00c') == cross_sections.CrossSectionTable(
+        '8016.00c', '8016', '00c', 264508, 'xdata/endf80/O/8016.800nc', 'endf80', 'O16 ENDF/B-VIII.0')
+    assert tables.find('1001.80c') is None
+
+
+def test_read_cross_sections_without_page():
+    # act, assert
+    assert len(cross_sections.read_cross_sections(None)) == 0
+
+
+def test_libraries(cross_section_page):
+    # arrange
+    tables = cross_sections.read_cross_sections(cross_section_page + cross_section_page)
+    # act
+    libraries = tables.libraries()
+    # assert
+    assert libraries == [
+        cross_sections.LibrarySummary('endf71x', ['80c'], 1, 102640),
+        cross_sections.LibrarySummary('endf80', ['00c'], 1, 264508),
+        cross_sections.LibrarySummary('mcplib84', ['84p'], 2, 6618),
+    ]
+
+
+@pytest.mark.parametrize("file, library", [
+    ('xdata/endf71x/N/7014.710nc', 'endf71x'),
+    ('C:\\MCNP_DATA\\Lib80x\\H\\1001.800nc', 'Lib80x'),
+    ('xdata/mcplib84', 'mcplib84'),
+    ('/opt/MCNP_DATA/endf70a', 'endf70a'),
+    ('/opt/MCNP_DATA/xdata/mcplib84', 'mcplib84'),
+    ('/opt/MCNP_DATA/xdata/endf80/Fe/26056.800nc', 'endf80'),
+    ('el03', 'el03'),
+])
+def test_get_library_name(file, library):
+    # act, assert
+    assert cross_sections.get_library_name(file) == library
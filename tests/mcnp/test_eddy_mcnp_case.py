@@ -4,6 +4,8 @@ or add a configuration in pycharm
 
 import pytest
 from eddymc.mcnp.eddy_mcnp_case import EddyMCNPCase
+from eddymc.mcnp import tallies
+from eddymc.mcnp.tallies import RawTally, group_tallies
 from tests import mcnp_examples
 
 try:
@@ -116,6 +118,23 @@ def test_get_date_time(simple_case):
     assert type(runtime) == str
 
 
+def test_get_date_time_value(simple_case):
+    # act, assert
+    assert simple_case.get_date_time() == ('2020/05/06', '14:56:46')
+
+
+def test_get_date_time_mcnpx(f2_file):
+    # arrange
+    file = list(f2_file)
+    header = next(n for n, line in enumerate(file) if line.startswith('1mcnp'))
+    file[header] = "1mcnpx    version 2.7.0  ld=Mon Apr 04 08:00:00 MST 2011                   03/10/21 10:00:00 "
+    c = MockEddyMCNPCase(filepath="mcnp_examples/F2.out", scaling_factor=1, file=file)
+    # act
+    rundate, runtime = c.get_date_time()
+    # assert
+    assert (rundate, runtime) == ('2021/03/10', '10:00:00')
+
+
 def test_get_runtime(simple_case):
     # arrange
     # act
@@ -342,7 +361,7 @@ def test_get_cell_data(simple_case):
     assert len(cell_section) == 12
 
 
-def test_create_cells_calls_cell_init(simple_case, mocker):
+def test_create_cells(simple_case):
     # arrange
     c = simple_case
     c.cell_data = [
@@ -359,25 +378,28 @@ def test_create_cells_calls_cell_init(simple_case, mocker):
         "",
         " total                                               5.57528E+03 3.94276E+01",
         ]
-    mocker.patch('eddymc.mcnp.eddy_mcnp_case.EddyMCNPCase.get_particle_importance', return_value=1)
-    mock_cell_init = mocker.patch('eddymc.mcnp.cells.Cell.__init__', return_value=None)
     # act
-    c.create_cells()
+    cell_list = c.create_cells()
     # assert
-    assert mock_cell_init.call_count == 5
+    assert len(cell_list) == 5
+    assert list(cell_list.cell_numbers) == [1, 2, 3, 4, 5]
+    assert cell_list[2].volume == 1.24411E+02
+    assert list(cell_list.importances['neutron']) == [1.0, 1.0, 1.0, 1.0, 0.0]
+    assert list(cell_list.importances['electron']) == [0.0] * 5
 
 
 def test_get_tallies_f2(simple_case):
     # arrange
     c = simple_case
     # act
-    c.tally_list, c.f_types, c.F2_tallies, c.F4_tallies, c.F5_tallies, c.F6_tallies = c.get_tallies()
+    c.tally_list, c.f_types = c.get_tallies()
+    groups = group_tallies(c.tally_list)
     # assert
     assert len(c.tally_list) == 3
     assert c.f_types == ['F2']
-    assert len(c.F2_tallies['neutrons']) == 2
-    assert len(c.F2_tallies['photons']) == 1
-    assert len(c.F2_tallies['electrons']) == 0
+    assert len(groups['F2']['neutrons']) == 2
+    assert len(groups['F2']['photons']) == 1
+    assert len(groups['F2']['electrons']) == 0
 
 
 def test_get_tallies_f4(f4_file):
@@ -388,13 +410,14 @@ def test_get_tallies_f4(f4_file):
         file=f4_file,
         crit_case=False)
     # act
-    c.tally_list, c.f_types, c.F2_tallies, c.F4_tallies, c.F5_tallies, c.F6_tallies = c.get_tallies()
+    c.tally_list, c.f_types = c.get_tallies()
+    groups = group_tallies(c.tally_list)
     # assert
     assert len(c.tally_list) == 3
     assert c.f_types == ['F4']
-    assert len(c.F4_tallies['neutrons']) == 1
-    assert len(c.F4_tallies['photons']) == 2
-    assert len(c.F4_tallies['electrons']) == 0
+    assert len(groups['F4']['neutrons']) == 1
+    assert len(groups['F4']['photons']) == 2
+    assert len(groups['F4']['electrons']) == 0
 
 
 def test_get_tallies_f5(f5_file):
@@ -405,13 +428,14 @@ def test_get_tallies_f5(f5_file):
         file=f5_file,
         crit_case=False)
     # act
-    c.tally_list, c.f_types, c.F2_tallies, c.F4_tallies, c.F5_tallies, c.F6_tallies = c.get_tallies()
+    c.tally_list, c.f_types = c.get_tallies()
+    groups = group_tallies(c.tally_list)
     # assert
     assert len(c.tally_list) == 3
     assert c.f_types == ['F5']
-    assert len(c.F5_tallies['neutrons']) == 1
-    assert len(c.F5_tallies['photons']) == 2
-    assert len(c.F5_tallies['electrons']) == 0
+    assert len(groups['F5']['neutrons']) == 1
+    assert len(groups['F5']['photons']) == 2
+    assert len(groups['F5']['electrons']) == 0
 
 
 def test_get_tallies_f6(f6_file):
@@ -422,21 +446,22 @@ def test_get_tallies_f6(f6_file):
         file=f6_file,
         crit_case=False)
     # act
-    c.tally_list, c.f_types, c.F2_tallies, c.F4_tallies, c.F5_tallies, c.F6_tallies = c.get_tallies()
+    c.tally_list, c.f_types = c.get_tallies()
+    groups = group_tallies(c.tally_list)
     # assert
     assert len(c.tally_list) == 6
     assert c.f_types == ['F6', 'F6+']
-    assert len(c.F6_tallies['neutrons']) == 2
-    assert len(c.F6_tallies['photons']) == 2
-    assert len(c.F6_tallies['electrons']) == 0
-    assert len(c.F6_tallies['Collision Heating']) == 2
+    assert len(groups['F6']['neutrons']) == 2
+    assert len(groups['F6']['photons']) == 2
+    assert len(groups['F6']['electrons']) == 0
+    assert len(groups['F6']['Collision Heating']) == 2
 
 
 def test_get_tallies_adds_f2_to_types_list(simple_case):
     # arrange
     c = simple_case
     # act
-    c.tally_list, c.f_types, c.F2_tallies, c.F4_tallies, c.F5_tallies, c.F6_tallies = c.get_tallies()
+    c.tally_list, c.f_types = c.get_tallies()
     # assert
     assert "F2" in c.f_types
     assert "F4" not in c.f_types
@@ -454,7 +479,7 @@ def test_get_tallies_adds_f4_to_types_list(f4_file):
         crit_case=False
     )
     # act
-    c.tally_list, c.f_types, c.F2_tallies, c.F4_tallies, c.F5_tallies, c.F6_tallies = c.get_tallies()
+    c.tally_list, c.f_types = c.get_tallies()
     # assert
     assert "F2" not in c.f_types
     assert "F4" in c.f_types
@@ -472,7 +497,7 @@ def test_get_tallies_adds_f5_to_types_list(f5_file):
         crit_case=False
     )
     # act
-    c.tally_list, c.f_types, c.F2_tallies, c.F4_tallies, c.F5_tallies, c.F6_tallies = c.get_tallies()
+    c.tally_list, c.f_types = c.get_tallies()
     # assert
     assert "F2" not in c.f_types
     assert "F4" not in c.f_types
@@ -490,10 +515,357 @@ def test_get_tallies_adds_f6_to_types_list(f6_file):
         crit_case=False
     )
     # act
-    c.tally_list, c.f_types, c.F2_tallies, c.F4_tallies, c.F5_tallies, c.F6_tallies = c.get_tallies()
+    c.tally_list, c.f_types = c.get_tallies()
     # assert
     assert "F2" not in c.f_types
     assert "F4" not in c.f_types
     assert "F5" not in c.f_types
     assert "F6" in c.f_types
     assert "F6+" in c.f_types
+
+
+def test_get_tallies_keeps_unknown_tally_types(f4_file):
+    # arrange
+    f4_file = list(f4_file)
+    heading = next(n for n, line in enumerate(f4_file) if line.startswith('1tally       14'))
+    f4_file[heading + 1] = f4_file[heading + 1].replace('tally type 4', 'tally type 9')
+    c = MockEddyMCNPCase(
+        filepath="mcnp_examples/F4.out",
+        scaling_factor=1234,
+        file=f4_file,
+        crit_case=False)
+    # act
+    c.tally_list, c.f_types = c.get_tallies()
+    groups = group_tallies(c.tally_list)
+    # assert
+    assert len(c.tally_list) == 3
+    assert c.f_types == ['F4']
+    assert len(groups['F4']['neutrons']) + len(groups['F4']['photons']) == 2
+    assert [tally.tally_number for tally in c.tally_list if isinstance(tally, RawTally)] == ['14']
+
+
+def test_read_output_groups_tallies(f6_file):
+    # act
+    c = EddyMCNPCase("mcnp_examples/F6.out", 1, f6_file)
+    # assert
+    assert list(c.tally_groups['F6']) == ['neutrons', 'photons', 'electrons', 'Collision Heating']
+    assert len(c.tally_groups['F6']['Collision Heating']) == 2
+    assert c.tally_groups['F1'] == {'neutrons': [], 'photons': [], 'electrons': []}
+
+
+def test_get_fluctuation_charts(f4_file):
+    # arrange
+    c = MockEddyMCNPCase(
+        filepath="mcnp_examples/F4.out",
+        scaling_factor=1234,
+        file=f4_file,
+        crit_case=False)
+    # act
+    charts = c.get_fluctuation_charts()
+    # assert
+    assert sorted(charts) == ['14', '24', '4']
+    assert len(charts['14'].nps) == 17
+    assert charts['14'].nps[-1] == 8473614
+    assert charts['14'].mean[-1] == 6.0330E-05
+    assert charts['14'].error[-1] == 0.0016
+    assert charts['14'].fom[-1] == 395207
+
+
+def test_get_cross_sections(simple_case):
+    # act
+    cross_sections = simple_case.get_cross_sections()
+    # assert
+    assert len(cross_sections) == 27
+    assert cross_sections.find('26056.80c').length == 373657
+    assert cross_sections.find('26056.80c').file == 'xdata/endf71x/Fe/26056.710nc'
+    assert [library.library for library in cross_sections.libraries()] == ['endf71x', 'mcplib84', 'el03']
+
+
+def test_get_particle_data(simple_case):
+    # act
+    particle_data = simple_case.get_particle_data()
+    particle = simple_case.create_particle('neutron', particle_data['neutron'])
+    # assert
+    assert list(particle_data) == ['neutron', 'photon']
+    assert particle.creation[0].name == 'source'
+    assert particle.creation[0].tracks == 5294245
+    assert particle.loss[-1].weight == 1.0
+    assert particle.totals['total neutron collisions'] == 1237345
+
+
+def test_get_weight_balance(f4_file):
+    # arrange
+    heading = ["1neutron  weight balance in each cell                                                                   print table 130",
+               "",
+               "              cell    entering      source     exiting",
+               ""]
+    table = (heading + ["        1        1    1.0000E+00   1.0000E+00  -2.0000E+00"] +
+             heading + ["        2        2    2.0000E+00   0.0000E+00  -1.5000E+00",
+                        "",
+                        "           total      3.0000E+00   1.0000E+00  -3.5000E+00"])
+    c = MockEddyMCNPCase(
+        filepath="mcnp_examples/F4.out",
+        scaling_factor=1,
+        file=f4_file + table,
+        crit_case=False)
+    # act
+    data = c.get_weight_balance('neutron')
+    # assert
+    assert data == table
+    assert c.get_weight_balance('photon') is None
+
+
+def test_get_check_status(f4_file):
+    # arrange
+    c = MockEddyMCNPCase(
+        filepath="mcnp_examples/F4.out",
+        scaling_factor=1234,
+        file=f4_file,
+        crit_case=False)
+    # act
+    statuses = c.get_check_status()
+    # assert
+    assert sorted(statuses) == ['14', '24', '4']
+    assert statuses['4'].passed is True
+    assert statuses['4'].bins_passed is True
+
+
+def test_get_tally_densities(f5_file):
+    # arrange
+    c = MockEddyMCNPCase(
+        filepath="mcnp_examples/F5.out",
+        scaling_factor=1234,
+        file=f5_file,
+        crit_case=False)
+    # act
+    densities = c.get_tally_densities()
+    # assert
+    assert sorted(densities) == ['15', '25']
+    assert densities['15'].mean == 4.735E-03
+    assert densities['15'].counts.sum() == 342608
+
+
+def test_get_mesh_tallies(tmpdir):
+    # arrange
+    tmpdir.join('case.msht').write(
+        " Mesh Tally Number        4\n"
+        " neutron   mesh tally.\n"
+        "\n"
+        " Tally bin boundaries:\n"
+        "    X direction:      0.00     1.00\n"
+        "    Y direction:      0.00     1.00\n"
+        "    Z direction:      0.00     1.00\n"
+        "    Energy bin boundaries:  0.00E+00  1.00E+36\n"
+        "\n"
+        "       X         Y         Z     Result     Rel Error\n"
+        "   5.000E-01  5.000E-01  5.000E-01 1.00000E+00 1.00000E-02\n")
+    c = MockEddyMCNPCase(filepath=str(tmpdir.join('case.out')), scaling_factor=1, file=[])
+    c.mesh_tallies = []
+    c.meshtal_read = None
+    c.mcnp_input = ['Test case', 'fmesh4:n geom=xyz origin=0 0 0']
+    # act
+    mesh_tallies = c.get_mesh_tallies()
+    # assert
+    assert [mesh.tally_number for mesh in mesh_tallies] == ['4']
+    assert mesh_tallies[0].peak == 1.0
+
+
+def test_get_mesh_tallies_unreadable_meshtal(tmpdir, capsys):
+    # arrange
+    tmpdir.join('case.msht').write(" Mesh Tally Number        4\n neutron   mesh tally.\n")
+    c = MockEddyMCNPCase(filepath=str(tmpdir.join('case.out')), scaling_factor=1, file=[])
+    c.mesh_tallies = []
+    c.meshtal_read = None
+    c.mcnp_input = ['Test case', 'fmesh4:n geom=xyz origin=0 0 0']
+    # act
+    mesh_tallies = c.get_mesh_tallies()
+    # assert
+    assert mesh_tallies == []
+    assert 'could not be read' in capsys.readouterr().out
+
+
+def test_get_mesh_tallies_does_not_hide_bugs(tmpdir, mocker):
+    # arrange
+    tmpdir.join('case.msht').write(" Mesh Tally Number        4\n")
+    mocker.patch('eddymc.mcnp.eddy_mcnp_case.read_meshtal', side_effect=TypeError('a bug'))
+    c = MockEddyMCNPCase(filepath=str(tmpdir.join('case.out')), scaling_factor=1, file=[])
+    c.mesh_tallies = []
+    c.meshtal_read = None
+    c.mcnp_input = ['Test case', 'fmesh4:n geom=xyz origin=0 0 0']
+    # act, assert
+    with pytest.raises(TypeError):
+        c.get_mesh_tallies()
+
+
+def test_get_mesh_tallies_without_fmesh_cards(tmpdir):
+    # arrange
+    tmpdir.join('case.msht').write('')
+    c = MockEddyMCNPCase(filepath=str(tmpdir.join('case.out')), scaling_factor=1, file=[])
+    c.mcnp_input = ['Test case', 'f4:n 1']
+    # act, assert
+    assert c.get_mesh_tallies() == []
+
+
+def test_scaled_views_do_not_change_the_case(f2_file):
+    # arrange
+    case = EddyMCNPCase(filepath="mcnp_examples/F2.out", scaling_factor=2, file=f2_file)
+    unscaled_results = [tally.results[0]['result'] for tally in case.tally_list]
+    # act
+    default_view = case.scaled()
+    views = [case.scaled(scaling_factor) for scaling_factor in (1, 10, 1e6)]
+    # assert
+    assert default_view.scaling_factor == 2
+    assert default_view.scaled() is default_view
+    assert default_view.scaled(10).case is case
+    for view in views:
+        assert [tally.results[0]['result'] for tally in view.tally_list] == \
+               [result * view.scaling_factor for result in unscaled_results]
+        assert view.get_scaled_tally(case.tally_list[0]) is view.tally_list[0]
+        # the same scaled tally objects are shown in the lists by type as in the full list
+        assert {id(tally) for tally in sum(view.tally_groups['F2'].values(), [])} == {id(tally) for tally in view.tally_list}
+        assert view.cell_list is case.cell_list
+    assert [tally.results[0]['result'] for tally in case.tally_list] == unscaled_results
+
+
+def test_scaled_view_scales_every_tally_group(mocker, f2_file):
+    # arrange
+    mocker.patch.dict(tallies.TALLY_GROUPS, {'2': 'F9'})
+    mocker.patch.dict(tallies.GROUP_PARTICLES, {'F9': ['neutrons']})
+    case = EddyMCNPCase(filepath="mcnp_examples/F2.out", scaling_factor=1, file=f2_file)
+    # act
+    view = case.scaled(10)
+    # assert
+    assert set(view.tally_groups) == set(case.tally_groups)
+    assert [tally.results[0]['result'] for tally in view.tally_groups['F9']['neutrons']] == \
+           [tally.results[0]['result'] * 10 for tally in case.tally_groups['F9']['neutrons']]
+
+
+def test_classify_lines(simple_case):
+    # arrange
+    # act
+    messages = simple_case.classify_lines()
+    # assert
+    assert messages['ctme'] == '1'
+    assert messages['nps'] is None
+    assert len(messages['input']) == 191
+    assert messages['lost_particles'] is False
+    assert messages['fatal_errors'] == []
+    assert len(messages['warnings']) == 4
+    assert len(messages['comments']) == 7
+    assert messages['cycles'] == {}
+
+
+def test_get_messages_only_classifies_once(simple_case, mocker):
+    # arrange
+    spy = mocker.spy(simple_case, 'classify_lines')
+    # act
+    simple_case.get_warnings()
+    simple_case.get_comments()
+    simple_case.get_input()
+    # assert
+    assert spy.call_count == 1
+
+
+class CountingLines(list):
+    """A list of output lines that counts how many lines are read from it,
+    so that the cost of the section getters can be measured without timing them."""
+    def __init__(self, lines):
+        super().__init__(lines)
+        self.lines_read = 0
+
+    def __iter__(self):
+        for line in super().__iter__():
+            self.lines_read += 1
+            yield line
+
+    def __getitem__(self, item):
+        value = super().__getitem__(item)
+        self.lines_read += len(value) if isinstance(item, slice) else 1
+        return value
+
+
+@pytest.fixture
+def many_dumps_file(f2_file):
+    # Repeat the end-of-run part of F2.out, so the output has a run-terminated line for every dump
+    dump_start = next(n for n, line in enumerate(f2_file) if line.startswith('1problem summary'))
+    dump_end = next(n for n, line in enumerate(f2_file) if line.startswith('1status of the statistical checks'))
+    dumps = 200
+    return f2_file[:dump_start] + f2_file[dump_start:dump_end] * dumps + f2_file[dump_end:]
+
+
+def test_section_getters_are_linear_in_dump_anchors(many_dumps_file):
+    # arrange
+    file = CountingLines(many_dumps_file)
+    case = MockEddyMCNPCase(
+        filepath="mcnp_examples/F2_dumps.out",
+        scaling_factor=1,
+        file=file,
+        crit_case=False,
+    )
+    # act
+    for particle in ['neutron', 'photon', 'electron']:
+        case.get_particle_populations(particle)
+    case.get_particle_data()
+    tally_list = case.get_tallies()[0]
+    # assert
+    assert len(case.get_page_index().anchors) == 200
+    assert len(tally_list) == 600
+    # each line should be read a handful of times at most, not once per dump
+    assert file.lines_read < 10 * len(file)
+
+
+def test_update_reads_only_appended_lines(many_dumps_file):
+    # arrange
+    written = len(many_dumps_file) // 2     # stop part of the way through a dump
+    file = CountingLines(many_dumps_file[:written])
+    case = EddyMCNPCase(
+        filepath="mcnp_examples/F2_dumps.out",
+        scaling_factor=2,
+        file=file,
+        crit_case=False,
+        following=True,
+    )
+    tallies_before = len(case.tally_list)
+    file.extend(many_dumps_file[written:])
+    lines_read_before = file.lines_read
+    # act
+    updated = case.update()
+    # assert
+    assert updated is True
+    assert case.update() is False
+    assert 0 < tallies_before < 600
+    assert len(case.tally_list) == 600
+    full_case = EddyMCNPCase(filepath="mcnp_examples/F2_dumps.out", scaling_factor=2, file=many_dumps_file)
+    assert [tally.results for tally in case.tally_list] == [tally.results for tally in full_case.tally_list]
+    assert case.get_page_index().pages == full_case.get_page_index().pages
+    assert case.get_messages() == full_case.get_messages()
+    assert file.lines_read - lines_read_before < 10 * (len(many_dumps_file) - written)
+
+
+def test_update_keeps_sections_without_new_lines(many_dumps_file):
+    # arrange
+    written = len(many_dumps_file) - 20     # the last few lines of the output are still to come
+    file = CountingLines(many_dumps_file[:written])
+    case = EddyMCNPCase(
+        filepath="mcnp_examples/F2_dumps.out",
+        scaling_factor=2,
+        file=file,
+        crit_case=False,
+        following=True,
+    )
+    file.extend(many_dumps_file[written:])
+    lines_read_before = file.lines_read
+    cell_list = case.cell_list
+    # act
+    case.update()
+    # assert
+    full_case = EddyMCNPCase(filepath="mcnp_examples/F2_dumps.out", scaling_factor=2, file=many_dumps_file)
+    assert case.cell_list is cell_list      # the cell table was not read again
+    assert list(case.cell_list.cell_numbers) == list(full_case.cell_list.cell_numbers)
+    assert [particle.creation for particle in case.particle_list] == \
+           [particle.creation for particle in full_case.particle_list]
+    assert len(case.cross_sections) == len(full_case.cross_sections)
+    assert case.check_status == full_case.check_status
+    assert sorted(case.fluctuation_charts) == sorted(full_case.fluctuation_charts)
+    # only the pages that have new lines are read again, not the whole output
+    assert file.lines_read - lines_read_before < len(many_dumps_file) // 10
@@ -0,0 +1,53 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import math
+import pytest
+from eddymc.mcnp import fluctuation_charts
+
+
+@pytest.fixture
+def chart_page():
+    return [
+        "1tally fluctuation charts                              ",
+        "",
+        "                            tally        4                          tally       14",
+        "          nps      mean     error   vov  slope    fom      mean     error   vov  slope    fom",
+        "       512000   1.1001E-03 0.0003 0.0001  1.8 1.9E+08   6.0572E-05 0.0065 0.0001 10.0  393726",
+        "      1024000   1.1003E-03 0.0000 0.0000  2.0 1.0E+30   6.0572E-05 0.0046 0.0000  6.4  399597",
+        "",
+        " ***********************************************************************************************************************",
+    ]
+
+
+def test_read_fluctuation_charts(chart_page):
+    # act
+    charts = fluctuation_charts.read_fluctuation_charts(chart_page)
+    # assert
+    assert [chart.tally_number for chart in charts] == ['4', '14']
+    assert list(charts[0].nps) == [512000, 1024000]
+    assert list(charts[0].mean) == [1.1001E-03, 1.1003E-03]
+    assert list(charts[0].error) == [0.0003, 0.0]
+    assert list(charts[1].vov) == [0.0001, 0.0]
+    assert list(charts[1].slope) == [10.0, 6.4]
+    assert list(charts[1].fom) == [393726, 399597]
+
+
+def test_read_fluctuation_charts_undefined_fom(chart_page):
+    # act
+    charts = fluctuation_charts.read_fluctuation_charts(chart_page)
+    # assert
+    assert charts[0].fom[0] == 1.9E+08
+    assert math.isnan(charts[0].fom[1])
+
+
+def test_fluctuation_chart_scaled(chart_page):
+    # arrange
+    chart = fluctuation_charts.read_fluctuation_charts(chart_page)[0]
+    # act
+    scaled = chart.scaled(2)
+    # assert
+    assert list(scaled.mean) == [1.1001E-03 * 2, 1.1003E-03 * 2]
+    assert list(scaled.error) == list(chart.error)
+    assert list(chart.mean) == [1.1001E-03, 1.1003E-03]
@@ -3,7 +3,9 @@
 or add a configuration in pycharm
 """
 
-from eddymc.mcnp.mcnp_html_writer import get_css
+import pytest
+from eddymc.mcnp.eddy_mcnp_case import EddyMCNPCase
+from eddymc.mcnp.mcnp_html_writer import get_css, get_html
 
 
 def test_get_css():
@@ -13,3 +15,67 @@ def test_get_css():
     # assert
     assert type(actual_css) == str
     assert actual_css is not ''
+
+
+def test_get_html_escapes_output_text():
+    # arrange
+    with open('mcnp_examples/F2.out', 'r') as file:
+        data = file.readlines()
+    case = EddyMCNPCase(filepath='mcnp_examples/F2.out', scaling_factor=1, file=data, crit_case=False)
+    case.comments = ["This has a <h1> </h1> & \" symbol in it"]
+    # act
+    html = get_html(case)
+    # assert
+    assert "This has a &lt;h1&gt; &lt;/h1&gt; &amp; &#34; symbol in it" in html
+    assert "<h1> </h1>" not in html
+    assert '<style type="text/css">' in html
+
+
+@pytest.fixture
+def tally_bins_data():
+    with open('mcnp_examples/F4.out', 'r') as file:
+        data = file.readlines()
+    start = data.index('1tally        4        nps =     8473614\n')
+    result = next(n for n in range(start, len(data)) if data[n].split() == ['1.10032E-03', '0.0001'])
+    data[result:result + 1] = [
+        " multiplier bin:   1.00000E+00      1   -6\n",
+        "      energy   \n",
+        "    1.0000E+00   1.00000E-04 0.0100\n",
+        "    2.0000E+01   3.00000E-04 0.0300\n",
+        "      total      4.00000E-04 0.0250\n",
+        " multiplier bin:   1.00000E+00      1   -2\n",
+        "      energy   \n",
+        "    1.0000E+00   2.00000E-04 0.0200\n",
+        "    2.0000E+01   4.00000E-04 0.0400\n",
+        "      total      6.00000E-04 0.0300\n",
+    ]
+    return data
+
+
+def test_get_html_tally_bins_by_axis(tally_bins_data):
+    # arrange
+    data = tally_bins_data
+    case = EddyMCNPCase(filepath='mcnp_examples/F4.out', scaling_factor=1, file=data, crit_case=False)
+    # act
+    html = get_html(case)
+    # assert
+    assert '<th>Multiplier Bin</th>' in html
+    assert '<td>1.00000E+00 1 -2</td>' in html
+    assert 'Cell  3 by Energy' in html
+    assert 'Summed over the other bins, for the first multiplier bin.' in html
+    assert 'bins are listed' not in html
+
+
+def test_get_html_limits_tally_bins(mocker, tally_bins_data):
+    # arrange
+    mocker.patch('eddymc.mcnp.mcnp_html_writer.MAX_REGION_ROWS', 3)
+    case = EddyMCNPCase(filepath='mcnp_examples/F4.out', scaling_factor=1, file=tally_bins_data, crit_case=False)
+    # act
+    html = get_html(case)
+    # assert
+    assert 'The first 3 of 4 bins are listed; all of them are included in the results by each axis.' in html
+    assert '<td>1.00000E+00 1 -6</td>' in html
+    # the last bin is only left out of the table of every bin: the second multiplier bin is listed
+    # once there and once in the results by multiplier, which are summed over both energy bins
+    assert html.count('<td>1.00000E+00 1 -2</td>') == 2
+    assert '<td>6.000e-04</td>' in html
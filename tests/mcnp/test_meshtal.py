@@ -0,0 +1,190 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import os
+import pickle
+import numpy as np
+import pytest
+from eddymc.mcnp import meshtal
+
+
+MESHTAL = """mcnp   version 6     ld=05/08/13  probid =  10/18/26 12:00:00
+ Test mesh tallies
+ Number of histories used for normalizing tallies =      1000000.00
+
+ Mesh Tally Number        14
+ neutron   mesh tally.
+
+ Tally bin boundaries:
+    X direction:    -10.00     0.00     10.00
+    Y direction:    -10.00     0.00     10.00
+    Z direction:    -10.00    10.00
+    Energy bin boundaries:  0.00E+00  1.00E+00
+                            2.00E+01
+
+   Energy      X         Y         Z     Result     Rel Error
+   1.000E+00 -5.000E+00 -5.000E+00  0.000E+00 1.00000E-03 1.00000E-02
+   1.000E+00 -5.000E+00  5.000E+00  0.000E+00 2.00000E-03 2.00000E-02
+   1.000E+00  5.000E+00 -5.000E+00  0.000E+00 3.00000E-03 3.00000E-02
+   1.000E+00  5.000E+00  5.000E+00  0.000E+00 4.00000E-03 4.00000E-02
+   2.000E+01 -5.000E+00 -5.000E+00  0.000E+00 1.00000E-04 1.00000E-01
+   2.000E+01 -5.000E+00  5.000E+00  0.000E+00 2.00000E-04 2.00000E-01
+   2.000E+01  5.000E+00 -5.000E+00  0.000E+00 3.00000E-04 3.00000E-01
+   2.000E+01  5.000E+00  5.000E+00  0.000E+00 4.00000E-04 4.00000E-01
+   Total     -5.000E+00 -5.000E+00  0.000E+00 1.10000E-03 1.10000E-02
+   Total     -5.000E+00  5.000E+00  0.000E+00 2.20000E-03 2.20000E-02
+   Total      5.000E+00 -5.000E+00  0.000E+00 3.30000E-03 3.30000E-02
+   Total      5.000E+00  5.000E+00  0.000E+00 4.40000E-03 4.40000E-02
+
+ Mesh Tally Number        24
+ photon    mesh tally.
+
+ Tally bin boundaries:
+    X direction:      0.00     1.00     2.00
+    Y direction:      0.00     1.00
+    Z direction:      0.00     1.00     2.00
+    Energy bin boundaries:  0.00E+00  1.00E+36
+
+       X         Y         Z     Result     Rel Error
+   5.000E-01  5.000E-01  5.000E-01 1.00000E+00 1.00000E-02
+   5.000E-01  5.000E-01  1.500E+00 2.00000E+00 2.00000E-02
+   1.500E+00  5.000E-01  5.000E-01 0.00000E+00 0.00000E+00
+   1.500E+00  5.000E-01  1.500E+00 5.00000E+00 5.00000E-02
+"""
+
+
+@pytest.fixture
+def meshtal_file(tmpdir):
+    path = tmpdir.join('case.msht')
+    path.write(MESHTAL)
+    return str(path)
+
+
+def test_read_meshtal(meshtal_file):
+    # act
+    mesh_tallies = meshtal.read_meshtal(meshtal_file)
+    # assert
+    assert [mesh.tally_number for mesh in mesh_tallies] == ['14', '24']
+    assert [mesh.particle for mesh in mesh_tallies] == ['neutron', 'photon']
+    assert mesh_tallies[0].axes == ('X', 'Y', 'Z')
+    assert list(mesh_tallies[0].energies) == [0.0, 1.0, 20.0]
+
+
+def test_read_meshtal_energy_bins(meshtal_file):
+    # act
+    mesh = meshtal.read_meshtal(meshtal_file)[0]
+    # assert
+    assert mesh.results.shape == (3, 2, 2, 1)
+    assert mesh.results[0, 1, 0, 0] == 3.0E-03
+    assert mesh.results[1, 0, 1, 0] == 2.0E-04
+    assert mesh.errors[1, 1, 1, 0] == 0.4
+    assert list(mesh.total[:, :, 0].flatten()) == [1.1E-03, 2.2E-03, 3.3E-03, 4.4E-03]
+
+
+def test_read_meshtal_summary(meshtal_file):
+    # act
+    mesh = meshtal.read_meshtal(meshtal_file)[1]
+    # assert
+    assert mesh.results.shape == (1, 2, 1, 2)
+    assert mesh.peak == 5.0
+    assert mesh.peak_error == 0.05
+    assert mesh.peak_location == (1.5, 0.5, 1.5)
+    assert mesh.mean == 2.0
+    # only the Y slice has more than one voxel along both of its axes
+    assert [(axis, position, plane) for axis, position, plane, section in mesh.slices] == [('Y', 0.5, ('X', 'Z'))]
+    assert mesh.slices[0][3].tolist() == [[1.0, 2.0], [0.0, 5.0]]
+
+
+def test_read_meshtal_memmap(meshtal_file, tmpdir):
+    # act
+    mesh = meshtal.read_meshtal(meshtal_file, memmap=True)[0]
+    copy = pickle.loads(pickle.dumps(mesh))
+    # assert
+    assert isinstance(mesh.results, np.memmap)
+    assert tmpdir.join('case.msht.14.results.npy').check()
+    assert isinstance(copy.results, np.memmap)
+    assert np.array_equal(copy.results, mesh.results)
+
+
+def test_read_meshtal_memmap_of_another_run(meshtal_file, tmpdir):
+    # arrange
+    other_run = tmpdir.mkdir('other_run').join('case.msht')
+    other_run.write(MESHTAL.replace('1.00000E-03 1.00000E-02', '9.00000E-03 1.00000E-02'))
+    mesh = meshtal.read_meshtal(meshtal_file, memmap=True)[0]
+    # act
+    other_mesh = meshtal.read_meshtal(str(other_run), memmap=True)[0]
+    # assert
+    assert mesh.results[0, 0, 0, 0] == 1.0E-03
+    assert other_mesh.results[0, 0, 0, 0] == 9.0E-03
+
+
+def test_read_meshtal_memmap_written_again(meshtal_file):
+    # arrange
+    mesh = meshtal.read_meshtal(meshtal_file, memmap=True)[0]
+    state = pickle.dumps(mesh)
+    path = mesh.results.filename
+    os.utime(path, (0, 0))   # as if the meshtal file had been read again
+    # act
+    copy = pickle.loads(state)
+    # assert
+    assert copy.results is None
+    assert copy.peak == mesh.peak
+
+
+def test_read_meshtal_time_bins(tmpdir):
+    # arrange
+    path = tmpdir.join('case.msht')
+    path.write(MESHTAL.replace('    Energy bin boundaries:  0.00E+00  1.00E+36',
+                               '    Energy bin boundaries:  0.00E+00  1.00E+36\n    Time bin boundaries:  0.00E+00  1.00E+36'))
+    # act, assert
+    with pytest.raises(ValueError):
+        meshtal.read_meshtal(str(path))
+
+
+def test_read_meshtal_malformed_voxel(tmpdir):
+    # arrange
+    path = tmpdir.join('case.msht')
+    path.write(MESHTAL.replace('1.00000E-03 1.00000E-02', '1.00000E-03 1.000O0E-02'))
+    # act, assert
+    with pytest.raises(ValueError):
+        meshtal.read_meshtal(str(path))
+
+
+def test_scaled_mesh_tally(meshtal_file):
+    # arrange
+    mesh = meshtal.read_meshtal(meshtal_file)[1]
+    # act
+    scaled = mesh.scaled(2)
+    # assert
+    assert scaled.peak == 10.0
+    assert scaled.mean == 4.0
+    assert scaled.peak_error == 0.05
+    assert scaled.slices[0][3].tolist() == [[2.0, 4.0], [0.0, 10.0]]
+    assert scaled.total.max() == 10.0
+    assert mesh.peak == 5.0
+
+
+def test_downsample():
+    # arrange
+    section = np.arange(12, dtype=float).reshape(4, 3)
+    # act
+    small = meshtal.downsample(section, size=2)
+    # assert
+    assert small.tolist() == [[1.5, 3.0], [7.5, 9.0]]
+
+
+def test_find_meshtal(tmpdir):
+    # arrange
+    tmpdir.join('case.out').write('')
+    tmpdir.join('meshtal').write('')
+    tmpdir.join('case.msht').write('')
+    # act, assert
+    assert meshtal.find_meshtal(str(tmpdir.join('case.out'))) == str(tmpdir.join('case.msht'))
+    assert meshtal.find_meshtal(str(tmpdir.join('case.out.gz'))) == str(tmpdir.join('case.msht'))
+    assert meshtal.find_meshtal(str(tmpdir.join('other.out'))) == str(tmpdir.join('meshtal'))
+
+
+def test_find_meshtal_missing(tmpdir):
+    # act, assert
+    assert meshtal.find_meshtal(str(tmpdir.join('case.out'))) is None
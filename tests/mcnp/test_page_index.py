@@ -0,0 +1,96 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import pytest
+from eddymc.mcnp.page_index import PageIndex
+from tests import mcnp_examples
+
+try:
+    import importlib.resources as pkg_resources
+except ImportError:
+    import importlib_resources as pkg_resources
+
+
+@pytest.fixture
+def f4_averages_file(tmpdir):
+    # noinspection PyTypeChecker
+    f4 = pkg_resources.read_text(mcnp_examples, 'F4_averages.out')
+    return f4.split('\n')
+
+
+@pytest.fixture
+def f4_index(f4_averages_file):
+    return PageIndex(f4_averages_file)
+
+
+def test_page_index_finds_cells(f4_index, f4_averages_file):
+    # arrange
+    # act
+    page = f4_index.first('cells')
+    # assert
+    assert page.table == 60
+    assert f4_averages_file[page.start].startswith('1cells')
+    assert f4_averages_file[page.end].startswith('1cross-section tables')
+
+
+def test_page_index_tally_pages(f4_index):
+    # arrange
+    # act
+    tally_pages = f4_index.pages_of('tally')
+    # assert
+    assert [page.number for page in tally_pages] == [4, 14, 34, 104, 114, 124, 134, 144, 154]
+
+
+def test_page_index_print_tables(f4_index):
+    # arrange
+    # act
+    activity_pages = f4_index.table(126)
+    # assert
+    assert [page.kind for page in activity_pages] == ['neutron activity in each cell', 'photon activity in each cell']
+    assert len(f4_index.table(160)) == 9
+    assert f4_index.table(999) == []
+
+
+def test_page_index_first_after(f4_index):
+    # arrange
+    second_tally = f4_index.pages_of('tally')[1]
+    # act
+    page = f4_index.first('tally', after=second_tally.start)
+    missing = f4_index.first('tally', after=f4_index.length)
+    # assert
+    assert page == second_tally
+    assert missing is None
+
+
+def test_page_index_next_page(f4_index):
+    # arrange
+    first_tally = f4_index.pages_of('tally')[0]
+    # act
+    page = f4_index.next_page(first_tally, ('tally', 'status'))
+    # assert
+    assert page.kind == 'tally'
+    assert page.number == 14
+
+
+def test_page_index_anchors(f4_index, f4_averages_file):
+    # arrange
+    # act
+    anchors = f4_index.anchors
+    # assert
+    assert len(anchors) == 1
+    assert f4_averages_file[anchors[0]].startswith('+')
+
+
+def test_page_index_extend(f4_index, f4_averages_file):
+    # arrange
+    first_tally = f4_index.pages_of('tally')[0]
+    partial_index = PageIndex(f4_averages_file[:first_tally.start + 5])
+    # act
+    partial_index.extend(f4_averages_file)
+    # assert
+    assert partial_index.pages == f4_index.pages
+    assert partial_index.kinds == f4_index.kinds
+    assert partial_index.tables == f4_index.tables
+    assert partial_index.anchors == f4_index.anchors
+    assert partial_index.length == f4_index.length
@@ -1,9 +1,81 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
 
 import pytest
 from eddymc.mcnp import particles
 from tests import mcnp_examples
+try:
+    import importlib.resources as pkg_resources
+except ImportError:
+    import importlib_resources as pkg_resources
 
 
 @pytest.fixture
-def get_neutron_data():
-    pass
+def f2_file():
+    f2 = pkg_resources.read_text(mcnp_examples, 'F2.out')
+    return f2.split('\n')
+
+
+@pytest.fixture
+def proton_table():
+    return [" proton creation     tracks      weight        energy            proton loss         tracks      weight        energy",
+            "                                 (per source particle)                                           (per source particle)",
+            "",
+            " source                1000    1.0000E+00    1.5000E+02          escape                 912    9.1200E-01    1.2000E+02",
+            " nucl. interaction       12    1.2000E-02    3.0000E-01          energy cutoff           84    8.4000E-02    2.1000E-01",
+            " weight window            0    0.            0.                  nucl. interaction       16    1.6000E-02    3.0090E+01",
+            "     total             1012    1.0120E+00    1.5030E+02              total             1012    1.0120E+00    1.5030E+02",
+            "",
+            "   number of protons banked                       12        average time of (shakes)              cutoffs",
+            "   proton tracks per source particle      1.0120E+00          escape            1.1000E-03          tco   1.0000E+33",
+            "",
+            " computer time so far in this run     0.10 minutes            maximum number ever in bank         1",
+            ]
+
+
+def test_find_particle_tables(f2_file):
+    # act
+    tables = particles.find_particle_tables(f2_file)
+    # assert
+    assert list(tables) == ['neutron', 'photon']
+    assert tables['neutron'][0].startswith(' neutron creation')
+    assert tables['neutron'][-1].strip().startswith('net multiplication')
+    assert tables['photon'][-1].strip().startswith('any termination')
+
+
+def test_find_particle_tables_any_particle(proton_table):
+    # act
+    tables = particles.find_particle_tables(proton_table)
+    # assert
+    assert list(tables) == ['proton']
+    assert tables['proton'] == proton_table[:10]
+
+
+def test_find_particle_tables_unfinished(proton_table):
+    # act, assert
+    assert particles.find_particle_tables(proton_table[:8]) == {}
+
+
+def test_read_particle_table(f2_file):
+    # arrange
+    data = particles.find_particle_tables(f2_file)['photon']
+    # act
+    photon = particles.read_particle_table('photon', data)
+    # assert
+    assert photon.particle_type == 'photon'
+    assert len(photon.creation) == 24
+    assert len(photon.loss) == 16
+    assert photon.creation[10] == particles.ParticleEvent('from neutrons', 291034, 5.5717E-02, 7.8681E-02)
+    assert photon.loss[-1] == particles.ParticleEvent('total', 319045, 6.1127E-02, 7.9061E-02)
+    assert photon.totals == {'number of photons banked': 313111, 'photon tracks per source particle': 6.0263E-02,
+                             'photon collisions per source particle': 2.8760E-02, 'total photon collisions': 152262}
+
+
+def test_read_particle_table_any_particle(proton_table):
+    # act
+    proton = particles.read_particle_table('proton', proton_table[:10])
+    # assert
+    assert [event.name for event in proton.creation] == ['source', 'nucl. interaction', 'weight window', 'total']
+    assert proton.loss[2] == particles.ParticleEvent('nucl. interaction', 16, 1.6E-02, 3.009E+01)
+    assert proton.totals['number of protons banked'] == 12
@@ -0,0 +1,90 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import numpy as np
+import pytest
+from eddymc.mcnp import repeated_structures
+
+
+@pytest.fixture
+def index():
+    return repeated_structures.RegionIndex.from_labels([
+        '(1<5[0 0 0]<3)',
+        '(2<5[0 0 0]<3)',
+        '(1<5[1 0 0]<3)',
+        '(1<6<4)',
+        '9',
+    ])
+
+
+def test_split_levels():
+    # act, assert
+    assert repeated_structures.split_levels('(12<5[1  2 0]<3)') == ['12', '5[1 2 0]', '3']
+    assert repeated_structures.split_levels('12') == ['12']
+    assert repeated_structures.split_levels('((12 13)<5)') == ['(12 13)', '5']
+
+
+def test_get_lattice_index():
+    # act, assert
+    assert repeated_structures.get_lattice_index('5[1 -2 0]') == (1, -2, 0)
+    assert repeated_structures.get_lattice_index('5[0:2 0 0]') == ('0:2', 0, 0)
+    assert repeated_structures.get_lattice_index('5') is None
+
+
+def test_is_balanced():
+    # act, assert
+    assert repeated_structures.is_balanced('cell (1<5[0 0 0]<3)')
+    assert not repeated_structures.is_balanced('cell (1<5[0 0')
+
+
+def test_from_labels(index):
+    # assert
+    assert len(index) == 5
+    assert index.depth == 3
+    assert index.names.count('3') == 1
+    assert index[1] == repeated_structures.RegionLabel('2', ('5[0 0 0]', '3'), (0, 0, 0))
+    assert index[3] == repeated_structures.RegionLabel('1', ('6', '4'), None)
+    assert index[4] == repeated_structures.RegionLabel('9', (), None)
+
+
+def test_from_labels_without_repeated_structures():
+    # act, assert
+    assert repeated_structures.RegionIndex.from_labels(['3', '4']) is None
+
+
+def test_group_by_lattice_element(index):
+    # arrange
+    values = np.array([1.0, 3.0, 2.0, 4.0, 5.0])
+    errors = np.array([0.1, 0.2, 0.1, 0.1, 0.1])
+    # act
+    groups = index.group_by_lattice_element(values, errors)
+    # assert
+    assert [(group.label, group.regions) for group in groups] == \
+           [('9', 1), ('1<6<4', 1), ('5[0 0 0]<3', 2), ('5[1 0 0]<3', 1)]
+    assert groups[2].mean == 2.0
+    assert groups[2].mean_error == pytest.approx(np.sqrt(0.1 ** 2 + 0.6 ** 2) / 4.0)
+    assert groups[2].peak == 3.0
+    assert groups[2].peak_error == 0.2
+
+
+def test_group_by_level(index):
+    # arrange
+    values = np.array([1.0, 3.0, 2.0, 4.0, 5.0])
+    errors = np.full(5, 0.1)
+    # act
+    groups = index.group_by_level(values, errors, 2, limit=2)
+    # assert
+    assert [(group.label, group.regions, group.peak) for group in groups] == \
+           [('(not in a universe)', 1, 5.0), ('4', 1, 4.0)]
+
+
+def test_level_summary(index):
+    # arrange
+    values = np.array([1.0, 3.0, 2.0, 4.0, 5.0])
+    errors = np.full(5, 0.1)
+    # act
+    summary = index.level_summary(values, errors)
+    # assert
+    assert [(level, groups) for level, groups, peak in summary] == [(1, 4), (2, 3)]
+    assert summary[1][2].peak == 5.0
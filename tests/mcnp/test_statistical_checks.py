@@ -0,0 +1,80 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import numpy as np
+import pytest
+from eddymc.mcnp import statistical_checks
+
+
+@pytest.fixture
+def status_page():
+    return [
+        "1status of the statistical checks used to form confidence intervals for the mean for each tally bin",
+        "",
+        "",
+        " tally   result of statistical checks for the tfc bin (the first check not passed is listed) and error magnitude check for all bins",
+        "",
+        "        5   passed the 10 statistical checks for the tally fluctuation chart bin result               ",
+        "         passed all bin error check:     2 tally bins all have relative errors less than 0.05 with no zero bins",
+        "",
+        "       15   missed  3 of 10 tfc bin checks: the variance of the variance does not monotonically decrease over the last half of problem",
+        "         missed all bin error check:     2 tally bins had     1 bins with relative errors greater than 0.10",
+        "",
+        "",
+        " the 10 statistical checks are only for the tally fluctuation chart bin and do not apply to other tally bins.",
+    ]
+
+
+@pytest.fixture
+def density_page():
+    return [
+        "1unnormed tally density for tally 6          nonzero tally mean(m) = 3.355E-05   nps = 3447731               print table 161",
+        "",
+        " abscissa              ordinate   log plot of tally probability density function in tally fluctuation chart bin(d=decade,slope= 1.5)",
+        "  tally  number num den log den:d------------d-------------d-------------d--------------d-------------d-------------d-------------d-",
+        " 3.16-07    630 2.81+03   3.449 *************|*************|*************|**************|*************|*************|             | ",
+        " 3.98-07   1054 3.73+03   3.572 *************|*************|*************|**************|*************|*************|*            | ",
+        " 7.94-04      2 3.55-03  -2.450 *            |             |             s              |             |             |             | ",
+        "  total 3447731 1.00+00         d------------d-------------d-------------d--------------d-------------d-------------d-------------d-",
+        "",
+    ]
+
+
+def test_read_check_status(status_page):
+    # act
+    statuses = statistical_checks.read_check_status(status_page)
+    # assert
+    assert sorted(statuses) == ['15', '5']
+    assert statuses['5'].passed is True
+    assert statuses['5'].missed == 0
+    assert statuses['5'].first_missed == ''
+    assert statuses['5'].bins_passed is True
+    assert statuses['15'].passed is False
+    assert statuses['15'].missed == 3
+    assert statuses['15'].first_missed.startswith('the variance of the variance')
+    assert statuses['15'].bins_passed is False
+    assert statuses['15'].bins_message.endswith('greater than 0.10')
+
+
+def test_read_tally_density(density_page):
+    # act
+    density = statistical_checks.read_tally_density(density_page)
+    # assert
+    assert density.tally_number == '6'
+    assert density.mean == 3.355E-05
+    assert density.nps == 3447731
+    assert list(density.scores) == [3.16E-07, 3.98E-07, 7.94E-04]
+    assert list(density.counts) == [630, 1054, 2]
+    assert list(density.density) == [2.81E+03, 3.73E+03, 3.55E-03]
+
+
+def test_tally_density_log_log():
+    # arrange
+    density = statistical_checks.TallyDensity('4', 1.0, 10, np.array([1.0, 10.0, 100.0]),
+                                              np.array([5, 0, 1]), np.array([100.0, 0.0, 0.1]))
+    # act
+    scores, densities = density.log_log()
+    # assert
+    assert list(scores) == [0.0, 2.0]
+    assert list(densities) == [2.0, -1.0]
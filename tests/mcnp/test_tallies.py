@@ -3,6 +3,7 @@ or add a configuration in pycharm
 """
 
 import pytest
+import numpy as np
 from eddymc.mcnp import tallies
 from tests import mcnp_examples
 
@@ -531,24 +532,25 @@ def test_f2_init_calls_subclass_results(mocker, f2_tally_data):
 
 
 def test_f2_tally_get_results(f2_tally_data):
-    # arrange
-    tally = tallies.F2Tally(f2_tally_data)
     # act
-    tally.results = tally.get_results()
+    tally = tallies.F2Tally(f2_tally_data)
     # assert
-    assert type(tally.results) == list
+    assert type(tally.results) == tallies.TallyResults
     assert tally.results[0]['surface'] == 'Surface  2'
     assert tally.results[0]['result'] == 1.11143E-03
     assert tally.results[0]['variance'] == 0.0001
 
 
-def test_f2_tally_scale_result(f2_tally_data):
+def test_f2_tally_scaled(f2_tally_data):
     # arrange
     F2_object = tallies.F2Tally(f2_tally_data)
     # act
-    F2_object.scale_result(scaling_factor=3)
+    scaled = F2_object.scaled(scaling_factor=3)
     # assert
-    assert F2_object.results[0]['result'] == 1.11143E-03 * 3
+    assert scaled.results[0]['result'] == 1.11143E-03 * 3
+    assert scaled.results[0]['variance'] == 0.0001
+    assert scaled.tally_number == F2_object.tally_number
+    assert F2_object.results[0]['result'] == 1.11143E-03
 
 
 def test_f4_init_creates_object(f4_tally_data):
@@ -577,25 +579,24 @@ def test_f4_init_calls_subclass_results(mocker, f4_tally_data):
 
 
 def test_f4_tally_get_results(f4_tally_data):
-    # arrange
-    tally = tallies.F4Tally(f4_tally_data)
     # act
-    tally.results = tally.get_results()
+    tally = tallies.F4Tally(f4_tally_data)
     # assert
-    assert type(tally.results) == list
+    assert type(tally.results) == tallies.TallyResults
     assert len(tally.results) == 1
     assert tally.results[0]['region'] == "Cell  3"
     assert tally.results[0]['result'] == 1.10032E-03
     assert tally.results[0]['variance'] == 0.0001
 
 
-def test_f4_tally_scale_result(f4_tally_data):
+def test_f4_tally_scaled(f4_tally_data):
     # arrange
     F4_object = tallies.F4Tally(f4_tally_data)
     # act
-    F4_object.scale_result(scaling_factor=2)
+    scaled = F4_object.scaled(scaling_factor=2)
     # assert
-    assert F4_object.results[0]['result'] == 1.10032E-03 * 2
+    assert scaled.results[0]['result'] == 1.10032E-03 * 2
+    assert F4_object.results[0]['result'] == 1.10032E-03
 
 
 def test_f5_init_creates_object(f5_tally_data):
@@ -624,13 +625,11 @@ def test_f5_init_calls_subclass_results(mocker, f5_tally_data):
 
 
 def test_f5_tally_get_results(f5_tally_data):
-    # arrange
-    tally = tallies.F5Tally(f5_tally_data)
     # act
-    tally.results = tally.get_results()
+    tally = tallies.F5Tally(f5_tally_data)
     # assert
-    assert type(tally.results) == list
-    assert type(tally.results[0]) == dict
+    assert type(tally.results) == tallies.TallyResults
+    assert type(tally.results[0]) == tallies.TallyRow
     assert tally.results[0]['x'] == 5
     assert tally.results[0]['y'] == 0
     assert tally.results[0]['z'] == 0
@@ -772,22 +771,22 @@ def test_f5_tally_with_multiple_detectors():
         " fom = (histories/minute)*(f(x) signal-to-noise ratio)**2 = (3.816E+06)*( 1.748E-01)**2 = (3.816E+06)*(3.057E-02) = 1.167E+05",
         "",
     ]
-    tally = tallies.F5Tally(tally_data)
     # act
-    tally.results = tally.get_results()
+    tally = tallies.F5Tally(tally_data)
     # assert
     assert len(tally.results) == 2
     assert tally.results[0]['result'] == 2.40763E-04
     assert tally.results[1]['result'] == 5.98890E-05
 
 
-def test_f5_tally_scale_result(f5_tally_data):
+def test_f5_tally_scaled(f5_tally_data):
     # arrange
     F5_object = tallies.F5Tally(f5_tally_data)
     # act
-    F5_object.scale_result(scaling_factor=3)
+    scaled = F5_object.scaled(scaling_factor=3)
     # assert
-    assert F5_object.results[0]["result"] == 4.38636E-03 * 3
+    assert scaled.results[0]["result"] == 4.38636E-03 * 3
+    assert F5_object.results[0]["result"] == 4.38636E-03
 
 
 def test_f6_init_creates_object(f6_tally_data):
@@ -829,12 +828,10 @@ def test_f6_init_calls_subclass_results(mocker, f6_tally_data):
 
 
 def test_f6_tally_get_results(f6_tally_data):
-    # arrange
-    tally = tallies.F6Tally(f6_tally_data)
     # act
-    tally.results = tally.get_results()
+    tally = tallies.F6Tally(f6_tally_data)
     # assert
-    assert type(tally.results) == dict
+    assert type(tally.results) == tallies.TallyResults
     assert tally.results['3']['region'] == "Cell 3"
     assert tally.results['3']['result'] == 2.45307E-05
     assert tally.results['3']['variance'] == 0.0005
@@ -844,12 +841,10 @@ def test_f6_tally_get_results(f6_tally_data):
 
 
 def test_f6_plus_tally_get_results(f6_plus_tally_data):
-    # arrange
-    tally = tallies.F6Tally(f6_plus_tally_data)
     # act
-    tally.results = tally.get_results()
+    tally = tallies.F6Tally(f6_plus_tally_data)
     # assert
-    assert type(tally.results) == dict
+    assert type(tally.results) == tallies.TallyResults
     assert tally.results['3']['region'] == "Cell 3"
     assert tally.results['3']['result'] == 2.60440E-05
     assert tally.results['3']['variance'] == 0.0005
@@ -858,11 +853,427 @@ def test_f6_plus_tally_get_results(f6_plus_tally_data):
     assert tally.results['4']['variance'] == 0.0005
 
 
-def test_f6_tally_scale_results(f6_tally_data):
+def test_f6_tally_scaled(f6_tally_data):
     # arrange
     F6_object = tallies.F6Tally(f6_tally_data)
     # act
-    F6_object.scale_result(scaling_factor=2)
+    scaled = F6_object.scaled(scaling_factor=2)
+    # assert
+    assert scaled.results['3']['result'] == 2.45307E-05 * 2
+    assert scaled.results['3']['mass'] == F6_object.results['3']['mass']
+    assert F6_object.results['3']['result'] == 2.45307E-05
+
+
+
+@pytest.fixture
+def f4_energy_bins_data(f4_tally_data):
+    tally_data = list(f4_tally_data)
+    tally_data[10:11] = [
+        "      energy   ",
+        "    1.0000E-01   1.00000E-04 0.0100",
+        "    1.0000E+00   2.00000E-04 0.0200",
+        "    2.0000E+01   3.00000E-04 0.0300",
+        "      total      6.00000E-04 0.0150",
+    ]
+    return tally_data
+
+
+def test_f4_tally_get_results_energy_bins(f4_energy_bins_data):
+    # act
+    tally = tallies.F4Tally(f4_energy_bins_data)
+    # assert
+    bins = tally.results[0]['bins']
+    assert len(tally.results) == 1
+    assert tally.results[0]['result'] == 6.0E-04
+    assert tally.results[0]['variance'] == 0.015
+    assert bins.axes == ('energy',)
+    assert list(bins.edges['energy']) == [0.1, 1.0, 20.0]
+    assert list(bins.values) == [1.0E-04, 2.0E-04, 3.0E-04]
+    assert list(bins.errors) == [0.01, 0.02, 0.03]
+    assert bins.total == 6.0E-04
+
+
+def test_f4_tally_get_results_without_bins(f4_tally_data):
+    # act
+    tally = tallies.F4Tally(f4_tally_data)
+    # assert
+    assert tally.results[0]['bins'] is None
+
+
+def test_f4_tally_get_results_energy_and_time_bins(f4_tally_data):
+    # arrange
+    tally_data = list(f4_tally_data)
+    tally_data[10:11] = [
+        "      time:        1.0000E+02              1.0000E+03      ",
+        "      energy   ",
+        "    1.0000E+00   1.00000E-04 0.0100   2.00000E-04 0.0200",
+        "    2.0000E+01   3.00000E-04 0.0300   4.00000E-04 0.0400",
+        "      total      4.00000E-04 0.0250   6.00000E-04 0.0300",
+        "",
+        "      time:        1.0000E+37                 total",
+        "      energy   ",
+        "    1.0000E+00   5.00000E-04 0.0500   8.00000E-04 0.0350",
+        "    2.0000E+01   6.00000E-04 0.0600   1.30000E-03 0.0450",
+        "      total      1.10000E-03 0.0550   2.10000E-03 0.0400",
+    ]
+    # act
+    tally = tallies.F4Tally(tally_data)
+    # assert
+    bins = tally.results[0]['bins']
+    assert tally.results[0]['result'] == 2.1E-03
+    assert tally.results[0]['variance'] == 0.04
+    assert bins.axes == ('energy', 'time')
+    assert list(bins.edges['time']) == [1.0E+02, 1.0E+03, 1.0E+37]
+    assert bins.values.shape == (2, 3)
+    assert list(bins.values[1]) == [3.0E-04, 4.0E-04, 6.0E-04]
+    assert list(bins.errors[:, 2]) == [0.05, 0.06]
+
+
+def test_f2_tally_get_results_angle_bins(f2_tally_data):
+    # arrange
+    tally_data = list(f2_tally_data)
+    tally_data[10:11] = [
+        " angle  bin:  -1.         to  0.00000E+00 mu",
+        "                 1.00000E-04 0.0300",
+        " angle  bin:   0.00000E+00 to  1.00000E+00 mu",
+        "                 3.00000E-04 0.0100",
+    ]
+    # act
+    tally = tallies.F2Tally(tally_data)
     # assert
-    assert F6_object.results['3']['result'] == 2.45307E-05 * 2
+    bins = tally.results[0]['bins']
+    assert bins.axes == ('cosine',)
+    assert list(bins.edges['cosine']) == [0.0, 1.0]
+    assert list(bins.values) == [1.0E-04, 3.0E-04]
+    assert tally.results[0]['result'] == pytest.approx(4.0E-04)
+    assert tally.results[0]['variance'] == pytest.approx(0.0106066, rel=1e-4)
+
+
+def test_f4_tally_get_results_multiplier_bins(f4_tally_data):
+    # arrange
+    tally_data = list(f4_tally_data)
+    tally_data[10:11] = [
+        " multiplier bin:   1.00000E+00      1   -6                                  ",
+        "                 2.00000E-04 0.0300",
+        " multiplier bin:   1.00000E+00      1   -2                                  ",
+        "                 5.00000E-05 0.0100",
+    ]
+    # act
+    tally = tallies.F4Tally(tally_data)
+    # assert
+    bins = tally.results[0]['bins']
+    assert bins.axes == ('multiplier',)
+    assert list(bins.edges['multiplier']) == ['1.00000E+00 1 -6', '1.00000E+00 1 -2']
+    assert list(bins.values) == [2.0E-04, 5.0E-05]
+    # the multiplier bins are different responses, so the first is the result of the region
+    assert tally.results[0]['result'] == 2.0E-04
+    assert tally.results[0]['variance'] == 0.03
+
+
+def test_f4_tally_get_results_user_and_energy_bins(f4_tally_data):
+    # arrange
+    tally_data = list(f4_tally_data)
+    tally_data[10:11] = [
+        " user bin   1",
+        "      energy   ",
+        "    1.0000E+00   1.00000E-04 0.0100",
+        "    2.0000E+01   3.00000E-04 0.0300",
+        "      total      4.00000E-04 0.0250",
+        " user bin   2",
+        "      energy   ",
+        "    1.0000E+00   2.00000E-04 0.0200",
+        "    2.0000E+01   4.00000E-04 0.0400",
+        "      total      6.00000E-04 0.0300",
+        " user bin   total",
+        "      energy   ",
+        "    1.0000E+00   3.00000E-04 0.0150",
+        "    2.0000E+01   7.00000E-04 0.0250",
+        "      total      1.00000E-03 0.0200",
+    ]
+    # act
+    tally = tallies.F4Tally(tally_data)
+    # assert
+    bins = tally.results[0]['bins']
+    assert bins.axes == ('user', 'energy')
+    assert list(bins.edges['user']) == ['1', '2']
+    assert bins.shape == (2, 2)
+    assert list(bins.values[1]) == [2.0E-04, 4.0E-04]
+    assert list(bins.errors[:, 1]) == [0.03, 0.04]
+    assert tally.results[0]['result'] == 1.0E-03
+    assert tally.results[0]['variance'] == 0.02
+
+
+def test_f2_tally_get_results_segment_and_angle_bins(f2_tally_data):
+    # arrange
+    tally_data = list(f2_tally_data)
+    tally_data[10:11] = [
+        " segment:  -5",
+        " angle  bin:  -1.         to  0.00000E+00 mu",
+        "                 1.00000E-04 0.0300",
+        " angle  bin:   0.00000E+00 to  1.00000E+00 mu",
+        "                 3.00000E-04 0.0100",
+        "      total      4.00000E-04 0.0100",
+        " segment:   5",
+        " angle  bin:  -1.         to  0.00000E+00 mu",
+        "                 2.00000E-04 0.0200",
+        " angle  bin:   0.00000E+00 to  1.00000E+00 mu",
+        "                 0.00000E+00 0.0000",
+        "      total      2.00000E-04 0.0200",
+    ]
+    # act
+    tally = tallies.F2Tally(tally_data)
+    # assert
+    bins = tally.results[0]['bins']
+    assert bins.axes == ('segment', 'cosine')
+    assert list(bins.edges['segment']) == ['-5', '5']
+    assert list(bins.edges['cosine']) == [0.0, 1.0]
+    assert bins.values.tolist() == [[1.0E-04, 3.0E-04], [2.0E-04, 0.0]]
+    assert tally.results[0]['result'] == pytest.approx(6.0E-04)
+    assert tally.results[0]['variance'] == pytest.approx(np.hypot(4.0E-06, 4.0E-06) / 6.0E-04)
+
+
+def test_tally_bins_take_sum_and_along():
+    # arrange
+    bins = tallies.TallyBins(
+        axes=('multiplier', 'cosine', 'energy'),
+        edges={'multiplier': np.array(['a', 'b']), 'cosine': np.array([0.0, 1.0]), 'energy': np.array([1.0, 20.0])},
+        values=np.array([[[1.0, 2.0], [3.0, 4.0]], [[10.0, 20.0], [30.0, 40.0]]]),
+        errors=np.full((2, 2, 2), 0.1),
+        total=10.0,
+        total_error=0.05,
+    )
+    # act
+    second = bins.take('multiplier', 1)
+    summed = second.sum('cosine')
+    by_energy = bins.along('energy')
+    # assert
+    assert second.axes == ('cosine', 'energy')
+    assert second.values.tolist() == [[10.0, 20.0], [30.0, 40.0]]
+    assert summed.axes == ('energy',)
+    assert summed.values.tolist() == [40.0, 60.0]
+    assert summed.errors[0] == pytest.approx(np.hypot(1.0, 3.0) / 40.0)
+    # the multiplier bins are not added up; the first is used
+    assert by_energy.values.tolist() == [4.0, 6.0]
+    assert list(by_energy.edges) == ['energy']
+    assert by_energy.total == 10.0
+
+
+def test_tally_bins_rows():
+    # arrange
+    bins = tallies.TallyBins(
+        axes=('multiplier', 'energy'),
+        edges={'multiplier': np.array(['a', 'b']), 'energy': np.array([1.0, 20.0])},
+        values=np.array([[1.0, 2.0], [3.0, 4.0]]),
+        errors=np.full((2, 2), 0.1),
+        total=10.0,
+        total_error=0.05,
+    )
+    # act
+    rows = bins.rows()
+    first_rows = bins.rows(3)
+    # assert
+    assert bins.size == 4
+    assert rows[3] == (('b', 20.0), 4.0, 0.1)
+    assert first_rows == rows[:3]
+
 
+def test_f4_tally_scaled_energy_bins(f4_energy_bins_data):
+    # arrange
+    F4_object = tallies.F4Tally(f4_energy_bins_data)
+    # act
+    scaled = F4_object.scaled(scaling_factor=2)
+    # assert
+    assert list(scaled.results[0]['bins'].values) == [2.0E-04, 4.0E-04, 6.0E-04]
+    assert scaled.results[0]['bins'].total == 1.2E-03
+    assert list(F4_object.results[0]['bins'].values) == [1.0E-04, 2.0E-04, 3.0E-04]
+
+
+def test_create_tally_uses_registered_class(f2_tally_data, f4_tally_data, f6_tally_data):
+    # act
+    f2 = tallies.create_tally(f2_tally_data)
+    f4 = tallies.create_tally(f4_tally_data)
+    f6 = tallies.create_tally(f6_tally_data)
+    # assert
+    assert type(f2) == tallies.F2Tally
+    assert type(f4) == tallies.F4Tally
+    assert type(f6) == tallies.F6Tally
+
+
+def test_create_f1_tally(f2_tally_data):
+    # arrange
+    tally_data = list(f2_tally_data)
+    tally_data[1] = "           tally type 1    number of particles crossing a surface.                             "
+    # act
+    tally = tallies.create_tally(tally_data)
+    # assert
+    assert type(tally) == tallies.F1Tally
+    assert tally.f_type == "F1"
+    assert tally.results[0]['result'] == 1.11143E-03
+
+
+def test_create_f7_tally(f6_tally_data):
+    # arrange
+    tally_data = list(f6_tally_data)
+    tally_data[1] = "           tally type 7    track length estimate of fission energy deposition.   units   mev/gram"
+    # act
+    tally = tallies.create_tally(tally_data)
+    # assert
+    assert type(tally) == tallies.F7Tally
+    assert tally.f_type == "F7"
+    assert tally.results['3']['result'] == 2.45307E-05
+
+
+def test_create_f8_tally_with_energy_bins(f4_energy_bins_data):
+    # arrange
+    tally_data = list(f4_energy_bins_data)
+    tally_data[1] = "           tally type 8    pulse height distribution.             units   number          "
+    # act
+    tally = tallies.create_tally(tally_data)
+    # assert
+    assert type(tally) == tallies.F8Tally
+    assert tally.f_type == "F8"
+    assert tally.results[0]['result'] == 6.0E-04
+    assert len(tally.results[0]['bins'].values) == 3
+
+
+def test_create_tally_keeps_unknown_type_raw(f4_tally_data):
+    # arrange
+    tally_data = list(f4_tally_data)
+    tally_data[1] = "           tally type 9    a tally type eddy does not know.                             "
+    # act
+    tally = tallies.create_tally(tally_data)
+    # assert
+    assert type(tally) == tallies.RawTally
+    assert tally.tally_number == "4"
+    assert tally.f_type == "F9"
+    assert "type 9" in tally.reason
+    assert "1.10032E-03 0.0001" in tally.text
+    assert tally.scaled(2) is tally
+
+
+def test_group_tallies(f2_tally_data, f6_tally_data, f6_plus_tally_data):
+    # arrange
+    unknown_data = list(f2_tally_data)
+    unknown_data[1] = "           tally type 9    a tally type eddy does not know.                             "
+    tally_list = [tallies.create_tally(data) for data in (f2_tally_data, f6_tally_data, f6_plus_tally_data,
+                                                          unknown_data)]
+    # act
+    groups = tallies.group_tallies(tally_list)
+    # assert
+    assert list(groups) == ['F1', 'F2', 'F4', 'F5', 'F6', 'F7', 'F8']
+    assert groups['F2'][tally_list[0].particles] == [tally_list[0]]
+    assert groups['F6'][tally_list[1].particles] == [tally_list[1]]
+    assert groups['F6']['Collision Heating'] == [tally_list[2]]
+    assert groups['F4'] == {'neutrons': [], 'photons': [], 'electrons': []}
+
+
+def test_create_tally_keeps_unreadable_tally_raw(f4_tally_data):
+    # arrange
+    tally_data = list(f4_tally_data)
+    tally_data[10] = "                 not a number"
+    # act
+    tally = tallies.create_tally(tally_data)
+    # assert
+    assert type(tally) == tallies.RawTally
+    assert "ValueError" in tally.reason
+
+
+def test_register_tally_type(mocker, f4_tally_data):
+    # arrange
+    mocker.patch.dict(tallies.TALLY_TYPES)
+    mocker.patch.dict(tallies.TALLY_GROUPS)
+    mocker.patch.dict(tallies.GROUP_PARTICLES)
+    tally_data = list(f4_tally_data)
+    tally_data[1] = "           tally type 9    a new kind of tally.                             "
+    # act
+    tallies.register_tally_type('9', tallies.F4Tally, 'F9')
+    tally = tallies.create_tally(tally_data)
+    # assert
+    assert type(tally) == tallies.F4Tally
+    assert tally.f_type == "F9"
+    assert tallies.group_tallies([tally])['F9'][tally.particles] == [tally]
+
+
+def test_tally_releases_data(f4_tally_data):
+    # act
+    tally = tallies.F4Tally(f4_tally_data)
+    # assert
+    assert tally.data is None
+    assert tally.dose_functions is not None
+    assert tally.passes == 10
+
+
+def test_tally_results_rows():
+    # arrange
+    results = tallies.TallyResults('region', ['Cell 3', 'Cell 4'], [1.0, 2.0], [0.1, 0.2],
+                                   columns={'mass': [5.0, 6.0]}, keys=['3', '4'])
+    # act
+    rows = list(results)
+    # assert
+    assert len(results) == 2
+    assert rows[1]['region'] == 'Cell 4'
+    assert rows[1]['result'] == 2.0
+    assert rows[1]['variance'] == 0.2
+    assert rows[1]['mass'] == 6.0
+    assert rows[1]['bins'] is None
+    assert results['4'] == rows[1]
+    assert results[-1] == {'region': 'Cell 4', 'mass': 6.0, 'result': 2.0, 'variance': 0.2, 'bins': None}
+    assert [key for key, row in results.items()] == ['3', '4']
+
+
+def test_tally_results_missing_region():
+    # arrange
+    results = tallies.TallyResults('region', ['Cell 3'], [1.0], [0.1], keys=['3'])
+    # act, assert
+    with pytest.raises(KeyError):
+        results['5']
+    with pytest.raises(IndexError):
+        results[1]
+    with pytest.raises(KeyError):
+        results[0]['mass']
+
+
+def test_tally_results_scaled():
+    # arrange
+    results = tallies.TallyResults('surface', ['Surface 1'], [1.0], [0.1], columns={'area': [3.0]})
+    # act
+    scaled = results.scaled(4)
+    # assert
+    assert scaled[0]['result'] == 4.0
+    assert scaled[0]['variance'] == 0.1
+    assert scaled.labels is results.labels
+    assert scaled.columns['area'] is results.columns['area']
+    assert results[0]['result'] == 1.0
+
+
+def test_f4_tally_get_results_lattice_labels(f4_tally_data):
+    # arrange
+    tally_data = list(f4_tally_data)
+    tally_data[9:11] = [
+        " cell (1<5[0 0 0]<3)",
+        "                 1.00000E-03 0.0100",
+        " cell (2<5[0 0 0]<3)",
+        "                 3.00000E-03 0.0200",
+        " cell (1<5[1 0 0]",
+        "       <3)",
+        "                 2.00000E-03 0.0300",
+    ]
+    # act
+    tally = tallies.F4Tally(tally_data)
+    # assert
+    assert len(tally.results) == 3
+    assert tally.results[2]['region'] == 'Cell (1<5[1 0 0] <3)'
+    assert tally.results[2]['result'] == 2.0E-03
+    assert tally.results.index[2].lattice == (1, 0, 0)
+    elements = tally.results.lattice_elements()
+    assert [(group.label, group.regions, group.peak) for group in elements] == \
+           [('5[0 0 0]<3', 2, 3.0E-03), ('5[1 0 0]<3', 1, 2.0E-03)]
+    assert tally.scaled(2).results.lattice_elements()[0].peak == 6.0E-03
+
+
+def test_f4_tally_without_lattice_labels_has_no_index(f4_tally_data):
+    # act
+    tally = tallies.F4Tally(f4_tally_data)
+    # assert
+    assert tally.results.index is None
+    assert len(list(tally.results.table_rows(0))) == 1
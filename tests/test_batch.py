@@ -0,0 +1,96 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import os
+import multiprocessing
+import shutil
+import pytest
+from eddymc import batch
+
+
+@pytest.fixture
+def outputs(tmpdir):
+    # a small campaign: two outputs in the top directory, one in a subdirectory, and a file that is not an output
+    shutil.copy('mcnp_examples/F2.out', str(tmpdir.join('F2.out')))
+    shutil.copy('scale_examples/cylinder_ce.out', str(tmpdir.join('cylinder_ce.out')))
+    tmpdir.mkdir('run_2')
+    shutil.copy('mcnp_examples/F4.out', str(tmpdir.join('run_2', 'F4.out')))
+    shutil.copy('mcnp_examples/not_an_mcnp_file.out', str(tmpdir.join('run_2', 'text.out')))
+    tmpdir.join('run_2', 'notes.txt').write('not converted')
+    return tmpdir
+
+
+def test_expand_inputs_glob_and_directory(outputs):
+    # arrange
+    pattern = str(outputs.join('*.out'))
+    directory = str(outputs.join('run_2'))
+    # act
+    files, unmatched = batch.expand_inputs([pattern, directory, pattern])
+    # assert
+    assert files == [
+        str(outputs.join('F2.out')),
+        str(outputs.join('cylinder_ce.out')),
+        str(outputs.join('run_2', 'F4.out')),
+        str(outputs.join('run_2', 'text.out')),
+    ]
+    assert unmatched == []
+
+
+def test_expand_inputs_list_file(outputs):
+    # arrange
+    list_file = outputs.join('campaign.txt')
+    list_file.write(f"# the F2 case\n{outputs.join('F2.out')}\n\n{outputs.join('missing_*.out')}\n")
+    # act
+    files, unmatched = batch.expand_inputs(['@' + str(list_file)])
+    # assert
+    assert files == [str(outputs.join('F2.out'))]
+    assert [result.filename for result in unmatched] == [str(outputs.join('missing_*.out'))]
+    assert unmatched[0].success is False
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_convert_all(outputs, workers):
+    # arrange
+    files, unmatched = batch.expand_inputs([str(outputs)])
+    # act
+    results = batch.convert_all(files, [1.0], workers=workers)
+    # assert
+    assert [result.filename for result in results] == files
+    assert [result.success for result in results] == [True, True, True, False]
+    assert 'NotAcceptedFileTypeError' in results[3].message
+    assert outputs.join('F2.html').check()
+    assert outputs.join('run_2', 'F4.html').check()
+
+
+def test_convert_all_spawned_workers(outputs):
+    # arrange
+    files = [str(outputs.join('F2.out')), str(outputs.join('run_2', 'F4.out'))]
+    # act
+    results = batch.convert_all(files, [1.0], workers=2, mp_context=multiprocessing.get_context('spawn'))
+    # assert
+    assert [result.success for result in results] == [True, True]
+    assert outputs.join('F2.html').check()
+    assert outputs.join('run_2', 'F4.html').check()
+
+
+def test_convert_file_with_cache(outputs):
+    # arrange
+    cache_directory = str(outputs.join('cache'))
+    # act
+    result = batch.convert_file(str(outputs.join('F2.out')), [1.0, 2.0], cache_directory)
+    # assert
+    assert result.success
+    assert sorted(os.listdir(cache_directory))[0].endswith('.pickle')
+    assert len(os.listdir(cache_directory)) == 2     # the case and its summary
+    assert outputs.join('F2_sf2.html').check()
+
+
+def test_print_summary(capsys):
+    # arrange
+    results = [batch.Result('a.out', True, ''), batch.Result('b.out', False, 'Exception: bad')]
+    # act
+    failures = batch.print_summary(results)
+    # assert
+    assert failures == 1
+    assert "FAILED  b.out: Exception: bad" in capsys.readouterr().out
@@ -0,0 +1,53 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import shutil
+import pytest
+from eddymc import cli
+
+
+@pytest.fixture
+def outputs(tmpdir):
+    shutil.copy('mcnp_examples/F2.out', str(tmpdir.join('F2.out')))
+    shutil.copy('mcnp_examples/F4.out', str(tmpdir.join('F4.out')))
+    shutil.copy('mcnp_examples/not_an_mcnp_file.out', str(tmpdir.join('text.out')))
+    return tmpdir
+
+
+def test_main_converts_many_files(outputs, capsys):
+    # act
+    exit_code = cli.main([str(outputs.join('F2.out')), str(outputs.join('F4.out')), '-j', '2', '--no-cache'])
+    # assert
+    assert exit_code == 0
+    assert outputs.join('F2.html').check()
+    assert outputs.join('F4.html').check()
+    assert '2 converted, 0 failed.' in capsys.readouterr().out
+
+
+def test_main_reports_failures(outputs, capsys):
+    # act
+    exit_code = cli.main([str(outputs.join('*.out')), '-j', '1', '--no-cache'])
+    # assert
+    assert exit_code == 1
+    assert '2 converted, 1 failed.' in capsys.readouterr().out
+
+
+def test_main_diff(outputs):
+    # act
+    exit_code = cli.main(['diff', str(outputs.join('F2.out')), str(outputs.join('F2.out')), '--no-cache'])
+    # assert
+    assert exit_code == 0
+    assert outputs.join('F2_vs_F2.html').check()
+
+
+def test_main_libraries_reports_failures(outputs, capsys):
+    # act
+    exit_code = cli.main(['libraries', str(outputs.join('F2.out')), str(outputs.join('text.out')),
+                          str(outputs.join('missing_*.out')), '--cache-dir', str(outputs.join('cache'))])
+    # assert
+    printed = capsys.readouterr().out
+    assert exit_code == 1
+    assert 'F2.out: endf71x (17 tables), mcplib84 (5 tables), el03 (5 tables)' in printed
+    assert 'No output files match this argument' in printed
+    assert '1 listed, 2 failed.' in printed
@@ -0,0 +1,155 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import json
+import numpy as np
+import pytest
+from eddymc import diff, eddy
+
+
+@pytest.fixture
+def table_a():
+    return diff.ResultTable(
+        sections=np.array(['tally 4', 'tally 4', 'tally 14', 'cells']),
+        keys=np.array(['tally 4 / Cell 3', 'tally 4 / Cell 4', 'tally 14 / Cell 3', 'cells / cell 3 mass']),
+        values=np.array([1.0, 2.0, 5.0, 10.0]),
+        errors=np.array([0.01, 0.01, 0.1, 0.0]),
+    )
+
+
+@pytest.fixture
+def table_b():
+    return diff.ResultTable(
+        sections=np.array(['cells', 'tally 4', 'tally 4', 'tally 34']),
+        keys=np.array(['cells / cell 3 mass', 'tally 4 / Cell 4', 'tally 4 / Cell 3', 'tally 34 / Cell 3']),
+        values=np.array([12.0, 2.01, 1.1, 7.0]),
+        errors=np.array([0.0, 0.01, 0.01, 0.1]),
+    )
+
+
+def test_get_deviations():
+    # arrange
+    value_a = np.array([1.0, 1.0, 0.0, 3.0, 0.0])
+    error_a = np.array([0.03, 0.0, 0.0, 0.0, 0.0])
+    value_b = np.array([1.1, 2.0, 0.0, 3.0, 1.0])
+    error_b = np.array([0.04, 0.0, 0.0, 0.0, 0.0])
+    # act
+    ratios, deviations = diff.get_deviations(value_a, error_a, value_b, error_b)
+    # assert
+    assert ratios[0] == pytest.approx(1.1)
+    assert deviations[0] == pytest.approx(0.1 / np.hypot(0.03, 0.044))
+    assert deviations[1] == np.inf
+    assert ratios[2] == 1.0 and deviations[2] == 0.0
+    assert deviations[3] == 0.0
+    assert np.isnan(ratios[4])
+
+
+def test_compare(table_a, table_b):
+    # act
+    case_diff = diff.compare(table_a, table_b, 'a.out', 'b.out')
+    # assert
+    assert list(case_diff.keys) == ['tally 4 / Cell 3', 'tally 4 / Cell 4', 'cells / cell 3 mass']
+    assert list(case_diff.value_b) == [1.1, 2.01, 12.0]
+    assert case_diff.only_a == ['tally 14 / Cell 3']
+    assert case_diff.only_b == ['tally 34 / Cell 3']
+    assert list(case_diff.significant) == [True, False, True]
+
+
+def test_summary(table_a, table_b):
+    # arrange
+    case_diff = diff.compare(table_a, table_b)
+    # act
+    summary = case_diff.summary()
+    # assert
+    assert [section.section for section in summary] == ['tally 4', 'cells']
+    assert summary[0].compared == 2
+    assert summary[0].significant == 1
+    assert summary[0].largest == pytest.approx(0.1 / np.hypot(0.01, 0.011))
+    assert summary[1].largest == np.inf
+
+
+def test_changes_largest_first(table_a, table_b):
+    # arrange
+    case_diff = diff.compare(table_a, table_b)
+    # act
+    changes = case_diff.changes()
+    # assert
+    assert [change['key'] for change in changes] == ['cells / cell 3 mass', 'tally 4 / Cell 3']
+    assert case_diff.changes(limit=1)[0]['ratio'] == pytest.approx(1.2)
+
+
+def test_unique_keys():
+    # act
+    keys = diff.unique_keys(['tally 5 / a', 'tally 5 / b', 'tally 5 / a'])
+    # assert
+    assert list(keys) == ['tally 5 / a', 'tally 5 / b', 'tally 5 / a #2']
+
+
+def test_get_result_table():
+    # arrange
+    case = eddy.load_case('mcnp_examples/F4.out')
+    # act
+    table = diff.get_result_table(case)
+    # assert
+    assert list(table.keys[:4]) == ['tally 4 / Cell 3', 'tally 14 / Cell 3', 'tally 24 / Cell 3', 'tally 24 / Cell 4']
+    assert table.values[0] == 1.10032E-03
+    assert table.errors[0] == 0.0001
+    assert 'cells / cell 3 mass' in table.keys
+
+
+def test_get_result_table_k_effective():
+    # arrange
+    case = eddy.load_case('mcnp_examples/Criticality.out')
+    # act
+    table = diff.get_result_table(case)
+    # assert
+    assert list(table.keys[:3]) == ['k-effective / first half', 'k-effective / second half', 'k-effective / final']
+    assert set(table.sections[:3]) == {'k-effective'}
+
+
+def test_diff_files_same_output():
+    # act
+    case_diff = diff.diff_files('mcnp_examples/F4.out', 'mcnp_examples/F4.out')
+    # assert
+    assert len(case_diff) == 14
+    assert not case_diff.significant.any()
+    assert case_diff.only_a == case_diff.only_b == []
+
+
+def test_diff_files_different_codes():
+    # act, assert
+    with pytest.raises(Exception, match='different codes'):
+        diff.diff_files('mcnp_examples/F4.out', 'scale_examples/cylinder_ce.out')
+
+
+def test_get_html(table_a, table_b):
+    # arrange
+    case_diff = diff.compare(table_a, table_b, 'a.out', 'b.out')
+    # act
+    html = diff.get_html(case_diff)
+    # assert
+    assert 'a.out vs b.out' in html
+    assert 'tally 4 / Cell 3' in html
+    assert 'Only in b.out (1)' in html
+
+
+def test_write_json(table_a, table_b, tmpdir):
+    # arrange
+    case_diff = diff.compare(table_a, table_b, 'a.out', 'b.out')
+    filename = str(tmpdir.join('diff.json'))
+    # act
+    diff.write_json(case_diff, filename)
+    # assert
+    with open(filename) as file:
+        written = json.load(file)
+    assert written['significant'] == 2
+    assert written['changes'][0]['deviation'] is None
+    assert written['only_in_a'] == ['tally 14 / Cell 3']
+
+
+def test_get_output_filename():
+    # act
+    filename = diff.get_output_filename('runs/case.out', 'runs/case2.out.gz')
+    # assert
+    assert filename == 'runs/case_vs_case2.html'
@@ -3,9 +3,13 @@
 or add a configuration in pycharm
 """
 
+import gzip
+import datetime
+import pickle
 import pytest
 from argparse import Namespace
 from eddymc import eddy
+from eddymc.parse_cache import ParseCache
 from tests import mcnp_examples, scale_examples
 try:
     import importlib.resources as pkg_resources
@@ -13,6 +17,14 @@ except ImportError:
     import importlib_resources as pkg_resources
 
 
+@pytest.fixture
+def fixed_time(mocker):
+    # the html records when it was written, so the clock is stopped to compare two runs
+    for code in ('mcnp', 'scale'):
+        mocked_datetime = mocker.patch(f'eddymc.{code}.{code}_html_writer.datetime')
+        mocked_datetime.datetime.now.return_value = datetime.datetime(2021, 1, 1, 12, 0, 0)
+
+
 @pytest.fixture()
 def mock_tk(tmpdir):
     class MockTk:
@@ -78,27 +90,10 @@ def test_read_file():
     # act
     data = eddy.read_file(file)
     # assert
-    assert data[0].strip() == "Code Name &amp; Version = MCNP_6.20, 6.2.0"
+    assert data[0].strip() == "Code Name & Version = MCNP_6.20, 6.2.0"
     assert len(data) == 884
 
 
-def test_sanitize_list():
-    # arrange
-    test_text = [
-        "This is ordinary text",
-        "This has a <h1> </h1> symbol in it",
-        "This has a \" symbol in it",
-        "This has a & in it.",
-        ]
-    # act
-    sanitized_text = eddy.sanitize_list(test_text)
-    # assert
-    assert sanitized_text[0] == "This is ordinary text"
-    assert sanitized_text[1] == "This has a &lt;h1&gt; &lt;/h1&gt; symbol in it"
-    assert sanitized_text[2] == "This has a &#34; symbol in it"
-    assert sanitized_text[3] == "This has a &amp; in it."
-
-
 def test_get_filename_with_passed_name():
     # arrange
     file = 'mcnp_examples/F2.out'
@@ -223,7 +218,6 @@ def test_main_calls_eddy_mcnp_case(mocker, f2_file):
     # arrange
     name = 'mcnp_examples/F2.out'
     data = f2_file
-    data = eddy.sanitize_list(data)  # not ideal re-using this in test
     sf = 3.141592
     crit = False
     mocker.patch('eddymc.eddy.get_args', return_value=(name, data, sf, crit,))
@@ -243,7 +237,6 @@ def test_main_calls_html_writer(mocker, f2_file):
     name = 'mcnp_examples/F2.out'
     sf = 1234
     data = f2_file
-    data = eddy.sanitize_list(data)  # not ideal re-using this in test
     crit = False
     mocker.patch('eddymc.eddy.get_args', return_value=(name, data, sf, crit,))
     mocked_html_writer = mocker.patch('eddymc.mcnp.mcnp_html_writer.get_html', return_value=None)
@@ -287,6 +280,159 @@ def test_main_with_non_mc_input(mocker, text_file):
     assert expected_failure
 
 
+def test_main_rejects_file_before_reading_it(mocker):
+    # arrange
+    name = 'mcnp_examples/not_an_mcnp_file.out'
+    mocked_get_args = mocker.patch('eddymc.eddy.get_args')
+    # act
+    with pytest.raises(eddy.NotAcceptedFileTypeError):
+        eddy.main(name, 1)
+    # assert
+    mocked_get_args.assert_not_called()
+
+
+@pytest.mark.parametrize('name, code', [
+    ('mcnp_examples/F2.out', 'MCNP'),
+    ('mcnp_examples/Criticality.out', 'MCNP'),
+    ('scale_examples/cylinder_ce.out', 'SCALE'),
+])
+def test_detect_output_type(name, code):
+    # arrange
+    # act
+    output_type = eddy.detect_output_type(name)
+    # assert
+    assert output_type.name == code
+
+
+@pytest.mark.parametrize('name', ['mcnp_examples/F4.mcnp', 'mcnp_examples/not_an_mcnp_file.out'])
+def test_detect_output_type_not_recognised(name):
+    # arrange
+    # act
+    output_type = eddy.detect_output_type(name)
+    # assert
+    assert output_type is None
+
+
+def test_detect_output_type_of_compressed_file(tmpdir):
+    # arrange
+    file = tmpdir.join('cylinder_ce.out.gz')
+    with open('scale_examples/cylinder_ce.out', 'rb') as scale:
+        file.write_binary(gzip.compress(scale.read()))
+    # act
+    output_type = eddy.detect_output_type(str(file))
+    # assert
+    assert output_type.name == 'SCALE'
+
+
+def test_register_output_type(mocker, tmpdir):
+    # arrange
+    mocker.patch('eddymc.eddy.OUTPUT_TYPES', list(eddy.OUTPUT_TYPES))
+    file = tmpdir.join('other.out')
+    file.write('OTHER CODE version 1\n')
+    # act
+    eddy.register_output_type('OTHER', lambda head: head[0].startswith('OTHER CODE'), None, None)
+    output_type = eddy.detect_output_type(str(file))
+    # assert
+    assert output_type.name == 'OTHER'
+    assert 'OTHER' not in [registered.name for registered in eddy.OUTPUT_TYPES[:-1]]
+
+
+def test_main_with_compressed_input(tmpdir):
+    # arrange
+    file = tmpdir.join('F2.out.gz')
+    with open('mcnp_examples/F2.out', 'rb') as f2:
+        file.write_binary(gzip.compress(f2.read()))
+    # act
+    eddy.main(str(file), scaling_factor=1)
+    # assert
+    assert tmpdir.join('F2.html').check()
+
+
+@pytest.mark.parametrize('name', ['mcnp_examples/F2.out', 'scale_examples/cylinder_ce.out'])
+def test_main_with_cache(mocker, tmpdir, fixed_time, name):
+    # arrange
+    cache = ParseCache('1.0', directory=str(tmpdir.join('cache')))
+    mocked_write_output = mocker.patch('eddymc.eddy.write_output')
+    eddy.main(name, scaling_factor=3, cache=None)
+    uncached_html = mocked_write_output.call_args[0][1]
+    eddy.main(name, scaling_factor=2, cache=cache)
+    spied_get_args = mocker.spy(eddy, 'get_args')
+    # act
+    eddy.main(name, scaling_factor=3, cache=cache)
+    # assert
+    spied_get_args.assert_not_called()
+    assert mocked_write_output.call_args[0][1] == uncached_html
+
+
+def test_main_with_cache_entry_that_fails_to_render(mocker, tmpdir, fixed_time):
+    # arrange
+    cache = ParseCache('1.0', directory=str(tmpdir.join('cache')))
+    mocked_write_output = mocker.patch('eddymc.eddy.write_output')
+    eddy.main('mcnp_examples/F2.out', scaling_factor=1, cache=cache)
+    html = mocked_write_output.call_args[0][1]
+    # an entry cached by an older Eddy may be missing attributes the template needs
+    key = cache.get_key('mcnp_examples/F2.out')
+    stale_case = cache.load(key)
+    del stale_case.cross_sections
+    with open(cache.get_path(key), 'wb') as entry:
+        pickle.dump(stale_case, entry)
+    # act
+    eddy.main('mcnp_examples/F2.out', scaling_factor=1, cache=cache)
+    # assert
+    assert mocked_write_output.call_args[0][1] == html
+    assert hasattr(cache.load(key), 'cross_sections')
+
+
+def test_main_with_several_scaling_factors(mocker, tmpdir, fixed_time):
+    # arrange
+    file = tmpdir.join('F2.out')
+    with open('mcnp_examples/F2.out', 'rb') as f2:
+        file.write_binary(f2.read())
+    spied_init = mocker.spy(eddy.EddyMCNPCase, '__init__')
+    # act
+    eddy.main(str(file), scaling_factor=[2, 0.5])
+    # assert
+    assert spied_init.call_count == 1
+    assert tmpdir.join('F2_sf2.html').check()
+    eddy.main(str(file), scaling_factor=0.5)
+    assert tmpdir.join('F2_sf0.5.html').read() == tmpdir.join('F2.html').read()
+
+
+def test_follow_matches_main(mocker, tmpdir, fixed_time):
+    # arrange
+    with open('mcnp_examples/F2.out', 'r') as f2:
+        text = f2.read()
+    followed = tmpdir.join('followed.out')
+    finished = tmpdir.join('finished.out')
+    finished.write(text)
+    pieces = [text[:len(text) * n // 10] for n in range(1, 11)]
+    followed.write(pieces.pop(0))
+
+    def write_more(interval):
+        if pieces:
+            followed.write(pieces.pop(0))
+    mocker.patch('eddymc.eddy.time.sleep', side_effect=write_more)
+    # act
+    eddy.follow(str(followed), scaling_factor=2, interval=0)
+    eddy.main(str(finished), scaling_factor=2)
+    # assert
+    assert not pieces
+    followed_html = tmpdir.join('followed.html').read().replace('followed.out', 'case.out')
+    finished_html = tmpdir.join('finished.html').read().replace('finished.out', 'case.out')
+    assert followed_html == finished_html
+
+
+def test_follow_only_accepts_mcnp(mocker):
+    # arrange
+    name = 'scale_examples/cylinder_ce.out'
+    mocked_sleep = mocker.patch('eddymc.eddy.time.sleep')
+    # act
+    with pytest.raises(eddy.NotAcceptedFileTypeError):
+        eddy.follow(name, scaling_factor=1)
+    # assert
+    mocked_sleep.assert_not_called()
+
+
 def test_main_with_nonexistent_input_passed(mocker):
     # arrange
     name = 'mcnp_examples/nonexistent_file.out'
@@ -301,3 +447,16 @@ def test_main_with_nonexistent_input_passed(mocker):
     # assert
     assert expected_failure
 
+
+def test_load_case_unscaled():
+    # act
+    case = eddy.load_case('mcnp_examples/F4.out')
+    # assert
+    assert case.scaling_factor == 1.0
+    assert case.name == 'F4.out'
+
+
+def test_load_case_not_an_output():
+    # act, assert
+    with pytest.raises(eddy.NotAcceptedFileTypeError):
+        eddy.load_case('mcnp_examples/not_an_mcnp_file.out')
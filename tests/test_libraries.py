@@ -0,0 +1,83 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import pytest
+from eddymc import batch, eddy, libraries
+from eddymc.parse_cache import ParseCache
+from eddymc.mcnp.eddy_mcnp_case import EddyMCNPCase
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return ParseCache('1.0', directory=str(tmpdir.join('cache')))
+
+
+def test_get_libraries_parses_once(cache, mocker):
+    # arrange
+    spy = mocker.spy(EddyMCNPCase, 'read_output')
+    # act
+    first = libraries.get_libraries('mcnp_examples/F2.out', cache)
+    second = libraries.get_libraries('mcnp_examples/F2.out', cache)
+    # assert
+    assert first == second == {'endf71x': 17, 'mcplib84': 5, 'el03': 5}
+    assert spy.call_count == 1
+
+
+def test_find_libraries_in_cache(cache):
+    # arrange
+    for filename in ('mcnp_examples/F2.out', 'mcnp_examples/Criticality.out'):
+        key = cache.get_key(filename)
+        cache.store(key, EddyMCNPCase(filepath=filename, scaling_factor=1, file=eddy.read_file(filename),
+                                      crit_case=filename.endswith('Criticality.out')))
+    # act
+    results, failures = libraries.find_libraries(cache)
+    photon_results, photon_failures = libraries.find_libraries(cache, library='MCPLIB')
+    # assert
+    assert sorted(results) == ['mcnp_examples/Criticality.out', 'mcnp_examples/F2.out']
+    assert results['mcnp_examples/Criticality.out'] == {'endf71x': 3}
+    assert list(photon_results) == ['mcnp_examples/F2.out']
+    assert failures == photon_failures == []
+
+
+def test_find_libraries_does_not_read_unchanged_outputs_again(cache, mocker):
+    # arrange
+    libraries.find_libraries(cache, ['mcnp_examples/F2.out'])
+    spy = mocker.spy(cache, 'get_key')
+    # act
+    results, failures = libraries.find_libraries(cache, ['mcnp_examples/F2.out'])
+    # assert
+    assert results == {'mcnp_examples/F2.out': {'endf71x': 17, 'mcplib84': 5, 'el03': 5}}
+    assert spy.call_count == 0
+
+
+def test_find_libraries_reports_failures(cache):
+    # arrange
+    files = ['mcnp_examples/not_an_mcnp_file.out', 'mcnp_examples/missing.out', 'mcnp_examples/F2.out']
+    # act
+    results, failures = libraries.find_libraries(cache, files)
+    # assert
+    assert list(results) == ['mcnp_examples/F2.out']
+    assert [result.filename for result in failures] == files[:2]
+    assert 'NotAcceptedFileTypeError' in failures[0].message
+    assert 'FileNotFoundError' in failures[1].message
+
+
+def test_format_libraries():
+    # arrange
+    results = {'b.out': {}, 'a.out': {'endf71x': 17, 'mcplib84': 5}}
+    # act
+    lines = libraries.format_libraries(results)
+    # assert
+    assert lines == ['a.out: endf71x (17 tables), mcplib84 (5 tables)', 'b.out: no cross-section tables']
+
+
+def test_format_libraries_with_failures():
+    # arrange
+    results = {'a.out': {'endf71x': 17}}
+    failures = [batch.Result('c*.out', False, 'No output files match this argument')]
+    # act
+    lines = libraries.format_libraries(results, failures)
+    # assert
+    assert lines == ['a.out: endf71x (17 tables)', 'FAILED  c*.out: No output files match this argument',
+                     '\n1 listed, 1 failed.']
@@ -0,0 +1,184 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import bz2
+import gzip
+import lzma
+import mmap
+import pytest
+from eddymc.line_reader import MappedLines, detect_compression, read_compressed, read_head, strip_compression_extension
+
+
+@pytest.fixture
+def f2_lines():
+    with open('mcnp_examples/F2.out', 'r') as file:
+        return file.readlines()
+
+
+def test_mapped_lines_match_readlines(f2_lines):
+    # arrange
+    # act
+    lines = MappedLines('mcnp_examples/F2.out')
+    # assert
+    assert len(lines) == len(f2_lines)
+    assert list(lines) == f2_lines
+    assert lines[0] == f2_lines[0]
+    assert lines[-1] == f2_lines[-1]
+
+
+def test_mapped_lines_slices_are_views(f2_lines):
+    # arrange
+    lines = MappedLines('mcnp_examples/F2.out')
+    # act
+    section = lines[100:200]
+    # assert
+    assert type(section) == MappedLines
+    assert list(section) == f2_lines[100:200]
+    assert list(section[6:-2]) == f2_lines[106:198]
+    assert section[-1] == f2_lines[199]
+    assert list(lines[10:5]) == []
+    assert lines[::100] == f2_lines[::100]
+
+
+def test_mapped_lines_index_error():
+    # arrange
+    lines = MappedLines('mcnp_examples/F2.out')
+    # act, assert
+    with pytest.raises(IndexError):
+        lines[len(lines)]
+
+
+def test_mapped_lines_windows_line_endings(tmpdir):
+    # arrange
+    file = tmpdir.join('crlf.out')
+    file.write_binary(b"first line\r\nsecond line\r\nno newline")
+    # act
+    lines = MappedLines(str(file))
+    # assert
+    assert list(lines) == ["first line\n", "second line\n", "no newline"]
+
+
+def test_mapped_lines_empty_file(tmpdir):
+    # arrange
+    file = tmpdir.join('empty.out')
+    file.write_binary(b"")
+    # act
+    lines = MappedLines(str(file))
+    # assert
+    assert len(lines) == 0
+    assert list(lines) == []
+
+
+def test_mapped_lines_transform(tmpdir):
+    # arrange
+    file = tmpdir.join('transform.out')
+    file.write_binary(b"abc\ndef\n")
+    # act
+    lines = MappedLines(str(file), transform=str.upper)
+    # assert
+    assert list(lines) == ["ABC\n", "DEF\n"]
+    assert lines[1:][0] == "DEF\n"
+
+
+@pytest.mark.parametrize('compress, extension, compression', [
+    (gzip.compress, '.gz', 'gzip'),
+    (bz2.compress, '.bz2', 'bzip2'),
+    (lzma.compress, '.xz', 'xz'),
+])
+def test_mapped_lines_compressed(tmpdir, f2_lines, compress, extension, compression):
+    # arrange
+    file = tmpdir.join('F2.out' + extension)
+    with open('mcnp_examples/F2.out', 'rb') as f2:
+        file.write_binary(compress(f2.read()))
+    # act
+    lines = MappedLines(str(file))
+    # assert
+    assert detect_compression(str(file)) == compression
+    assert list(lines) == f2_lines
+
+
+def test_read_compressed_maps_a_temporary_file(tmpdir):
+    # arrange
+    file = tmpdir.join('case.out.gz')
+    file.write_binary(gzip.compress(b'ABC\nDEF\n'))
+    empty_file = tmpdir.join('empty.out.gz')
+    empty_file.write_binary(gzip.compress(b''))
+    # act
+    buffer = read_compressed(str(file), 'gzip')
+    empty_buffer = read_compressed(str(empty_file), 'gzip')
+    # assert
+    assert isinstance(buffer, mmap.mmap)
+    assert buffer[:] == b'ABC\nDEF\n'
+    assert empty_buffer == b''
+    assert sorted(path.basename for path in tmpdir.listdir()) == ['case.out.gz', 'empty.out.gz']
+
+
+def test_mapped_lines_zstandard(tmpdir, f2_lines):
+    # arrange
+    zstandard = pytest.importorskip('zstandard')
+    file = tmpdir.join('F2.out.zst')
+    with open('mcnp_examples/F2.out', 'rb') as f2:
+        file.write_binary(zstandard.ZstdCompressor().compress(f2.read()))
+    # act
+    lines = MappedLines(str(file))
+    # assert
+    assert detect_compression(str(file)) == 'zstandard'
+    assert list(lines) == f2_lines
+
+
+def test_detect_compression_plain_file():
+    # arrange
+    # act
+    compression = detect_compression('mcnp_examples/F2.out')
+    # assert
+    assert compression is None
+
+
+def test_read_head(tmpdir, f2_lines):
+    # arrange
+    file = tmpdir.join('F2.out.bz2')
+    file.write_binary(bz2.compress(''.join(f2_lines).encode()))
+    # act
+    plain_head = read_head('mcnp_examples/F2.out', size=200)
+    compressed_head = read_head(str(file), size=200)
+    # assert
+    assert plain_head == compressed_head
+    assert plain_head[0] == f2_lines[0]
+    assert sum(len(line) for line in plain_head) == 200
+
+
+def test_mapped_lines_follow_refresh(tmpdir, f2_lines):
+    # arrange
+    file = tmpdir.join('F2.out')
+    text = ''.join(f2_lines)
+    written = len(''.join(f2_lines[:100])) + 10     # stop part of the way through a line
+    file.write(text[:written])
+    lines = MappedLines(str(file), follow=True)
+    # act
+    length_before = len(lines)
+    unchanged = lines.refresh()
+    file.write(text[written:], mode='a')
+    added = lines.refresh()
+    # assert
+    assert length_before == 100     # the unfinished line is left out
+    assert unchanged == 0
+    assert added == len(f2_lines) - 100
+    assert list(lines) == f2_lines
+
+
+def test_mapped_lines_follow_compressed_file(tmpdir, f2_lines):
+    # arrange
+    file = tmpdir.join('F2.out.gz')
+    file.write_binary(gzip.compress(''.join(f2_lines).encode()))
+    # act, assert
+    with pytest.raises(Exception):
+        MappedLines(str(file), follow=True)
+
+
+def test_strip_compression_extension():
+    # arrange
+    # act, assert
+    assert strip_compression_extension('outputs/F2.out.gz') == 'outputs/F2.out'
+    assert strip_compression_extension('outputs/F2.out.ZST') == 'outputs/F2.out'
+    assert strip_compression_extension('outputs/F2.out') == 'outputs/F2.out'
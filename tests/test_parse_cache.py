@@ -0,0 +1,151 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import os
+import datetime
+import pytest
+from eddymc import eddy
+from eddymc import parse_cache
+from eddymc.parse_cache import ParseCache
+from eddymc.mcnp.eddy_mcnp_case import EddyMCNPCase
+from eddymc.mcnp import mcnp_html_writer
+
+
+@pytest.fixture
+def fixed_time(mocker):
+    # the html records when it was written, so the clock is stopped to compare two runs
+    for code in ('mcnp', 'scale'):
+        mocked_datetime = mocker.patch(f'eddymc.{code}.{code}_html_writer.datetime')
+        mocked_datetime.datetime.now.return_value = datetime.datetime(2021, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return ParseCache('1.0', directory=str(tmpdir.join('cache')))
+
+
+@pytest.fixture
+def f2_case():
+    return EddyMCNPCase(
+        filepath='mcnp_examples/F2.out',
+        scaling_factor=1,
+        file=eddy.read_file('mcnp_examples/F2.out'),
+    )
+
+
+def test_get_key_depends_on_contents_and_version(cache, tmpdir):
+    # arrange
+    other_version = ParseCache('2.0', directory=cache.directory)
+    copy = tmpdir.join('copy.out')
+    with open('mcnp_examples/F2.out', 'rb') as f2:
+        copy.write_binary(f2.read())
+    # act
+    key = cache.get_key('mcnp_examples/F2.out')
+    # assert
+    assert cache.get_key(str(copy)) == key
+    assert cache.get_key('mcnp_examples/F4.out') != key
+    assert other_version.get_key('mcnp_examples/F2.out') != key
+
+
+def test_get_key_depends_on_cache_format(cache, mocker):
+    # arrange
+    key = cache.get_key('mcnp_examples/F2.out')
+    mocker.patch('eddymc.parse_cache.CACHE_FORMAT', parse_cache.CACHE_FORMAT + 1)
+    # act, assert
+    assert cache.get_key('mcnp_examples/F2.out') != key
+
+
+def test_load_missing_entry(cache):
+    # arrange
+    # act
+    case = cache.load(cache.get_key('mcnp_examples/F2.out'))
+    # assert
+    assert case is None
+
+
+def test_store_and_load(cache, f2_case, fixed_time):
+    # arrange
+    key = cache.get_key('mcnp_examples/F2.out')
+    # act
+    cache.store(key, f2_case)
+    case = cache.load(key)
+    # assert
+    assert f2_case.file is not None
+    assert case.file is None
+    assert mcnp_html_writer.get_html(case) == mcnp_html_writer.get_html(f2_case)
+
+
+def test_load_corrupt_entry(cache):
+    # arrange
+    key = 'corrupt'
+    with open(cache.get_path(key), 'wb') as entry:
+        entry.write(b'not a pickle')
+    # act
+    case = cache.load(key)
+    # assert
+    assert case is None
+    assert not os.path.exists(cache.get_path(key))
+
+
+class Unloadable:
+    file = None
+
+    def __reduce__(self):
+        return int, ('not a number',)
+
+
+def test_load_entry_that_fails_to_load(cache):
+    # arrange
+    cache.store('broken', Unloadable())
+    # act
+    case = cache.load('broken')
+    # assert
+    assert case is None
+    assert not os.path.exists(cache.get_path('broken'))
+
+
+def test_evict_least_recently_used(cache, f2_case):
+    # arrange
+    cache.store('first', f2_case)
+    cache.store('second', f2_case)
+    os.utime(cache.get_path('first'), (1, 1))
+    os.utime(cache.get_path('second'), (2, 2))
+    cache.load('first')     # 'second' is now the least recently used
+    cache.max_size = os.path.getsize(cache.get_path('first')) * 2
+    # act
+    cache.store('third', f2_case)
+    # assert
+    assert os.path.exists(cache.get_path('first'))
+    assert not os.path.exists(cache.get_path('second'))
+    assert os.path.exists(cache.get_path('third'))
+    assert not os.path.exists(cache.get_summary_path('second'))
+
+
+def test_store_summary(cache, f2_case):
+    # act
+    cache.store('f2', f2_case)
+    summary = cache.load_summary('f2')
+    # assert
+    assert summary == {'filepath': 'mcnp_examples/F2.out', 'libraries': {'endf71x': 17, 'mcplib84': 5, 'el03': 5}}
+    assert cache.summaries() == {'f2': summary}
+    assert cache.load_summary('missing') is None
+
+
+def test_find_keys(cache, tmpdir, mocker):
+    # arrange
+    output = str(tmpdir.join('case.out'))
+    with open(output, 'w') as file:
+        file.write('first run')
+    first_key = cache.get_key(output)
+    first_keys = cache.find_keys([output, str(tmpdir.join('missing.out'))])
+    spy = mocker.spy(cache, 'get_key')
+    # act
+    unchanged_keys = cache.find_keys([output])
+    with open(output, 'w') as file:
+        file.write('second run, which is longer')
+    changed_keys = cache.find_keys([output])
+    # assert
+    assert first_keys == unchanged_keys == {output: first_key}
+    assert spy.call_count == 1     # only the changed file is read again
+    assert changed_keys[output] != first_key
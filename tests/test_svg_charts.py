@@ -0,0 +1,78 @@
+""" To run: just call python -m pytest while in this directory
+or add a configuration in pycharm
+"""
+
+import math
+from eddymc import svg_charts
+
+
+def test_line_chart():
+    # act
+    svg = svg_charts.line_chart([1, 2, 3], [0.3, 0.2, 0.1], 'Relative Error', limit=0.1)
+    # assert
+    assert svg.startswith('<svg')
+    assert svg.endswith('</svg>')
+    assert svg.count('<circle') == 3
+    assert 'stroke-dasharray' in svg
+    assert 'Relative Error' in svg
+
+
+def test_line_chart_leaves_out_unknown_points():
+    # act
+    svg = svg_charts.line_chart([1, 2, 3], [5.0, math.nan, 6.0], 'Figure of Merit')
+    # assert
+    assert svg.count('<circle') == 2
+    assert 'nan' not in svg
+
+
+def test_line_chart_escapes_title():
+    # act
+    svg = svg_charts.line_chart([1], [1.0], '<b>Mean</b>')
+    # assert
+    assert '<b>' not in svg
+    assert '&lt;b&gt;Mean&lt;/b&gt;' in svg
+
+
+def test_get_range_pads_flat_values():
+    # act
+    low, high = svg_charts.get_range([2.0, 2.0])
+    # assert
+    assert low < 2.0 < high
+
+
+def test_heat_map():
+    # arrange
+    values = [[0.0, 1.0], [10.0, 100.0]]
+    # act
+    svg = svg_charts.heat_map(values, 'Z = 0', 'X', 'Y', (-10, 10), (-5, 5))
+    # assert
+    assert svg.startswith('<svg')
+    assert svg.endswith('</svg>')
+    assert 'data:image/png;base64,' in svg
+    assert 'colour scale 1 to 100' in svg
+
+
+def test_colour_pixels():
+    # act
+    pixels = svg_charts.colour_pixels(svg_charts.np.array([[0.0, 1.0, 100.0]]), 1.0, 100.0)
+    # assert
+    assert pixels.shape == (1, 3, 3)
+    assert tuple(pixels[0, 0]) == svg_charts.EMPTY_COLOUR
+    assert tuple(pixels[0, 1]) == tuple(svg_charts.HEAT_MAP_COLOURS[0])
+    assert tuple(pixels[0, 2]) == tuple(svg_charts.HEAT_MAP_COLOURS[-1])
+
+
+def test_encode_png():
+    # act
+    png = svg_charts.encode_png(svg_charts.np.zeros((2, 3, 3), dtype=svg_charts.np.uint8))
+    # assert
+    assert png.startswith(b'\x89PNG\r\n\x1a\n')
+    assert png[16:24] == b'\x00\x00\x00\x03\x00\x00\x00\x02'   # width 3, height 2
+
+
+def test_line_chart_fitted_x_axis():
+    # act
+    svg = svg_charts.line_chart([-6.0, -3.0], [4.0, -2.0], 'Tally Density', x_label='log10 score', x_from_zero=False)
+    # assert
+    assert 'log10 score' in svg
+    assert '>0<' not in svg